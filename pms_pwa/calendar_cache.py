@@ -0,0 +1,96 @@
+import logging
+import weakref
+from functools import partial
+
+import odoo
+from odoo.tools.lru import LRU
+
+_logger = logging.getLogger(__name__)
+
+CACHE_SIZE = 512
+
+# Each kind of header has its own signaling sequence, bumped after the commit
+# of any transaction that changed its source data. Cached entries are tagged
+# with the sequence value they were computed with, so every worker drops them
+# as soon as another one commits a change.
+CACHE_KINDS = {
+    "general": "pms_pwa_calendar_general_signaling",
+    "price": "pms_pwa_calendar_price_signaling",
+    "rules": "pms_pwa_calendar_rules_signaling",
+    # Option lists of the reservation and partner forms (channels, agencies,
+    # countries...), they depend on the property and channel only
+    "options": "pms_pwa_options_signaling",
+}
+
+
+class CalendarCache:
+    def __init__(self, size=CACHE_SIZE):
+        self.entries = LRU(size)
+        self.pending = weakref.WeakKeyDictionary()
+        self.stamps = weakref.WeakKeyDictionary()
+
+    def create_sequences(self, cr):
+        for sequence in CACHE_KINDS.values():
+            cr.execute("CREATE SEQUENCE IF NOT EXISTS %s" % sequence)
+            # A new sequence returns its start value on the first nextval,
+            # call it now so the first signal changes the stamp
+            cr.execute("SELECT nextval('%s')" % sequence)
+
+    def read_stamps(self, registry, cr):
+        """Read the stamps of cr before its first query, with another cursor.
+        Every change signaled up to them is visible in the snapshot of cr, a
+        stamp read later could be newer than the data cr sees.
+        """
+        with registry.cursor() as stamp_cr:
+            stamp_cr.execute(
+                " UNION ALL ".join(
+                    "SELECT '%s', last_value FROM %s" % (kind, sequence)
+                    for kind, sequence in CACHE_KINDS.items()
+                )
+            )
+            self.stamps[cr] = dict(stamp_cr.fetchall())
+
+    def get_or_compute(self, env, kind, key, compute):
+        """Return the cached value of key, calling compute() on a miss.
+        A transaction with pending changes of kind computes the value without
+        the cache, it must see its own writes and not share them before commit.
+        Cursors without stamps (crons, tests) don't use the cache either.
+        """
+        stamps = self.stamps.get(env.cr)
+        if not stamps or kind in self.pending.get(env.cr, ()):
+            return compute()
+        stamp = stamps[kind]
+        cache_key = (env.cr.dbname, kind) + key
+        entry = self.entries.get(cache_key)
+        if entry and entry[0] == stamp:
+            return entry[1]
+        value = compute()
+        # Keep the entry of a request with newer stamps
+        if not entry or entry[0] < stamp:
+            self.entries[cache_key] = (stamp, value)
+        return value
+
+    def invalidate(self, env, kinds):
+        """Signal the change of kinds once the current transaction commits"""
+        cr = env.cr
+        pending = self.pending.get(cr)
+        if pending is None:
+            pending = self.pending[cr] = set()
+            cr.after("commit", partial(self._signal, cr))
+            cr.after("rollback", partial(self.pending.pop, cr, None))
+        pending.update(kinds)
+
+    def _signal(self, cr):
+        kinds = self.pending.pop(cr, None)
+        if not kinds:
+            return
+        try:
+            with odoo.registry(cr.dbname).cursor() as signal_cr:
+                for kind in kinds:
+                    signal_cr.execute("SELECT nextval('%s')" % CACHE_KINDS[kind])
+        except Exception:
+            _logger.exception("Unable to signal the calendar cache invalidation")
+            self.entries.clear()
+
+
+calendar_cache = CalendarCache()
@@ -4,7 +4,6 @@
 
 import datetime
 import logging
-import pprint
 from datetime import timedelta
 import traceback
 
@@ -12,7 +11,8 @@ from odoo import _, fields, http
 from odoo.http import request
 from odoo.tools.misc import get_lang
 
-pp = pprint.PrettyPrinter(indent=4)
+from ..pwa_debug import log_payload
+
 
 _logger = logging.getLogger(__name__)
 
@@ -29,7 +29,7 @@ class BookingEngine(http.Controller):
     )
     def booking_engine(self, **kw):
         folio_values = http.request.jsonrequest.get("params")
-        _logger.info("folio_values: {}".format(folio_values))
+        log_payload("booking_engine", folio_values, "folio_values")
         try:
             # Get property from add room from calendar
             if not folio_values.get("pms_property_id") and folio_values.get("rooms"):
@@ -291,7 +291,7 @@ class BookingEngine(http.Controller):
             folio_values["readonly_fields"] = []  # self._get_read_only_fields
             folio_values["invisible_fields"] = []  # self._get_invisible_fields
 
-            _logger.info(folio_values)
+            log_payload("booking_engine", folio_values, "result")
 
             return folio_values
         except Exception as e:
@@ -380,11 +380,14 @@ class BookingEngine(http.Controller):
         ]:
             folio_values["pricelist_id"] = folio_values["allowed_pricelists"][0]["id"]
         if folio_values.get("segmentation_ids"):
-            for segmentation in folio_values["segmentation_ids"]:
-                if int(segmentation) not in [
-                    item["id"] for item in folio_values["allowed_segmentations"]
-                ]:
-                    folio_values["segmentation_ids"].remove(segmentation)
+            allowed_segmentation_ids = {
+                item["id"] for item in folio_values["allowed_segmentations"]
+            }
+            folio_values["segmentation_ids"] = [
+                segmentation
+                for segmentation in folio_values["segmentation_ids"]
+                if int(segmentation) in allowed_segmentation_ids
+            ]
         if folio_values.get("channel_type_id"):
             if int(folio_values["channel_type_id"]["id"]) not in [
                 item["id"] for item in folio_values["allowed_channel_type_ids"]
@@ -584,7 +587,7 @@ class BookingEngine(http.Controller):
     def booking_engine_group(self, **kw):
         try:
             params = http.request.jsonrequest.get("params")
-            _logger.info(params)
+            log_payload("booking_engine_group", params)
             rooms_dict = params.get("rooms")
             # free_rooms = request.env["pms.room"].browse([int(i) for i in params['free_rooms']] if params.get('free_rooms') else [])
             checkin = datetime.datetime.strptime(
@@ -766,7 +769,7 @@ class BookingEngine(http.Controller):
     def booking_engine_submit(self, **kw):
         folio_values = http.request.jsonrequest.get("params")
         vals = {}
-        _logger.info("folio_values: {}".format(folio_values))
+        log_payload("booking_engine_submit", folio_values, "folio_values")
         try:
             if folio_values.get("folio_id"):
                 folio = request.env["pms.folio"].browse(int(folio_values["folio_id"]))
@@ -4,7 +4,6 @@
 
 from inspect import isdatadescriptor
 import logging
-import pprint
 from calendar import monthrange
 from datetime import timedelta
 import datetime
@@ -13,7 +12,6 @@ from odoo import _, fields, http
 from odoo.http import request
 from odoo.tools.misc import get_lang
 
-pp = pprint.PrettyPrinter(indent=4)
 
 _logger = logging.getLogger(__name__)
 
@@ -4,7 +4,6 @@
 
 from inspect import isdatadescriptor
 import logging
-import pprint
 import json
 from calendar import monthrange
 from datetime import timedelta
@@ -13,7 +12,8 @@ from odoo import _, fields, http
 from odoo.http import request
 from odoo.tools.misc import get_lang
 
-pp = pprint.PrettyPrinter(indent=4)
+from ..pwa_debug import log_payload
+
 
 _logger = logging.getLogger(__name__)
 
@@ -144,98 +144,39 @@ class PmsCalendarConfig(http.Controller):
         params = http.request.jsonrequest.get("params")
         try:
             pms_property_id = int(params["send"]['pms_property_id'])
-            _logger.info(params)
+            log_payload("calendar_config_list", params)
+            availability_plan = request.env["pms.availability.plan"].browse(
+                int(params["send"]["availability_plan"])
+            )
+            room_types = request.env["pms.room.type"].browse(
+                [int(room_type_id) for room_type_id in params["send"]["room_type"]]
+            )
+            # {(room_type_id, pricelist_id, date): price}
+            prices = {}
+            # {(room_type_id, date): avail_vals}
+            rules = {}
             for room_type_id, pricelists in params["send"]["room_type"].items():
-                room_type = request.env["pms.room.type"].browse(int(room_type_id))
                 for pricelist_id, dates in pricelists["pricelist_id"].items():
-                    pricelist = request.env["product.pricelist"].browse(
-                        int(pricelist_id)
-                    )
                     for date_str, items in dates["date"].items():
                         item_date = datetime.datetime.strptime(
                             date_str, get_lang(request.env).date_format
                         ).date()
-                        availability_plan = request.env['pms.availability.plan'].browse(
-                            int(params["send"]["availability_plan"])
-                        )
                         for item in items:
                             # price
                             if "price" in item:
-                                # REVIEW: Necesary date (sale) start/end = False???
-                                price_item = request.env["product.pricelist.item"].search(
-                                    [
-                                        ("product_id", "=", room_type.product_id.id),
-                                        ("date_start_consumption", "=", item_date),
-                                        ("date_end_consumption", "=", item_date),
-                                        ("pricelist_id", "=", pricelist.id),
-                                        ("pms_property_ids", "in", pms_property_id),
-                                    ]
-                                )
-                                if price_item:
-                                    price_item.write(
-                                        {"fixed_price": float(item["price"])}
-                                    )
-                                else:
-                                    price_item.create(
-                                        {
-                                            "applied_on": "0_product_variant",
-                                            "product_id": room_type.product_id.id,
-                                            "date_start_consumption": item_date,
-                                            "date_end_consumption": item_date,
-                                            "pricelist_id": pricelist.id,
-                                            "pms_property_ids": [pms_property_id],
-                                            "fixed_price": float(item["price"]),
-                                        }
-                                    )
+                                prices[
+                                    (int(room_type_id), int(pricelist_id), item_date)
+                                ] = float(item["price"])
                             if availability_plan:
-                                avail_vals = {}
-                                if "cupo" in item:
-                                    avail_vals["quota"] = int(item["cupo"])
-                                if "max_avail" in item:
-                                    avail_vals["max_avail"] = int(item["max_avail"])
-                                if "min_stay" in item:
-                                    avail_vals["min_stay"] = int(item["min_stay"])
-                                if "max_stay" in item:
-                                    avail_vals["max_stay"] = int(item["max_stay"])
-                                if "closed" in item:
-                                    avail_vals["closed"] = bool(item["closed"])
-                                if "closed_arrival" in item:
-                                    avail_vals["closed_arrival"] = bool(item["closed_arrival"])
-                                if "min_stay_arrival" in item:
-                                    avail_vals["min_stay_arrival"] = int(
-                                        item["min_stay_arrival"]
-                                    )
-                                if "max_stay_arrival" in item:
-                                    avail_vals["max_stay_arrival"] = int(
-                                        item["max_stay_arrival"]
-                                    )
+                                avail_vals = self._get_avail_vals(item)
                                 if any(avail_vals):
-                                    avail_rule_item = request.env[
-                                        "pms.availability.plan.rule"
-                                    ].search(
-                                        [
-                                            ("room_type_id", "=", room_type.id),
-                                            ("date", "=", item_date),
-                                            (
-                                                "availability_plan_id",
-                                                "=",
-                                                availability_plan.id,
-                                            ),
-                                            ("pms_property_id", "=", pms_property_id),
-                                        ]
-                                    )
-                                    if avail_rule_item:
-                                        avail_rule_item.write(avail_vals)
-                                    else:
-                                        avail_vals.update(
-                                            {
-                                                "room_type_id": room_type.id,
-                                                "date": item_date,
-                                                "availability_plan_id": availability_plan.id,
-                                                "pms_property_id": pms_property_id,
-                                            }
-                                        )
-                                        avail_rule_item.create(avail_vals)
+                                    rules.setdefault(
+                                        (int(room_type_id), item_date), {}
+                                    ).update(avail_vals)
+            if prices:
+                self._save_prices(pms_property_id, room_types, prices)
+            if rules:
+                self._save_availability_rules(pms_property_id, availability_plan, rules)
             return json.dumps(
                 {
                     "result": True,
@@ -244,3 +185,116 @@ class PmsCalendarConfig(http.Controller):
             )
         except Exception as e:
             return json.dumps({"result": False, "message": str(e)})
+
+    def _get_avail_vals(self, item):
+        avail_vals = {}
+        if "cupo" in item:
+            avail_vals["quota"] = int(item["cupo"])
+        if "max_avail" in item:
+            avail_vals["max_avail"] = int(item["max_avail"])
+        if "min_stay" in item:
+            avail_vals["min_stay"] = int(item["min_stay"])
+        if "max_stay" in item:
+            avail_vals["max_stay"] = int(item["max_stay"])
+        if "closed" in item:
+            avail_vals["closed"] = bool(item["closed"])
+        if "closed_arrival" in item:
+            avail_vals["closed_arrival"] = bool(item["closed_arrival"])
+        if "min_stay_arrival" in item:
+            avail_vals["min_stay_arrival"] = int(item["min_stay_arrival"])
+        if "max_stay_arrival" in item:
+            avail_vals["max_stay_arrival"] = int(item["max_stay_arrival"])
+        return avail_vals
+
+    def _save_prices(self, pms_property_id, room_types, prices):
+        """Upsert the daily price items of prices
+        {(room_type_id, pricelist_id, date): price} reading the existing
+        items with a single search and grouping the writes by price.
+        """
+        PricelistItem = request.env["product.pricelist.item"]
+        product_by_room_type = {
+            room_type.id: room_type.product_id.id for room_type in room_types
+        }
+        dates = {key[2] for key in prices}
+        # REVIEW: Necesary date (sale) start/end = False???
+        existing_items = PricelistItem.search(
+            [
+                ("product_id", "in", list(set(product_by_room_type.values()))),
+                ("pricelist_id", "in", list({key[1] for key in prices})),
+                ("date_start_consumption", "in", list(dates)),
+                ("pms_property_ids", "in", pms_property_id),
+            ]
+        )
+        items_by_key = {}
+        for price_item in existing_items:
+            if price_item.date_start_consumption != price_item.date_end_consumption:
+                continue
+            key = (
+                price_item.product_id.id,
+                price_item.pricelist_id.id,
+                price_item.date_start_consumption,
+            )
+            items_by_key.setdefault(key, []).append(price_item.id)
+        items_by_price = {}
+        create_vals = []
+        for (room_type_id, pricelist_id, item_date), price in prices.items():
+            product_id = product_by_room_type[room_type_id]
+            price_item_ids = items_by_key.get((product_id, pricelist_id, item_date))
+            if price_item_ids:
+                items_by_price.setdefault(price, []).extend(price_item_ids)
+            else:
+                create_vals.append(
+                    {
+                        "applied_on": "0_product_variant",
+                        "product_id": product_id,
+                        "date_start_consumption": item_date,
+                        "date_end_consumption": item_date,
+                        "pricelist_id": pricelist_id,
+                        "pms_property_ids": [pms_property_id],
+                        "fixed_price": price,
+                    }
+                )
+        for price, price_item_ids in items_by_price.items():
+            PricelistItem.browse(price_item_ids).write({"fixed_price": price})
+        if create_vals:
+            PricelistItem.create(create_vals)
+
+    def _save_availability_rules(self, pms_property_id, availability_plan, rules):
+        """Upsert the availability plan rules of rules
+        {(room_type_id, date): avail_vals} reading the existing rules with a
+        single search and grouping the writes by values.
+        """
+        Rule = request.env["pms.availability.plan.rule"]
+        existing_rules = Rule.search(
+            [
+                ("room_type_id", "in", list({key[0] for key in rules})),
+                ("date", "in", list({key[1] for key in rules})),
+                ("availability_plan_id", "=", availability_plan.id),
+                ("pms_property_id", "=", pms_property_id),
+            ]
+        )
+        rules_by_key = {}
+        for rule in existing_rules:
+            key = (rule.room_type_id.id, rule.date)
+            rules_by_key.setdefault(key, []).append(rule.id)
+        rules_by_vals = {}
+        create_vals = []
+        for (room_type_id, rule_date), avail_vals in rules.items():
+            rule_ids = rules_by_key.get((room_type_id, rule_date))
+            if rule_ids:
+                vals_key = tuple(sorted(avail_vals.items()))
+                rules_by_vals.setdefault(vals_key, []).extend(rule_ids)
+            else:
+                avail_vals.update(
+                    {
+                        "room_type_id": room_type_id,
+                        "date": rule_date,
+                        "availability_plan_id": availability_plan.id,
+                        "pms_property_id": pms_property_id,
+                    }
+                )
+                create_vals.append(avail_vals)
+        for vals_key, rule_ids in rules_by_vals.items():
+            Rule.browse(rule_ids).write(dict(vals_key))
+        if create_vals:
+            Rule.create(create_vals)
@@ -10,6 +10,8 @@ from odoo.http import request
 from ..utils import pwa_utils
 from odoo.tools import DEFAULT_SERVER_DATE_FORMAT
 
+from ..pwa_debug import log_payload
+
 
 _logger = logging.getLogger(__name__)
 
@@ -24,21 +26,14 @@ class CashRegister(http.Controller):
         website=True,
     )
     def cash_register__open_close(self, **kw):
-        print("kw", kw)
+        log_payload("cash_register_open_close", kw)
         amount = round(float(kw["amount"]), 2)
         pms_property_id = request.env.user.pms_pwa_property_id.id
         journal_id = int(kw.get("payment_method"))
         journal = request.env["account.journal"].browse(journal_id)
+        cash_balance = request.env["pms.cash.balance"]._get_journal_balance(journal.id)
         if kw["type"] == "open":
-            statement = (
-                request.env["account.bank.statement"]
-                .sudo()
-                .search(
-                    [
-                        ("journal_id", "=", journal.id),
-                    ], limit=1,
-                )
-            )
+            statement = cash_balance.last_statement_id
             if statement.balance_end_real == amount or kw.get("force"):
                 request.env["account.bank.statement"].sudo().create({
                     "name": datetime.date.today().strftime(
@@ -58,16 +53,7 @@ class CashRegister(http.Controller):
                     {"result": False, "force": True, "message": _("Existe una diferencia de " + str(dif) + " Euros entre el último cierre y el valor introducido, revisa la caja y si el valor introducido es correcto fuerza la apertura")}
                 )
         elif kw["type"] == "close":
-            statement = (
-                request.env["account.bank.statement"]
-                .sudo()
-                .search(
-                    [
-                        ("journal_id", "=", journal.id),
-                        ("state", "=", "open"),
-                    ], limit=1,
-                )
-            )
+            statement = cash_balance.open_statement_id
             if statement.balance_end == amount:
                 statement.sudo().balance_end_real = amount
                 statement.sudo().button_post()
@@ -108,27 +94,103 @@ class CashRegister(http.Controller):
     def cash_register_payment(self, **post):
         _logger.info("FUNCTION: cash_register_payment")
         _logger.info("USER: {}".format(request.env.user))
-        _logger.info("PARAMS: {}".format(post))
+        log_payload("cash_register_payment", post)
 
         try:
-            if "payment_method" not in post or "amount" not in post or "description" not in post:
-                return json.dumps({"result": False, "message": "Los campos método de pago, cantidad y descripción son obligatorios"})
-            journal_id = int(post.get("payment_method"))
-            partner_id = False
-            if post.get("partner_id") and post.get("partner_id") != "":
-                partner_id = int(post.get("partner_id"))
-            journal = request.env["account.journal"].browse(journal_id)
-            description = post.get("description")
-            pms_property_id = request.env.user.pms_pwa_property_id.id
-            date = datetime.date.today()
-            amount = float(post.get("amount"))
-            amount = amount if amount >= 0 else -amount
-            # Supplier Payment
-            if not post.get("target_payment_method"):
-                if journal.type == "cash":
-                    amount = float(post.get("amount"))
-                    self._create_statement_line(pms_property_id, journal_id, date, -amount, description, partner_id)
-                vals = {
+            mens = self._register_cash_movements([post])
+            return json.dumps({"result": True, "message": mens})
+        except Exception as e:
+            return json.dumps({"result": False, "message": str(e)})
+
+    @http.route(
+        ["/cash_register/add_batch"],
+        csrf=False,
+        auth="user",
+        website=True,
+        type="json",
+        methods=["POST"],
+    )
+    def cash_register_payment_batch(self, movements=None, **post):
+        """Register a list of cash movements, each one with the params of
+        /cash_register/add, all of them or none
+        """
+        _logger.info("FUNCTION: cash_register_payment_batch")
+        _logger.info("USER: {}".format(request.env.user))
+        log_payload("cash_register_payment_batch", movements)
+        try:
+            with request.env.cr.savepoint():
+                self._register_cash_movements(movements or [])
+            return json.dumps(
+                {
+                    "result": True,
+                    "message": _("%s movimientos registrados correctamente")
+                    % len(movements or []),
+                }
+            )
+        except Exception as e:
+            return json.dumps({"result": False, "message": str(e)})
+
+    def _register_cash_movements(self, movements):
+        """Create the statement lines and payments of the movements with
+        grouped creates
+        @return: Return the message of the last movement
+        """
+        pms_property_id = request.env.user.pms_pwa_property_id.id
+        date = datetime.date.today()
+        statement_lines = []
+        payments_vals = []
+        mens = ""
+        for movement in movements:
+            lines, vals_list, mens = self._get_cash_movement_values(movement)
+            statement_lines += lines
+            payments_vals += vals_list
+        self._create_statement_lines(pms_property_id, date, statement_lines)
+        payments = request.env["account.payment"].create(payments_vals)
+        payments.action_post()
+        return mens
+
+    def _get_cash_movement_values(self, post):
+        """
+        @return: Return tuple with the statement lines and payments values
+         of a movement and its message
+         (
+          [{"journal_id": id, "amount": amount, "payment_ref": ref, "partner_id": id}, ...],
+          [payment_vals, ...],
+          message,
+         )
+        """
+        if (
+            "payment_method" not in post
+            or "amount" not in post
+            or "description" not in post
+        ):
+            raise UserError(
+                _("Los campos método de pago, cantidad y descripción son obligatorios")
+            )
+        journal_id = int(post.get("payment_method"))
+        partner_id = False
+        if post.get("partner_id") and post.get("partner_id") != "":
+            partner_id = int(post.get("partner_id"))
+        journal = request.env["account.journal"].browse(journal_id)
+        description = post.get("description")
+        date = datetime.date.today()
+        amount = float(post.get("amount"))
+        amount = amount if amount >= 0 else -amount
+        statement_lines = []
+        # Supplier Payment
+        if not post.get("target_payment_method"):
+            if journal.type == "cash":
+                amount = float(post.get("amount"))
+                statement_lines.append(
+                    {
+                        "journal_id": journal_id,
+                        "amount": -amount,
+                        "payment_ref": description,
+                        "partner_id": partner_id,
+                    }
+                )
+            payments_vals = [
+                {
                     "journal_id": journal.id,
                     "amount": amount,
                     "date": date,
@@ -138,17 +200,33 @@ class CashRegister(http.Controller):
                     "ref": description,
                     "partner_id": partner_id,
                 }
-                pay = request.env["account.payment"].create(vals)
-                pay.action_post()
-                mens = "Pago registrado correctamente"
-            # Internal Transfer
-            else:
-                target_journal_id = int(post.get("target_payment_method"))
-                target_journal = request.env["account.journal"].browse(target_journal_id)
-                partner_id = target_journal.company_id.id
-                if journal.type == "cash":
-                    statement1 = self._create_statement_line(pms_property_id, journal_id, date, -amount, description, partner_id)
-                payment_vals = {
+            ]
+            mens = "Pago registrado correctamente"
+        # Internal Transfer
+        else:
+            target_journal_id = int(post.get("target_payment_method"))
+            target_journal = request.env["account.journal"].browse(target_journal_id)
+            partner_id = target_journal.company_id.id
+            if journal.type == "cash":
+                statement_lines.append(
+                    {
+                        "journal_id": journal_id,
+                        "amount": -amount,
+                        "payment_ref": description,
+                        "partner_id": partner_id,
+                    }
+                )
+            if target_journal.type == "cash":
+                statement_lines.append(
+                    {
+                        "journal_id": target_journal_id,
+                        "amount": amount,
+                        "payment_ref": description,
+                        "partner_id": partner_id,
+                    }
+                )
+            payments_vals = [
+                {
                     "journal_id": journal.id,
                     "amount": amount,
                     "date": date,
@@ -158,12 +236,8 @@ class CashRegister(http.Controller):
                     "partner_id": partner_id,
                     "is_internal_transfer": True,
                     "partner_bank_id": journal.bank_account_id.id,
-                }
-                pay1 = request.env["account.payment"].create(payment_vals)
-                pay1.action_post()
-                if target_journal.type == "cash":
-                    statement2 = self._create_statement_line(pms_property_id, target_journal_id, date, amount, description, partner_id)
-                payment_vals = {
+                },
+                {
                     "journal_id": target_journal.id,
                     "amount": amount,
                     "date": date,
@@ -172,55 +246,90 @@ class CashRegister(http.Controller):
                     "ref": description,
                     "partner_id": partner_id,
                     "is_internal_transfer": True,
-                }
-                pay2 = request.env["account.payment"].create(payment_vals)
-                pay2.action_post()
-                mens = "Transferencia registrada correctamente"
+                },
+            ]
+            mens = "Transferencia registrada correctamente"
+        return statement_lines, payments_vals, mens
 
-            return json.dumps(
-                {"result": True, "message": mens}
-            )
-        except Exception as e:
-            return json.dumps({"result": False, "message": str(e)})
+    def _create_statement_line(
+        self, pms_property_id, journal_id, date, amount, description, partner_id
+    ):
+        self._create_statement_lines(
+            pms_property_id,
+            date,
+            [
+                {
+                    "journal_id": journal_id,
+                    "amount": amount,
+                    "payment_ref": description,
+                    "partner_id": partner_id,
+                }
+            ],
+        )
 
-    def _create_statement_line(self, pms_property_id, journal_id, date, amount, description, partner_id):
-        statement = (
+    def _create_statement_lines(self, pms_property_id, date, lines):
+        """Add the lines to the open statements of their journals in the date,
+        the journals without an open statement get a new one
+        """
+        if not lines:
+            return
+        journal_ids = list({line["journal_id"] for line in lines})
+        statements = (
             request.env["account.bank.statement"]
             .sudo()
             .search(
                 [
-                    ("journal_id", "=", journal_id),
+                    ("journal_id", "in", journal_ids),
                     ("pms_property_id", "=", pms_property_id),
                     ("state", "=", "open"),
                     ("date", "=", date),
                 ]
             )
         )
-        if not statement:
+        statement_by_journal = {}
+        for statement in statements:
+            statement_by_journal.setdefault(statement.journal_id.id, statement)
+        missing_journal_ids = [
+            journal_id
+            for journal_id in journal_ids
+            if journal_id not in statement_by_journal
+        ]
+        if missing_journal_ids:
             # TODO: cash control option
-            st_values = {
-                "journal_id": journal_id,
-                "user_id": request.env.user.id,
-                "pms_property_id": pms_property_id,
-                "name": datetime.date.today().strftime(get_lang(request.env).date_format),
-            }
             ctx = dict(request.env.context, company_id=request.env.user.pms_pwa_property_id.company_id.id)
-            statement = (
+            new_statements = (
                 request.env["account.bank.statement"]
                 .with_context(ctx)
                 .sudo()
-                .create(st_values)
+                .create(
+                    [
+                        {
+                            "journal_id": journal_id,
+                            "user_id": request.env.user.id,
+                            "pms_property_id": pms_property_id,
+                            "name": datetime.date.today().strftime(
+                                get_lang(request.env).date_format
+                            ),
+                        }
+                        for journal_id in missing_journal_ids
+                    ]
+                )
             )
-        statement.write({
-            "line_ids": [(0, 0, {
-                "date": date,
-                "amount": amount,
-                "payment_ref": description,
-                "statement_id": statement.id,
-                "journal_id": statement.journal_id.id,
-                "partner_id": partner_id,
-            })],
-        })
+            for statement in new_statements:
+                statement_by_journal[statement.journal_id.id] = statement
+        request.env["account.bank.statement.line"].sudo().create(
+            [
+                {
+                    "date": date,
+                    "amount": line["amount"],
+                    "payment_ref": line["payment_ref"],
+                    "statement_id": statement_by_journal[line["journal_id"]].id,
+                    "journal_id": line["journal_id"],
+                    "partner_id": line["partner_id"],
+                }
+                for line in lines
+            ]
+        )
 
     @http.route(
         "/cash_register/edit",
@@ -231,7 +340,7 @@ class CashRegister(http.Controller):
         methods=["POST"],
     )
     def cash_register_edit(self, **kw):
-        print(kw)
+        log_payload("cash_register_edit", kw)
         try:
             new_journal_id = int(kw.get("journal_id", False))
             new_journal = request.env["account.journal"].browse(new_journal_id)
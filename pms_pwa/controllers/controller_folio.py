@@ -6,7 +6,6 @@ import datetime
 from inspect import isdatadescriptor
 import json
 import logging
-import pprint
 from calendar import monthrange
 from datetime import timedelta
 from ..utils import pwa_utils
@@ -15,7 +14,6 @@ from odoo.exceptions import MissingError
 from odoo.http import request
 from odoo.tools.misc import get_lang
 
-pp = pprint.PrettyPrinter(indent=4)
 
 _logger = logging.getLogger(__name__)
 
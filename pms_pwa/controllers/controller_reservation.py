@@ -5,7 +5,6 @@
 import datetime
 import json
 import logging
-import pprint
 
 from odoo import SUPERUSER_ID, _, fields, http
 from odoo.exceptions import MissingError, UserError
@@ -14,8 +13,8 @@ from odoo.tools.misc import get_lang
 from odoo.tools import DEFAULT_SERVER_DATE_FORMAT
 
 from ..utils import pwa_utils
+from ..pwa_debug import log_payload
 
-pp = pprint.PrettyPrinter(indent=4)
 
 _logger = logging.getLogger(__name__)
 
@@ -160,7 +159,7 @@ class PmsReservation(http.Controller):
             )
             try:
                 params = http.request.jsonrequest.get("params")
-                _logger.info(params)
+                log_payload("reservation_checkin", params)
                 res = reservation.pwa_action_checkin(
                     params["guests_list"], reservation_id, params.get("action_on_board")
                 )
@@ -239,9 +238,7 @@ class PmsReservation(http.Controller):
         website=True,
     )
     def reservation_refund(self, reservation_id=None, **kw):
-        _logger.info("reservation_id: {}".format(reservation_id))
-        _logger.info("kw: {}".format(kw))
-        _logger.info("http.request.jsonrequest: {}".format(http.request.jsonrequest))
+        log_payload("reservation_refund", http.request.jsonrequest)
         if reservation_id:
             reservation = (
                 request.env["pms.reservation"]
@@ -586,7 +583,7 @@ class PmsReservation(http.Controller):
         methods=["POST"],
         website=True,
     )
-    def reservation_detail_json(self, reservation_id=None, **kw):
+    def reservation_detail_json(self, reservation_id=None, sections=None, **kw):
         reservation = False
         if reservation_id:
             reservation = (
@@ -597,7 +594,22 @@ class PmsReservation(http.Controller):
         if not reservation:
             raise MissingError(_("This document does not exist."))
 
-        return reservation.parse_reservation()
+        return reservation.parse_reservation(sections=sections)
+
+    @http.route(
+        ["/reservation/<int:reservation_id>/sections"],
+        type="json",
+        auth="user",
+        methods=["POST"],
+        website=True,
+    )
+    def reservation_sections_json(self, reservation_id=None, sections=None, **kw):
+        reservation = request.env["pms.reservation"].search(
+            [("id", "=", int(reservation_id))]
+        )
+        if not reservation:
+            raise MissingError(_("This document does not exist."))
+        return reservation._parse_reservation_sections(sections=sections)
 
     @http.route(
         ["/reservation/<int:reservation_id>/onchange_data"],
@@ -610,7 +622,7 @@ class PmsReservation(http.Controller):
     def reservation_onchange_data(self, reservation_id=None, **kw):
         reservation = False
         params = http.request.jsonrequest.get("params")
-        _logger.info(params)
+        log_payload("reservation_onchange_data", params)
         # TEMP FIX
         ##############################################################################
         if (
@@ -634,8 +646,9 @@ class PmsReservation(http.Controller):
         if not reservation:
             raise MissingError(_("This reservation does not exist."))
         if reservation:
+            params = http.request.jsonrequest.get("params")
+            sections = params.pop("sections", None)
             try:
-                params = http.request.jsonrequest.get("params")
                 reservation_line_cmds = []
                 reservation_values = {}
                 for param in params.keys():
@@ -803,7 +816,9 @@ class PmsReservation(http.Controller):
                             {
                                 "result": True,
                                 "message": _("Operation completed successfully."),
-                                "reservation": reservation.parse_reservation(),
+                                "reservation": reservation.parse_reservation(
+                                    sections=sections
+                                ),
                             }
                         )
 
@@ -818,21 +833,21 @@ class PmsReservation(http.Controller):
                 if "price_total" in params:
                     del params["price_total"]
                 # del params["reservation_id"]
-                pp.pprint(reservation_values)
+                log_payload("reservation_onchange_data", reservation_values)
                 reservation.write(reservation_values)
             except Exception as e:
                 return json.dumps(
                     {
                         "result": False,
                         "message": str(e),
-                        "reservation": reservation.parse_reservation(),
+                        "reservation": reservation.parse_reservation(sections=sections),
                     }
                 )
             return json.dumps(
                 {
                     "result": True,
                     "message": _("Operation completed successfully."),
-                    "reservation": reservation.parse_reservation(),
+                    "reservation": reservation.parse_reservation(sections=sections),
                 }
             )
         else:
@@ -910,7 +925,7 @@ class PmsReservation(http.Controller):
     )
     def reservation_multi_assign(self, **kw):
         params = http.request.jsonrequest.get("params")
-        _logger.info(params)
+        log_payload("reservation_multi_assign", params)
         try:
             # TODO: Hot FIX quit 'on' of params
             reservation_ids = [
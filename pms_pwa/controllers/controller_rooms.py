@@ -1,4 +1,5 @@
 import datetime
+import json
 
 from odoo import _, http
 from odoo.http import request
@@ -66,3 +67,26 @@ class Rooms(http.Controller):
             rooms.append({"id": room.id, "name": room.display_name})
 
         return rooms
+
+    @http.route(
+        "/rooms/housekeeping_state",
+        type="json",
+        website=True,
+        auth="user",
+        methods=["POST"],
+    )
+    def set_housekeeping_state(self, room_id, housekeeping_state, **post):
+        room = request.env["pms.room"].browse(int(room_id))
+        try:
+            room.housekeeping_state = housekeeping_state
+        except Exception as e:
+            return json.dumps({"result": False, "message": str(e)})
+        return json.dumps(
+            {
+                "result": True,
+                "message": _("Estado de la habitación actualizado"),
+                "counters": request.env["pms.room.status.counter"]._get_counters(
+                    room.pms_property_id.id
+                ),
+            }
+        )
@@ -4,7 +4,6 @@
 
 from inspect import isdatadescriptor
 import logging
-import pprint
 from calendar import monthrange
 import datetime
 from odoo.tools.misc import get_lang
@@ -15,7 +14,9 @@ from odoo.http import request
 
 from odoo.addons.web.controllers.main import Home
 
-pp = pprint.PrettyPrinter(indent=4)
+from ..models.pms_dashboard_kpi import KPI_FIELDS, KPI_MAX_BASELINES, KPI_MAX_DAYS
+from ..pwa_debug import log_payload
+
 
 _logger = logging.getLogger(__name__)
 
@@ -43,26 +44,23 @@ class DashBoard(http.Controller):
             return activities
 
         date = datetime.datetime.today()
-        date_one_day = date + datetime.timedelta(days=1)
 
-        graph_date_from = datetime.datetime.today()
-        graph_date_to = graph_date_from + datetime.timedelta(days=15)
+        graph_date_from, graph_date_to = self._get_graph_dates()
 
         pms_property_id = request.env.user.pms_pwa_property_id.id
         property = request.env["pms.property"].browse(pms_property_id)
 
-        channels = request.env["pms.sale.channel"].search([
-            '|',
-            ("pms_property_ids", "in", pms_property_id),
-            ("pms_property_ids", "=", False),
-        ])
+        journals = property.sudo()._get_journals_by_type()
+        cash_journal_id = list(journals["cash"].keys())[0]
+        bank_journal_id = list(journals["bank"].keys())[0]
 
         values.update(
             {
                 # Cambios documento
-                "cash_balance": self._get_cash_balance(int(list(self._get_journals_cash(pms_property_id).keys())[0])),
+                # Balance, status and payments filled by /dashboard/cash_bank
+                "cash_balance": 0,
                 "cash": {
-                    "status": self._get_status_journal(int(list(self._get_journals_cash(pms_property_id).keys())[0])),
+                    "status": "open",
                     "coins": {
                         "500": 0,
                         "200": 0,
@@ -81,53 +79,25 @@ class DashBoard(http.Controller):
                         "0.01": 0,
 
                     },
-                    "list": self._get_journals_cash(pms_property_id),
-                    "selected": list(self._get_journals_cash(pms_property_id).keys())[0],
+                    "list": journals["cash"],
+                    "selected": cash_journal_id,
                     "date": date.strftime(get_lang(request.env).date_format),
-                    "payments": self._get_payments(int(list(self._get_journals_cash(pms_property_id).keys())[0]), date),
+                    "payments": [],
                 },
                 "bank_journals": {
-                    "list": self._get_journals_bank(pms_property_id),
-                    "selected": list(self._get_journals_bank(pms_property_id).keys())[0],
+                    "list": journals["bank"],
+                    "selected": bank_journal_id,
                     "date": date.strftime(get_lang(request.env).date_format),
-                    "payments": self._get_payments(int(list(self._get_journals_bank(pms_property_id).keys())[0]), date)
+                    "payments": [],
                 },
                 # Fin cambio documento
                 "tasks": _get_user_activities(
                     request.session.uid if request.session.uid else False
                 ),
-                "arrivals": {
-                    "today": {
-                        "date": date.strftime(get_lang(request.env).date_format),
-                        "to_arrive": len(self.dash_checkins(date, pms_property_id)),
-                        "to_check_in": len(self.dash_left_checkins(date, pms_property_id)),
-                    },
-                    "tomorrow": {
-                        "date": date_one_day.strftime(get_lang(request.env).date_format),
-                        "to_arrive": len(self.dash_checkins(date_one_day, pms_property_id)),
-                    },
-                },
-                "departures": {
-                    "today": {
-                        "date": date.strftime(get_lang(request.env).date_format),
-                        "to_leave": len(self.dash_checkouts(date, pms_property_id)),
-                        "to_check_out": len(self.dash_left_checkouts(date, pms_property_id)),
-                    },
-                    "tomorrow": {
-                        "date": date_one_day.strftime(get_lang(request.env).date_format),
-                        "to_leave": len(self.dash_checkouts(date_one_day, pms_property_id)),
-                    },
-                },
-                "rooms": {
-                    "date": date.strftime(get_lang(request.env).date_format),
-                    "available": property.with_context(
-                        checkin=date, checkout=date_one_day).availability,
-                    "out_of_service": 2,
-                    "taken": 8,
-                    "ready": 1,
-                    "dirty": 1,
-                    "cleaning": 2,
-                },
+                # Filled by the widgets endpoints once the page is loaded
+                "arrivals": self._get_arrivals_values(date, {}),
+                "departures": self._get_departures_values(date, {}),
+                "rooms": self._get_rooms_values(date, {}),
                 "clocking_in": [
                     {"name": "Juan Manuel Díaz", "date": "15/10/2020 10:19:25"},
                     {"name": "Paula Sánchez", "date": "15/10/2020 10:54:25"},
@@ -152,111 +122,12 @@ class DashBoard(http.Controller):
                         " adipiscing elit. Nulla sit amet enim sit amet ex laoreet dictum.",
                     },
                 ],
-                "evolutions": [
-                    {
-                        "name": "Ocupación",
-                        "selector": "ocupation",
-                        "labels": self.get_graph_labels(graph_date_from, graph_date_to),
-                        "label_1": graph_date_from.strftime("%Y"),
-                        "data_1": self._get_graph_ocupation(graph_date_from, graph_date_to, pms_property_id),
-                        "backgroundColor_1": "#E5F8FC",
-                        "borderColor_1": "#00B5E2",
-                        "label_2": (graph_date_from - relativedelta(years=1)).strftime("%Y"),
-                        "data_2": self._get_graph_ocupation(
-                            graph_date_from - relativedelta(years=1),
-                            graph_date_to - relativedelta(years=1),
-                            pms_property_id,
-                        ),
-                        "backgroundColor_2": "#CEF2E8",
-                        "borderColor_2": "#00BA39",
-                    },
-                    {
-                        "name": "Ingresos",
-                        "selector": "revenue",
-                        "labels": self.get_graph_labels(graph_date_from, graph_date_to),
-                        "label_1": graph_date_from.strftime("%Y"),
-                        "data_1": self._get_graph_revenue(graph_date_from, graph_date_to, pms_property_id),
-                        "backgroundColor_1": "#E5F8FC",
-                        "borderColor_1": "#00B5E2",
-                        "label_2": (graph_date_from - relativedelta(years=1)).strftime("%Y"),
-                        "data_2": self._get_graph_revenue(
-                            graph_date_from - relativedelta(years=1),
-                            graph_date_to - relativedelta(years=1),
-                            pms_property_id,
-                        ),
-                        "backgroundColor_2": "#CEF2E8",
-                        "borderColor_2": "#00BA39",
-                    },
-                    {
-                        "name": "Facturación",
-                        "selector": "billing",
-                        "labels": "5 oct,6 oct,7 oct,8 oct,9 oct",
-                        "label_1": "2019",
-                        "data_1": "12,24,13,3,54",
-                        "backgroundColor_1": "#E5F8FC",
-                        "borderColor_1": "#00B5E2",
-                        "label_2": "2020",
-                        "data_2": "15,19,25,69,12",
-                        "backgroundColor_2": "#CEF2E8",
-                        "borderColor_2": "#00BA39",
-                    },
-                ],
-                "kpis": [
-                    {
-                        "name": "Ocupación",
-                        "labels": "Llegadas,Salidas,Fuera de Servicio",
-                        "label": "",
-                        "data": self._get_kpi_ocupation(graph_date_from, graph_date_to, pms_property_id),
-                        "backgroundColor": "#FF5733,#B5BFBD,#00B5E2",
-                        "borderColor": "#FF5733,#B5BFBD,#00B5E2",
-                        "ratio": self._get_kpi_ocupation_score(graph_date_from, graph_date_to, pms_property_id),
-                    },
-                    {
-                        "name": "Reservas por canal",
-                        "labels": ",".join(channels.mapped("name")),
-                        "label": "",
-                        "data": self._get_channel_reservations(channels, graph_date_from, graph_date_to, pms_property_id),
-                        "backgroundColor": "#FF5733,#B5BFBD,#00B5E2",
-                        "borderColor": "#FF5733,#B5BFBD,#00B5E2",
-                        "ratio": self._get_channel_reservations_score(channels, graph_date_from, graph_date_to, pms_property_id),
-                    },
-                    {
-                        "name": "Income by channel",
-                        "labels": "Phone,Booking,Other",
-                        "label": "",
-                        "data": "1400,700,500",
-                        "backgroundColor": "#FF5733,#B5BFBD,#00B5E2",
-                        "borderColor": "#FF5733,#B5BFBD,#00B5E2",
-                        "ratio": 4.66,
-                    },
-                    {
-                        "name": "Cleaning score",
-                        "labels": "Good,Acceptable,Bad",
-                        "label": "",
-                        "data": "54,24,14",
-                        "backgroundColor": "#FF5733,#B5BFBD,#00B5E2",
-                        "borderColor": "#FF5733,#B5BFBD,#00B5E2",
-                        "ratio": 3.16,
-                    },
-                    {
-                        "name": "Attention score",
-                        "labels": "Good,Acceptable,Bad",
-                        "label": "",
-                        "data": "55,20,11",
-                        "backgroundColor": "#FF5733,#B5BFBD,#00B5E2",
-                        "borderColor": "#FF5733,#B5BFBD,#00B5E2",
-                        "ratio": 4.05,
-                    },
-                    {
-                        "name": "General score",
-                        "labels": "Good,Acceptable,Bad",
-                        "label": "",
-                        "data": "64,34,4",
-                        "backgroundColor": "#FF5733,#B5BFBD,#00B5E2",
-                        "borderColor": "#FF5733,#B5BFBD,#00B5E2",
-                        "ratio": 4.25,
-                    },
-                ],
+                "evolutions": self._get_evolutions_values(
+                    pms_property_id, graph_date_from, graph_date_to, lazy=True
+                ),
+                "kpis": self._get_kpis_values(
+                    pms_property_id, graph_date_from, graph_date_to, lazy=True
+                ),
                 "compare_options": [
                     {
                         "id": 1,
@@ -272,41 +143,286 @@ class DashBoard(http.Controller):
 
         return http.request.render("pms_pwa.roomdoo_dashboard_page", values)
 
-    def dash_checkins(self, date, pms_property_id):
-        checkins = request.env["pms.reservation"].search([
-            ("checkin", "=", date),
-            ("state", "!=", "cancel"),
-            ("reservation_type", "!=", "out"),
-            ("pms_property_id", "=", pms_property_id),
-        ])
-        return checkins
-
-    def dash_checkouts(self, date, pms_property_id):
-        checkouts = request.env["pms.reservation"].search([
-            ("checkout", "=", date),
-            ("state", "!=", "cancel"),
-            ("reservation_type", "!=", "out"),
-            ("pms_property_id", "=", pms_property_id),
-        ])
-        return checkouts
-
-    def dash_left_checkins(self, date, pms_property_id):
-        checkins = request.env["pms.reservation"].search([
-            ("checkin", "<=", date),
-            ("state", "in", ("draft", "confirm", "arrival_delayed")),
-            ("reservation_type", "!=", "out"),
-            ("pms_property_id", "=", pms_property_id),
-        ])
-        return checkins
-
-    def dash_left_checkouts(self, date, pms_property_id):
-        checkouts = request.env["pms.reservation"].search([
-            ("checkout", "=", date),
-            ("state", "not in", ("cancel", "done")),
-            ("reservation_type", "!=", "out"),
-            ("pms_property_id", "=", pms_property_id),
-        ])
-        return checkouts
+    def _get_arrivals_values(self, date, counters):
+        date_format = get_lang(request.env).date_format
+        return {
+            "today": {
+                "date": date.strftime(date_format),
+                "to_arrive": counters.get("to_arrive", 0),
+                "to_check_in": counters.get("to_check_in", 0),
+            },
+            "tomorrow": {
+                "date": (date + datetime.timedelta(days=1)).strftime(date_format),
+                "to_arrive": counters.get("to_arrive_tomorrow", 0),
+            },
+        }
+
+    def _get_departures_values(self, date, counters):
+        date_format = get_lang(request.env).date_format
+        return {
+            "today": {
+                "date": date.strftime(date_format),
+                "to_leave": counters.get("to_leave", 0),
+                "to_check_out": counters.get("to_check_out", 0),
+            },
+            "tomorrow": {
+                "date": (date + datetime.timedelta(days=1)).strftime(date_format),
+                "to_leave": counters.get("to_leave_tomorrow", 0),
+            },
+        }
+
+    def _get_rooms_values(self, date, counters):
+        return {
+            "date": date.strftime(get_lang(request.env).date_format),
+            "available": counters.get("available", 0),
+            "out_of_service": counters.get("out_of_service", 0),
+            "taken": counters.get("taken", 0),
+            "ready": counters.get("ready", 0),
+            "dirty": counters.get("dirty", 0),
+            "cleaning": counters.get("cleaning", 0),
+        }
+
+    def _get_evolutions_values(
+        self, pms_property_id, graph_date_from, graph_date_to, lazy=False
+    ):
+        """
+        @return: Return list with the evolution graphs, with lazy the graphs
+         data is left empty to be requested from /dashboard/evolutions
+        """
+        last_year_date_from = graph_date_from - relativedelta(years=1)
+        periods = [{"kpis": []}, {"kpis": []}]
+        if not lazy:
+            periods = request.env["pms.dashboard.kpi"]._get_comparison(
+                pms_property_id, graph_date_from.date(), graph_date_to.date()
+            )
+        return [
+            {
+                "name": "Ocupación",
+                "selector": "ocupation",
+                "labels": self.get_graph_labels(graph_date_from, graph_date_to),
+                "label_1": graph_date_from.strftime("%Y"),
+                "data_1": self._get_graph_data(periods[0], "rooms_sold"),
+                "backgroundColor_1": "#E5F8FC",
+                "borderColor_1": "#00B5E2",
+                "label_2": last_year_date_from.strftime("%Y"),
+                "data_2": self._get_graph_data(periods[1], "rooms_sold"),
+                "backgroundColor_2": "#CEF2E8",
+                "borderColor_2": "#00BA39",
+            },
+            {
+                "name": "Ingresos",
+                "selector": "revenue",
+                "labels": self.get_graph_labels(graph_date_from, graph_date_to),
+                "label_1": graph_date_from.strftime("%Y"),
+                "data_1": self._get_graph_data(periods[0], "revenue"),
+                "backgroundColor_1": "#E5F8FC",
+                "borderColor_1": "#00B5E2",
+                "label_2": last_year_date_from.strftime("%Y"),
+                "data_2": self._get_graph_data(periods[1], "revenue"),
+                "backgroundColor_2": "#CEF2E8",
+                "borderColor_2": "#00BA39",
+            },
+            {
+                "name": "Facturación",
+                "selector": "billing",
+                "labels": "5 oct,6 oct,7 oct,8 oct,9 oct",
+                "label_1": "2019",
+                "data_1": "12,24,13,3,54",
+                "backgroundColor_1": "#E5F8FC",
+                "borderColor_1": "#00B5E2",
+                "label_2": "2020",
+                "data_2": "15,19,25,69,12",
+                "backgroundColor_2": "#CEF2E8",
+                "borderColor_2": "#00BA39",
+            },
+        ]
+
+    def _get_kpis_values(
+        self, pms_property_id, graph_date_from, graph_date_to, lazy=False
+    ):
+        """
+        @return: Return list with the KPIs graphs, with lazy the KPIs are
+         left empty to be requested from /dashboard/kpis
+        """
+        property = request.env["pms.property"].browse(pms_property_id)
+        channels = request.env["pms.sale.channel"].search(
+            [
+                "|",
+                ("pms_property_ids", "in", pms_property_id),
+                ("pms_property_ids", "=", False),
+            ]
+        )
+        kpi_counters = {}
+        channel_mix = {}
+        if not lazy:
+            kpi_counters = property._get_dashboard_kpi_counters(
+                graph_date_from.date(), graph_date_to.date()
+            )
+            channel_mix = property._get_channel_mix(
+                graph_date_from.date(), graph_date_to.date(), channels.ids
+            )
+        return [
+            {
+                "name": "Ocupación",
+                "labels": "Llegadas,Salidas,Fuera de Servicio",
+                "label": "",
+                "data": self._get_kpi_ocupation(kpi_counters),
+                "backgroundColor": "#FF5733,#B5BFBD,#00B5E2",
+                "borderColor": "#FF5733,#B5BFBD,#00B5E2",
+                "ratio": kpi_counters.get("total", 0),
+            },
+            {
+                "name": "Reservas por canal",
+                "labels": ",".join(channels.mapped("name")),
+                "label": "",
+                "data": self._get_channel_data(channels, channel_mix, "reservations"),
+                "backgroundColor": "#FF5733,#B5BFBD,#00B5E2",
+                "borderColor": "#FF5733,#B5BFBD,#00B5E2",
+                "ratio": sum(data["reservations"] for data in channel_mix.values()),
+            },
+            {
+                "name": "Income by channel",
+                "labels": ",".join(channels.mapped("name")),
+                "label": "",
+                "data": self._get_channel_data(channels, channel_mix, "income"),
+                "backgroundColor": "#FF5733,#B5BFBD,#00B5E2",
+                "borderColor": "#FF5733,#B5BFBD,#00B5E2",
+                "ratio": round(sum(data["income"] for data in channel_mix.values()), 2),
+            },
+            {
+                "name": "Cleaning score",
+                "labels": "Good,Acceptable,Bad",
+                "label": "",
+                "data": "54,24,14",
+                "backgroundColor": "#FF5733,#B5BFBD,#00B5E2",
+                "borderColor": "#FF5733,#B5BFBD,#00B5E2",
+                "ratio": 3.16,
+            },
+            {
+                "name": "Attention score",
+                "labels": "Good,Acceptable,Bad",
+                "label": "",
+                "data": "55,20,11",
+                "backgroundColor": "#FF5733,#B5BFBD,#00B5E2",
+                "borderColor": "#FF5733,#B5BFBD,#00B5E2",
+                "ratio": 4.05,
+            },
+            {
+                "name": "General score",
+                "labels": "Good,Acceptable,Bad",
+                "label": "",
+                "data": "64,34,4",
+                "backgroundColor": "#FF5733,#B5BFBD,#00B5E2",
+                "borderColor": "#FF5733,#B5BFBD,#00B5E2",
+                "ratio": 4.25,
+            },
+        ]
+
+    def _get_graph_dates(self):
+        graph_date_from = datetime.datetime.today()
+        graph_date_to = graph_date_from + datetime.timedelta(days=15)
+        return graph_date_from, graph_date_to
+
+    @http.route(
+        "/dashboard/arrivals_departures",
+        type="json",
+        auth="user",
+        csrf=False,
+        methods=["POST"],
+        website=True,
+    )
+    def dashboard_arrivals_departures(self, **post):
+        date = datetime.datetime.today()
+        property = request.env.user.pms_pwa_property_id
+        counters = property._get_dashboard_reservation_counters(date.date())
+        return {
+            "arrivals": self._get_arrivals_values(date, counters),
+            "departures": self._get_departures_values(date, counters),
+        }
+
+    @http.route(
+        "/dashboard/cash_bank",
+        type="json",
+        auth="user",
+        csrf=False,
+        methods=["POST"],
+        website=True,
+    )
+    def dashboard_cash_bank(self, **post):
+        """Balance and status of the first cash journal and today payments
+        of the first cash and bank journals
+        """
+        date = datetime.date.today()
+        property = request.env.user.pms_pwa_property_id
+        journals = property.sudo()._get_journals_by_type()
+        cash_journal_id = int(list(journals["cash"].keys())[0])
+        bank_journal_id = int(list(journals["bank"].keys())[0])
+        payments = self._get_journals_payments([cash_journal_id, bank_journal_id], date)
+        cash_balance = request.env["pms.cash.balance"]._get_balance(cash_journal_id)
+        return {
+            "cash_balance": cash_balance["balance"],
+            "cash": {
+                "status": cash_balance["status"],
+                "payments": payments.get(cash_journal_id, []),
+            },
+            "bank_journals": {
+                "payments": payments.get(bank_journal_id, []),
+            },
+        }
+
+    @http.route(
+        "/dashboard/rooms",
+        type="json",
+        auth="user",
+        csrf=False,
+        methods=["POST"],
+        website=True,
+    )
+    def dashboard_rooms(self, **post):
+        date = datetime.datetime.today()
+        property = request.env.user.pms_pwa_property_id
+        counters = request.env["pms.room.status.counter"]._get_counters(property.id)
+        nights = request.env["pms.calendar.occupancy"]._get_nights_by_type(
+            property.id, date.date()
+        )
+        counters["out_of_service"] = nights.pop("out", 0)
+        counters["taken"] = sum(nights.values())
+        counters["available"] = property.with_context(
+            checkin=date, checkout=date + datetime.timedelta(days=1)
+        ).availability
+        return {"rooms": self._get_rooms_values(date, counters)}
+
+    @http.route(
+        "/dashboard/evolutions",
+        type="json",
+        auth="user",
+        csrf=False,
+        methods=["POST"],
+        website=True,
+    )
+    def dashboard_evolutions(self, **post):
+        graph_date_from, graph_date_to = self._get_graph_dates()
+        return {
+            "evolutions": self._get_evolutions_values(
+                request.env.user.pms_pwa_property_id.id, graph_date_from, graph_date_to
+            )
+        }
+
+    @http.route(
+        "/dashboard/kpis",
+        type="json",
+        auth="user",
+        csrf=False,
+        methods=["POST"],
+        website=True,
+    )
+    def dashboard_kpis(self, **post):
+        graph_date_from, graph_date_to = self._get_graph_dates()
+        return {
+            "kpis": self._get_kpis_values(
+                request.env.user.pms_pwa_property_id.id, graph_date_from, graph_date_to
+            )
+        }
 
     def get_graph_labels(self, date_from, date_to):
         labels = []
@@ -315,212 +431,196 @@ class DashBoard(http.Controller):
             labels.append(date.strftime("%d %b"))
         return ",".join(labels)
 
-    def _get_graph_ocupation(self, date_from, date_to, pms_property_id):
-        domain = [
-            ("date", ">=", date_from),
-            ("date", "<=", date_to),
-            ("state", "!=", "cancel"),
-            ("reservation_id.reservation_type", "!=", "out"),
-            ("pms_property_id", "=", pms_property_id),
-        ]
-        ocupation_data = request.env["pms.reservation.line"].read_group(
-            domain,
-            ["date"],
-            ["date:day"],
-            lazy=False,
+    def _get_graph_data(self, period, kpi):
+        return ",".join(str(kpis[kpi]) for kpis in period["kpis"])
+
+    @http.route(
+        "/dashboard/compare",
+        type="json",
+        auth="user",
+        csrf=False,
+        methods=["POST"],
+        website=True,
+    )
+    def dashboard_compare(self, **post):
+        """Series of a KPI in the dates range and in the same range of the
+        previous years. The params are kpi (rooms_sold, out_of_service,
+        revenue, arrivals or departures), compare_with (number of previous
+        years, default 1, at most KPI_MAX_BASELINES), date_from and date_to
+        (user date format, default the dashboard graphs range, at most
+        KPI_MAX_DAYS days) and align_weekday (compare each day with the same
+        weekday of the previous years).
+        @return: Return dict with the graph labels and a series by period
+         {
+          "labels": "01 Nov,02 Nov,...",
+          "series": [{"label": "2021", "data": "1,2,..."}, ...],
+         }
+        """
+        kpi = post.get("kpi") or "rooms_sold"
+        if kpi not in KPI_FIELDS:
+            return {"result": False, "message": _("KPI no válido")}
+        try:
+            baselines = int(post.get("compare_with") or 1)
+        except (TypeError, ValueError):
+            return {"result": False, "message": _("Comparación no válida")}
+        baselines = min(max(baselines, 1), KPI_MAX_BASELINES)
+        graph_date_from, graph_date_to = self._get_graph_dates()
+        date_format = get_lang(request.env).date_format
+        if post.get("date_from") and post.get("date_to"):
+            try:
+                graph_date_from = datetime.datetime.strptime(
+                    post["date_from"], date_format
+                )
+                graph_date_to = datetime.datetime.strptime(post["date_to"], date_format)
+            except (TypeError, ValueError):
+                return {"result": False, "message": _("Fechas no válidas")}
+        if graph_date_from > graph_date_to:
+            return {
+                "result": False,
+                "message": _("La fecha de inicio es posterior a la de fin"),
+            }
+        if (graph_date_to - graph_date_from).days >= KPI_MAX_DAYS:
+            return {
+                "result": False,
+                "message": _("El rango no puede superar %s días") % KPI_MAX_DAYS,
+            }
+        periods = request.env["pms.dashboard.kpi"]._get_comparison(
+            request.env.user.pms_pwa_property_id.id,
+            graph_date_from.date(),
+            graph_date_to.date(),
+            baselines=baselines,
+            align_weekday=bool(post.get("align_weekday")),
         )
-        mapped_data = dict([(data['date:day'], data['__count']) for data in ocupation_data])
-        graph_data = ",".join(map(str, mapped_data.values()))
-        return graph_data
-
-    def _get_graph_revenue(self, date_from, date_to, pms_property_id):
-        domain = [
-            ("checkout", ">=", date_from),
-            ("checkout", "<=", date_to),
-            ("state", "!=", "cancel"),
-            ("reservation_type", "not in", ("out", "staff")),
-            ("pms_property_id", "=", pms_property_id),
+        return {
+            "labels": self.get_graph_labels(graph_date_from, graph_date_to),
+            "series": [
+                {
+                    "label": period["date_from"].strftime("%Y"),
+                    "date_from": period["date_from"].strftime(date_format),
+                    "date_to": period["date_to"].strftime(date_format),
+                    "data": self._get_graph_data(period, kpi),
+                }
+                for period in periods
+            ],
+        }
+
+    def _get_kpi_ocupation(self, kpi_counters):
+        data = [
+            kpi_counters.get("arrivals", 0),
+            kpi_counters.get("departures", 0),
+            kpi_counters.get("out_of_service", 0),
         ]
-        revenues_data = request.env["pms.reservation"].read_group(
-            domain,
-            ["price_room_services_set:sum"],
-            ["checkout:day"],
-            lazy=False,
-        )
-        mapped_data = dict([(data['checkout:day'], data['price_room_services_set']) for data in revenues_data])
-        graph_data = ",".join(map(str, mapped_data.values()))
-        return graph_data
-
-    def _get_kpi_ocupation(self, date_from, date_to, pms_property_id):
-        data = []
-        data.append(request.env["pms.reservation"].search_count([
-            ("checkin", ">=", date_from),
-            ("checkin", "<=", date_to),
-            ("state", "!=", "cancel"),
-            ("reservation_type", "!=", "out"),
-            ("pms_property_id", "=", pms_property_id),
-        ]))
-        data.append(request.env["pms.reservation"].search_count([
-            ("checkout", ">=", date_from),
-            ("checkout", "<=", date_to),
-            ("state", "!=", "cancel"),
-            ("reservation_type", "!=", "out"),
-            ("pms_property_id", "=", pms_property_id),
-        ]))
-        data.append(request.env["pms.reservation"].search_count([
-            ("state", "!=", "cancel"),
-            ("reservation_type", "=", "out"),
-            ("pms_property_id", "=", pms_property_id),
-            "|",
-            "&",
-            ("checkin", ">=", date_from),
-            ("checkin", "<=", date_to),
-            "&",
-            ("checkout", ">=", date_from),
-            ("checkout", "<=", date_to),
-        ]))
         return ",".join(map(str, data))
 
-    def _get_kpi_ocupation_score(self, date_from, date_to, pms_property_id):
-        return request.env["pms.reservation"].search_count([
-            ("state", "!=", "cancel"),
-            ("pms_property_id", "=", pms_property_id),
-            "|",
-            "&",
-            ("checkin", ">=", date_from),
-            ("checkin", "<=", date_to),
-            "&",
-            ("checkout", ">=", date_from),
-            ("checkout", "<=", date_to),
-        ])
-
-    def _get_channel_reservations(self, channels, date_from, date_to, pms_property_id):
-        domain = [
-            ("checkin", ">=", date_from),
-            ("checkin", "<=", date_to),
-            ("state", "!=", "cancel"),
-            ("reservation_type", "!=", "out"),
-            ("pms_property_id", "=", pms_property_id),
+    def _get_channel_data(self, channels, channel_mix, key):
+        channels_data = [
+            channel_mix.get(channel.id, {}).get(key, 0) for channel in channels
         ]
-        reservations = request.env["pms.reservation"].search(domain)
-        channels_data = []
-        for channel in channels:
-            channels_data.append(len(reservations.filtered(lambda r: r.channel_type_id.id == channel.id)))
         return ",".join(map(str, channels_data))
 
-    def _get_channel_reservations_score(self, channels, date_from, date_to, pms_property_id):
-        domain = [
-            ("checkin", ">=", date_from),
-            ("checkin", "<=", date_to),
-            ("state", "!=", "cancel"),
-            ("reservation_type", "!=", "out"),
-            ("channel_type_id", "in", channels.ids),
-            ("pms_property_id", "=", pms_property_id),
+    @http.route(
+        "/dashboard/channel_mix",
+        type="json",
+        auth="user",
+        csrf=False,
+        methods=["POST"],
+        website=True,
+    )
+    def dashboard_channel_mix(self, **post):
+        """Reservations and income by sale channel of the reservations arriving
+        between date_from and date_to (user date format)
+        @return: Return list of dicts with the channels mix
+         [
+          {"id": id, "name": name, "reservations": count, "income": amount},
+          ...
+         ]
+        """
+        date_format = get_lang(request.env).date_format
+        date_from = datetime.datetime.strptime(
+            post.get("date_from"), date_format
+        ).date()
+        date_to = datetime.datetime.strptime(post.get("date_to"), date_format).date()
+        pms_property_id = request.env.user.pms_pwa_property_id.id
+        if post.get("pms_property_id"):
+            pms_property_id = int(post["pms_property_id"])
+        channels = request.env["pms.sale.channel"].search(
+            [
+                "|",
+                ("pms_property_ids", "in", pms_property_id),
+                ("pms_property_ids", "=", False),
+            ]
+        )
+        channel_mix = (
+            request.env["pms.property"]
+            .browse(pms_property_id)
+            ._get_channel_mix(date_from, date_to, channels.ids)
+        )
+        return [
+            {
+                "id": channel.id,
+                "name": channel.name,
+                "reservations": channel_mix.get(channel.id, {}).get("reservations", 0),
+                "income": channel_mix.get(channel.id, {}).get("income", 0.0),
+            }
+            for channel in channels
         ]
-        return request.env["pms.reservation"].search_count(domain)
 
-    def _get_payments(self, journal_id, date):
-        payments = (
+    def _get_journals_payments(self, journal_ids, date, offset=0, limit=None):
+        return (
             request.env["account.payment"]
             .sudo()
-            .search(
-                [
-                    ("journal_id", "=", journal_id),
-                    ("date", "=", date),
-                ]
-            )
-        )
-        payment_vals = []
-        for line in payments:
-            payment_vals.append({
-                "id": line.id,
-                "partner_id": line.partner_id and line.partner_id.id,
-                "partner_name": line.partner_id and line.partner_id.name,
-                "simple_name": line.ref or "No indicado",
-                "name": line.ref or "No indicado" + " el " + line.create_date.strftime("%d %b - %H:%M") + " (" + line.create_uid.name + ")",
-                "amount": line.amount if line.payment_type == "inbound" else -line.amount,
-            })
-        return payment_vals
-
-    def _get_cash_balance(self, journal_id):
-        statement = (
-            request.env["account.bank.statement"]
-            .sudo()
-            .search(
-                [
-                    ("journal_id", "=", journal_id),
-                    ("state", "=", "open"),
-                    ("date", "=", fields.Date.today()),
-                ], limit=1
-            )
+            ._get_payments_listing(journal_ids, date, offset=offset, limit=limit)
         )
-        if not statement:
-            statement = (
-                request.env["account.bank.statement"]
-                .sudo()
-                .search(
-                    [
-                        ("journal_id", "=", journal_id),
-                    ], limit=1
-                )
+
+    def _get_payments(self, journal_id, date, offset=0, limit=None):
+        return self._get_journals_payments(
+            [journal_id], date, offset=offset, limit=limit
+        )[journal_id]
+
+    @http.route(
+        "/dashboard/payments",
+        type="json",
+        auth="user",
+        csrf=False,
+        methods=["POST"],
+        website=True,
+    )
+    def dashboard_payments(self, **post):
+        """Payments of several journals in a date, paged with offset and limit
+        @return: Return dict with the payments of each journal
+         {"payments": {journal_id: [payment_vals, ...], ...}}
+        """
+        journal_ids = [int(journal_id) for journal_id in post.get("journal_ids", [])]
+        journal_date = datetime.datetime.strptime(
+            post.get("journal_date"), get_lang(request.env).date_format
+        ).date()
+        return {
+            "payments": self._get_journals_payments(
+                journal_ids,
+                journal_date,
+                offset=int(post.get("offset") or 0),
+                limit=int(post["limit"]) if post.get("limit") else None,
             )
-        return statement.balance_end_real if statement.state != "open" else statement.balance_end
+        }
 
     def _get_journals_cash(self, pms_property_id):
-
-        journals = (
-            request.env["account.journal"]
+        return (
+            request.env["pms.property"]
+            .browse(pms_property_id)
             .sudo()
-            .search(
-                [
-                    ("type", "=", "cash"),
-                    ("pms_property_ids", "in", pms_property_id),
-                ]
-            )
+            ._get_journals_by_type()["cash"]
         )
-        data_journals = {}
-        if not journals:
-            data_journals["0"] = ""
-            return data_journals
-        for journal in journals:
-            data_journals[str(journal.id)] = journal.name
-        return data_journals
 
     def _get_journals_bank(self, pms_property_id):
-        journals = (
-            request.env["account.journal"]
+        return (
+            request.env["pms.property"]
+            .browse(pms_property_id)
             .sudo()
-            .search(
-                [
-                    ("type", "=", "bank"),
-                    ("pms_property_ids", "in", pms_property_id),
-                ]
-            )
+            ._get_journals_by_type()["bank"]
         )
-        data_journals = {}
-        if not journals:
-            data_journals["0"] = ""
-            return data_journals
-        for journal in journals:
-            data_journals[str(journal.id)] = journal.name
-        return data_journals
 
     def _get_status_journal(self, journal_id):
-        statement = (
-            request.env["account.bank.statement"]
-            .sudo()
-            .search(
-                [
-                    ("journal_id", "=", journal_id),
-                    ("date", "=", datetime.datetime.today()),
-                    ("state", "=", "open"),
-                ]
-            )
-        )
-        if statement:
-            return "close"
-        else:
-            return "open"
+        return request.env["pms.cash.balance"]._get_balance(journal_id)["status"]
 
     @http.route(
         "/dashboard/cash_journal",
@@ -532,7 +632,7 @@ class DashBoard(http.Controller):
     )
     def dashboard_cash_journal(self, **post):
         # en post tiene que llegar diario y fecha
-        print(post)
+        log_payload("dashboard_cash_journal", post)
         journal_id = int(post.get("journal_id"))
         journal_date = datetime.datetime.strptime(
             post.get("journal_date"), get_lang(request.env).date_format
@@ -563,7 +663,12 @@ class DashBoard(http.Controller):
                 "list": self._get_journals_cash(pms_property_id),
                 "selected": journal_id,
                 "date": journal_date,
-                "payments": self._get_payments(journal_id, journal_date),
+                "payments": self._get_payments(
+                    journal_id,
+                    journal_date,
+                    offset=int(post.get("offset") or 0),
+                    limit=int(post["limit"]) if post.get("limit") else None,
+                ),
             },
         })
         return values
@@ -578,7 +683,7 @@ class DashBoard(http.Controller):
     )
     def dashboard_bank_journals(self, **post):
         # en post tiene que llegar diario y fecha
-        print(post)
+        log_payload("dashboard_bank_journals", post)
         journal_id = int(post.get("journal_id"))
         journal_date = datetime.datetime.strptime(
             post.get("journal_date"), get_lang(request.env).date_format
@@ -590,7 +695,12 @@ class DashBoard(http.Controller):
                 "list": self._get_journals_bank(pms_property_id),
                 "selected": journal_id,
                 "date": journal_date,
-                "payments": self._get_payments(journal_id, journal_date),
+                "payments": self._get_payments(
+                    journal_id,
+                    journal_date,
+                    offset=int(post.get("offset") or 0),
+                    limit=int(post["limit"]) if post.get("limit") else None,
+                ),
             },
         })
         return values
@@ -5,19 +5,22 @@
 from inspect import isdatadescriptor
 import logging
 import json
-import pprint
 from calendar import monthrange
 from datetime import timedelta
 import datetime
+import time
 from itertools import groupby
 
 from odoo import _, fields, http
 from odoo.http import request
 from odoo.tools.misc import get_lang
 
+from ..calendar_cache import calendar_cache
+from ..pwa_debug import log_payload
+
 RESET_CALENDAR_HOURS = 1
+CALENDAR_SESSION_KEY = "pms_pwa_calendar"
 
-pp = pprint.PrettyPrinter(indent=4)
 
 _logger = logging.getLogger(__name__)
 
@@ -27,6 +30,106 @@ def defaultconverter(o):
         return o.__str__()
 
 
+def headers_to_columnar(headers):
+    """Encode calendar headers ({date: {row: metrics}}) in columns:
+    the dates and rows (room types) are sent once and every metric is a
+    flat list with the value of each date and row, in date major order
+    (value index = date index * len(rows) + row index).
+    Headers with a single value by cell (prices) are sent as the "value"
+    metric. Missing metrics in a row are sent as None.
+    """
+    dates = sorted(headers)
+    rows = []
+    metrics = []
+    for date in dates:
+        for row, cell in headers[date].items():
+            if row not in rows:
+                rows.append(row)
+            if isinstance(cell, dict):
+                metrics.extend(metric for metric in cell if metric not in metrics)
+    columns = {metric: [] for metric in metrics or ["value"]}
+    for date in dates:
+        date_headers = headers[date]
+        for row in rows:
+            cell = date_headers.get(row)
+            if not isinstance(cell, dict):
+                cell = {"value": cell}
+            for metric, column in columns.items():
+                column.append(cell.get(metric))
+    return {
+        "columnar": True,
+        "dates": dates,
+        "rows": rows,
+        "metrics": columns,
+    }
+
+
+class CalendarState:
+    """Calendar state of the user in a property (start date, pricelist and
+    availability plan), kept in the http session so calendar loads don't
+    write to the database. The state expires after RESET_CALENDAR_HOURS
+    without use. The expiration is only moved forward on a load when less
+    than half of the window is left, so most loads don't touch the session.
+    """
+
+    def __init__(self, pms_property_id):
+        self.pms_property_id = request.env["pms.property"].browse(pms_property_id)
+        state = request.session.get(CALENDAR_SESSION_KEY, {}).get(
+            str(pms_property_id), {}
+        )
+        expire = state.get("expire", 0)
+        if expire < time.time():
+            state = {}
+        self._state = state
+        if state and expire - time.time() < RESET_CALENDAR_HOURS * 3600 / 2:
+            self._save()
+
+    def _save(self, **values):
+        states = dict(request.session.get(CALENDAR_SESSION_KEY, {}))
+        self._state = dict(
+            self._state, expire=time.time() + RESET_CALENDAR_HOURS * 3600, **values
+        )
+        states[str(self.pms_property_id.id)] = self._state
+        # Reassigned to flag the session as modified
+        request.session[CALENDAR_SESSION_KEY] = states
+
+    def _set(self, key, value):
+        if self._state.get(key) != value:
+            self._save(**{key: value})
+
+    @property
+    def date_start(self):
+        return fields.Date.to_date(self._state.get("date_start"))
+
+    @date_start.setter
+    def date_start(self, date_start):
+        self._set("date_start", fields.Date.to_string(date_start))
+
+    @property
+    def select_pricelist(self):
+        return (
+            request.env["product.pricelist"]
+            .browse(self._state.get("select_pricelist"))
+            .exists()
+        )
+
+    @select_pricelist.setter
+    def select_pricelist(self, pricelist):
+        self._set("select_pricelist", pricelist.id)
+
+    @property
+    def select_availability_plan(self):
+        return (
+            request.env["pms.availability.plan"]
+            .browse(self._state.get("select_availability_plan"))
+            .exists()
+        )
+
+    @select_availability_plan.setter
+    def select_availability_plan(self, availability_plan):
+        self._set("select_availability_plan", availability_plan.id)
+
+
 class PmsCalendar(http.Controller):
 
     @http.route(
@@ -37,7 +140,7 @@ class PmsCalendar(http.Controller):
         website=True,
     )
     def reduced_calendar(self, **post):
-        print("http ---> ", post)
+        log_payload("reduced_calendar", post)
         values = self._get_calendar_values(post)
         return http.request.render(
             "pms_pwa.roomdoo_reduced_calendar_page",
@@ -53,7 +156,7 @@ class PmsCalendar(http.Controller):
         website=True,
     )
     def property_calendar(self, **post):
-        print("json ---> ", post)
+        log_payload("property_calendar", post)
         return self._get_calendar_values(post)
 
     def _get_calendar_values(self, post):
@@ -70,29 +173,38 @@ class PmsCalendar(http.Controller):
 
         allowed_availability_plans, select_availability_plan_id = self._get_avail_plans(calendar_config, post)
 
-        general_headers = self._get_general_headers(
-            dates=date_list,
-            pms_property_id=pms_property_id,
-            room_type_ids=room_types.ids,
-        )
-        price_headers = self._get_price_headers(
-            dates=date_list,
-            pms_property_id=pms_property_id,
-            pricelist_id=select_pricelist_id,
-            room_type_ids=room_types.ids,
-        )
-        rule_headers = self._get_rules_headers(
-            dates=date_list,
-            pms_property_id=pms_property_id,
-            pricelist_id=select_pricelist_id,
-            room_type_ids=room_types.ids,
-        )
+        # On delta mode only the dates not already held by the client are sent
+        delta_dates = self._get_delta_dates(date_list, post)
+        header_dates = date_list if delta_dates is False else delta_dates
+
+        general_headers = {}
+        price_headers = {}
+        rule_headers = {}
+        if header_dates:
+            general_headers = self._get_general_headers(
+                dates=header_dates,
+                pms_property_id=pms_property_id,
+                room_type_ids=room_types.ids,
+            )
+            price_headers = self._get_price_headers(
+                dates=header_dates,
+                pms_property_id=pms_property_id,
+                pricelist_id=select_pricelist_id,
+                room_type_ids=room_types.ids,
+            )
+            rule_headers = self._get_rules_headers(
+                dates=header_dates,
+                pms_property_id=pms_property_id,
+                pricelist_id=select_pricelist_id,
+                room_type_ids=room_types.ids,
+            )
+        total_rooms = room_types._get_total_rooms_by_room_type(pms_property_id)
         rooms_list = []
         for room_type in room_types:
             rooms_list.append({
                 'id': room_type.id,
                 'name': room_type.name,
-                'total_rooms': room_type._get_total_rooms(pms_property_id),
+                'total_rooms': total_rooms[room_type.id],
                 'default_code': room_type.default_code,
             })
         result = {
@@ -111,7 +223,12 @@ class PmsCalendar(http.Controller):
             "price_headers": price_headers,
             "rule_headers": rule_headers,
         }
-        # pp.pprint(result)
+        if post.get("columnar"):
+            for headers_key in ("general_headers", "price_headers", "rule_headers"):
+                result[headers_key] = headers_to_columnar(result[headers_key])
+        if delta_dates is not False:
+            result["delta"] = True
+            result["delta_dates"] = delta_dates
         return result
 
     @http.route(
@@ -123,119 +240,82 @@ class PmsCalendar(http.Controller):
         website=True,
     )
     def calendar_general_headers(self, **post):
-        return self._get_general_headers(
+        headers = self._get_general_headers(
             dates=[item for item in eval(post.get("range_date"))],
             pms_property_id=int(post.get("pms_property_id")),
             room_type_ids=[int(item) for item in post.get("room_type_ids")] if post.get("room_type_ids") else False,
         )
+        if post.get("columnar"):
+            return headers_to_columnar(headers)
+        return headers
 
     def _get_general_headers(self, dates, pms_property_id, room_type_ids=False):
-        # Funtion to group by date in query sql result
-        def date_func(k):
-            return k[0]
+        return calendar_cache.get_or_compute(
+            request.env,
+            "general",
+            (pms_property_id, tuple(dates), tuple(room_type_ids or ())),
+            lambda: self._compute_general_headers(
+                dates, pms_property_id, room_type_ids
+            ),
+        )
 
-        # Funtion to group by room type in query sql result
-        def room_type_func(k):
-            return k[1]
+    def _compute_general_headers(self, dates, pms_property_id, room_type_ids=False):
         pms_property = request.env["pms.property"].browse(pms_property_id)
         if not room_type_ids:
             room_types = pms_property.room_ids.room_type_id
         else:
             room_types = request.env["pms.room.type"].browse(room_type_ids)
-
-        # Prepare data
-        request.env.cr.execute(
-            """
-            SELECT DATE(night.date), pms_room.room_type_id, reservation.reservation_type, count(night.id)
-            FROM    pms_reservation_line  night
-                    LEFT JOIN pms_reservation reservation
-                        ON reservation.id = night.reservation_id
-                    LEFT JOIN pms_room
-                        ON pms_room.id = night.room_id
-            WHERE   (night.pms_property_id = %s)
-                AND (night.date in %s)
-                AND (pms_room.room_type_id in %s)
-                AND (night.occupies_availability = TRUE)
-                AND (night.room_id is not NULL)
-            GROUP BY DATE(night.date), pms_room.room_type_id, reservation.reservation_type
-            """,
-            (
-                pms_property_id,
-                tuple(dates),
-                tuple(room_types.ids),
-            )
+        total_rooms = room_types._get_total_rooms_by_room_type(pms_property_id)
+        property_total_rooms = pms_property._get_total_rooms()
+        overnight_room_type_ids = set(room_types.filtered("overnight_room").ids)
+
+        # Prepare data: {date: {room_type_id: [reservations_count, outs_count]}}
+        occupancy = {}
+        occupancy_rows = request.env["pms.calendar.occupancy"]._get_occupancy(
+            pms_property_id, min(dates), max(dates), room_types.ids
         )
-        avail_result = request.env.cr.fetchall()
-        avail_result = sorted(avail_result, key=date_func)
+        for occupancy_date, room_type_id, reservation_type, nights in occupancy_rows:
+            counts = occupancy.setdefault(occupancy_date, {}).setdefault(
+                room_type_id, [0, 0]
+            )
+            counts[1 if reservation_type == "out" else 0] += nights
+
         dict_result = {}
-        for avail_date, data in groupby(avail_result, date_func):
+        for date in dates:
+            s_date = date.strftime("%Y-%m-%d")
+            date_occupancy = occupancy.get(date, {})
             total_res_count = 0
             total_out_count = 0
-            s_avail_date = avail_date.strftime("%Y-%m-%d")
-            dict_result[s_avail_date] = {}
-            data = list(filter(lambda x: x[1] is not None, data))
-            data = sorted(data, key=room_type_func)
-            for room_type_id, vals in groupby(data, room_type_func):
-                room_type = request.env["pms.room.type"].browse(room_type_id)
-                vals = list(vals)
-                res_count = sum([x[3] for x in vals if x[2] != 'out'])
-                out_count = sum([x[3] for x in vals if x[2] == 'out'])
-                total_rooms = room_type._get_total_rooms(pms_property.id)
-                num_avail = room_type._get_total_rooms(pms_property.id) - (res_count + out_count)
-                dict_result[s_avail_date][room_type_id] = {
-                    'reservations_count': res_count,
-                    'outs_count': out_count,
-                    'num_avail': num_avail,
-                    'reservations_percent': int((res_count * 100) / total_rooms),
-                    'outs_percent': int((out_count * 100) / total_rooms),
-                    'avail_percent': int((num_avail * 100) / total_rooms),
+            dict_result[s_date] = {}
+            for room_type_id in room_types.ids:
+                res_count, out_count = date_occupancy.get(room_type_id, (0, 0))
+                room_type_total = total_rooms[room_type_id]
+                num_avail = room_type_total - (res_count + out_count)
+                room_type_total = room_type_total or 1
+                dict_result[s_date][room_type_id] = {
+                    "reservations_count": res_count,
+                    "outs_count": out_count,
+                    "num_avail": num_avail,
+                    "reservations_percent": int((res_count * 100) / room_type_total),
+                    "outs_percent": int((out_count * 100) / room_type_total),
+                    "avail_percent": int((num_avail * 100) / room_type_total),
                 }
-                if room_type.overnight_room:
+                if room_type_id in overnight_room_type_ids:
                     total_res_count += res_count
                     total_out_count += out_count
-            # complete estructure to avoid room types
-            for room_type in room_types:
-                if room_type.id not in dict_result[s_avail_date]:
-                    dict_result[s_avail_date][room_type.id] = {
-                        'reservations_count': 0,
-                        'outs_count': 0,
-                        'num_avail': room_type._get_total_rooms(pms_property.id),
-                        'reservations_percent': 0,
-                        'outs_percent': 0,
-                        'avail_percent': 100,
-                    }
-            dict_result[s_avail_date]["property_header"] = {
-                'reservations_count': total_res_count,
-                'outs_count': total_out_count,
-                'percent_occupied': int((total_res_count + total_out_count) * 100 / pms_property._get_total_rooms()),
-                'num_avail': pms_property._get_total_rooms() - (total_res_count + total_out_count),
-                'reservations_percent': 0,
-                'outs_percent': 0,
-                'avail_percent': 100,
+            dict_result[s_date]["property_header"] = {
+                "reservations_count": total_res_count,
+                "outs_count": total_out_count,
+                "percent_occupied": int(
+                    (total_res_count + total_out_count)
+                    * 100
+                    / (property_total_rooms or 1)
+                ),
+                "num_avail": property_total_rooms - (total_res_count + total_out_count),
+                "reservations_percent": 0,
+                "outs_percent": 0,
+                "avail_percent": 100,
             }
-        # complete estructure to avoid dates
-        for date in dates:
-            s_date = date.strftime("%Y-%m-%d")
-            if s_date not in dict_result:
-                dict_result[s_date] = {}
-                dict_result[s_date]["property_header"] = {
-                    'reservations_count': 0,
-                    'outs_count': 0,
-                    'percent_occupied': 0,
-                    'num_avail': pms_property._get_total_rooms(),
-                    'reservations_percent': 0,
-                    'outs_percent': 0,
-                    'avail_percent': 100,
-                }
-                for room_type in room_types:
-                    dict_result[s_date][room_type.id] = {
-                        'reservations_count': 0,
-                        'outs_count': 0,
-                        'num_avail': room_type._get_total_rooms(pms_property.id),
-                        'reservations_percent': 0,
-                        'outs_percent': 0,
-                        'avail_percent': 100,
-                    }
         return dict_result
 
     @http.route(
@@ -247,14 +327,35 @@ class PmsCalendar(http.Controller):
         website=True,
     )
     def calendar_price_headers(self, **post):
-        return self._get_price_headers(
+        headers = self._get_price_headers(
             dates=[item for item in eval(post.get("range_date"))],
             pms_property_id=int(post.get("pms_property_id")),
             pricelist_id=int(post.get("pricelist_id")),
             room_type_ids=[int(item) for item in post.get("room_type_ids")] if post.get("room_type_ids") else False,
         )
+        if post.get("columnar"):
+            return headers_to_columnar(headers)
+        return headers
 
     def _get_price_headers(self, dates, pms_property_id, pricelist_id, room_type_ids=False):
+        return calendar_cache.get_or_compute(
+            request.env,
+            "price",
+            (
+                pms_property_id,
+                pricelist_id,
+                datetime.date.today(),
+                tuple(dates),
+                tuple(room_type_ids or ()),
+            ),
+            lambda: self._compute_price_headers(
+                dates, pms_property_id, pricelist_id, room_type_ids
+            ),
+        )
+
+    def _compute_price_headers(
+        self, dates, pms_property_id, pricelist_id, room_type_ids=False
+    ):
         pms_property = request.env["pms.property"].browse(pms_property_id)
         pricelist = request.env["product.pricelist"].browse(pricelist_id)
         if not room_type_ids:
@@ -263,17 +364,17 @@ class PmsCalendar(http.Controller):
             room_types = request.env["pms.room.type"].browse(room_type_ids)
 
         # Prepare data
+        room_type_by_product = {
+            room_type.product_id.id: room_type.id for room_type in room_types
+        }
+        prices = pricelist._compute_price_rule_matrix(
+            room_types.product_id, dates, pms_property_id
+        )
         dict_result = {}
         for date in dates:
-            a_date = date.strftime("%Y-%m-%d")
-            products = [(r, 1, False) for r in room_types.product_id]
-            date_prices = pricelist.with_context(
-                quantity=1,
-                consumption_date=date,
-                property=pms_property_id,
-            )._compute_price_rule(products, datetime.datetime.today())
-            dict_result[a_date] = {
-                request.env["product.product"].browse(k).room_type_id.id: not v[0].is_integer() and v[0] or int(v[0]) for k, v in date_prices.items()
+            dict_result[date.strftime("%Y-%m-%d")] = {
+                room_type_by_product[k]: not v.is_integer() and v or int(v)
+                for k, v in prices[date].items()
             }
         return dict_result
 
@@ -286,14 +387,29 @@ class PmsCalendar(http.Controller):
         website=True,
     )
     def calendar_rules_headers(self, **post):
-        return self._get_rules_headers(
+        headers = self._get_rules_headers(
             dates=[item for item in eval(post.get("range_date"))],
             pms_property_id=int(post.get("pms_property_id")),
             pricelist_id=int(post.get("pricelist_id")),
             room_type_ids=[int(item) for item in post.get("room_type_ids")] if post.get("room_type_ids") else False,
         )
+        if post.get("columnar"):
+            return headers_to_columnar(headers)
+        return headers
 
     def _get_rules_headers(self, dates, pms_property_id, pricelist_id, room_type_ids=False):
+        return calendar_cache.get_or_compute(
+            request.env,
+            "rules",
+            (pms_property_id, pricelist_id, tuple(dates), tuple(room_type_ids or ())),
+            lambda: self._compute_rules_headers(
+                dates, pms_property_id, pricelist_id, room_type_ids
+            ),
+        )
+
+    def _compute_rules_headers(
+        self, dates, pms_property_id, pricelist_id, room_type_ids=False
+    ):
         pms_property = request.env["pms.property"].browse(pms_property_id)
         pricelist = request.env["product.pricelist"].browse(pricelist_id)
         if not room_type_ids:
@@ -441,7 +557,6 @@ class PmsCalendar(http.Controller):
                     )
             else:
                 confirmation_mens = ("Ningún cambio detectado")
-            print("return --->")
             return {"result": "success", "message": confirmation_mens, "date": post["date"], "reservation": post["id"], "room": post["room"]}
         else:
             try:
@@ -466,183 +581,169 @@ class PmsCalendar(http.Controller):
     )
     def calendar_list(self, date=False, search="", **post):
         # TODO: Evitar el uso de eval
-        print("post ---> ", post)
+        log_payload("calendar_list", post)
         dates = [item for item in eval(post.get("range_date"))]
-        from_date = min(dates)
-        to_date = max(dates)
+        delta = bool(post.get("delta") and post.get("current_range_date"))
+        if delta:
+            # Only build the dates of the new window the client doesn't hold
+            current_dates = set(eval(post.get("current_range_date")))
+            dates = [item for item in dates if item not in current_dates]
+            if not dates:
+                return {
+                    "reservations": [],
+                    "next_cursor": False,
+                    "delta": True,
+                    "delta_dates": [],
+                }
         pms_property_id = int(post.get("pms_property_id"))
         pms_property = request.env["pms.property"].browse(pms_property_id)
         company = pms_property.company_id
-        Reservation = request.env["pms.reservation"]
-        ReservationLine = request.env["pms.reservation.line"]
-        domain = [
-            ("date", ">=", from_date),
-            ("date", "<=", to_date),
-            ("state", "!=", "cancel"),
-            ("pms_property_id", "=", pms_property_id),
-        ]
-        reservation_lines = ReservationLine.with_company(company).search(domain)
-        reservations = Reservation.browse(reservation_lines.mapped("reservation_id.id"))
+        rooms, next_cursor = self._get_rooms_page(
+            company,
+            pms_property_id,
+            cursor=post.get("cursor"),
+            limit=int(post.get("limit")) if post.get("limit") else False,
+        )
+        ocupation_by_room = self._get_rooms_ocupation(pms_property, rooms, dates)
+        date_format = get_lang(request.env).date_format
+        housekeeping_states = dict(
+            request.env["pms.room"]
+            ._fields["housekeeping_state"]
+            ._description_selection(request.env)
+        )
         values = {}
         # REVIEW: revisar estructura
         values["reservations"] = []
-        room_ids = (
-            request.env["pms.room"]
-            .with_company(company).search(
-                [
-                    ("pms_property_id", "=", pms_property_id),
-                ], order="sequence"
-            )
-            .ids
-        )
-        for room_id in room_ids:
-            free_dates = dates.copy()
-            room = request.env["pms.room"].browse(room_id)
-            rooms_reservation_values = []
-            for reservation in reservations.filtered(
-                lambda r: r.preferred_room_id.id == room_id
-            ):
-                min_reservation_date = min(
-                    reservation.reservation_line_ids.filtered(
-                        lambda d: d.date in dates
-                    ).mapped("date")
-                )
-                max_reservation_date = max(
-                    reservation.reservation_line_ids.filtered(
-                        lambda d: d.date in dates
-                    ).mapped("date")
-                )
-                for d in reservation.reservation_line_ids.mapped("date"):
-                    if d in free_dates:
-                        free_dates.remove(d)
-                rooms_reservation_values.append(
-                    {
-                        "date": min_reservation_date,
-                        "reservation_info": {
-                            "id": reservation.id,
-                            "partner_name": reservation.partner_name,
-                            "img": "/web/image/pms.reservation/"
-                            + str(reservation.id)
-                            + "/partner_image_128",
-                            "price": round(reservation.folio_pending_amount, 2),
-                            "status": reservation.color_state,
-                            "icon_payment": reservation.icon_payment,
-                            "nigths": (
-                                max_reservation_date
-                                + timedelta(days=1)
-                                - min_reservation_date
-                            ).days,
-                            "days": (
-                                max_reservation_date
-                                + timedelta(days=1)
-                                - min_reservation_date
-                            ).days
-                            + 1,
-                            "checkin_in_range": False
-                            if min_reservation_date == reservation.checkin
-                            else True,
-                            "checkout_in_range": False
-                            if max_reservation_date + timedelta(days=1)
-                            != reservation.checkout
-                            else True,
-                        },
-                    }
-                )
-            splitted_reservations_lines = reservations.filtered(
-                lambda r: r.splitted
-            ).reservation_line_ids.filtered(
-                lambda l: l.room_id.id == room_id
-                and l.date in dates
-            )
-            used_line_ids = []
-            for split in splitted_reservations_lines.sorted("date"):
-                if split.id in used_line_ids:
-                    continue
-                main_split = False
-                reservation = split.reservation_id
-                nights = 0
-                if split.date == reservation.checkin:
-                    main_split = True
-                for date_iterator in [
-                    split.date + timedelta(days=x)
-                    for x in range(0, (reservation.checkout - split.date).days)
-                ]:
-                    line = reservation.reservation_line_ids.filtered(
-                        lambda l: l.date == date_iterator and l.room_id == split.room_id
-                    )
-                    if line:
-                        nights += 1
-                        used_line_ids.append(line.id)
-                        # splitted_reservations_lines -= line
-                        free_dates.remove(line.date)
-                rooms_reservation_values.append(
-                    {
-                        "splitted": True,
-                        "main_split": main_split,
-                        "date": split.date,
-                        "reservation_info": {
-                            "id": reservation.id,
-                            "partner_name": "Partida! " + reservation.partner_name
-                            if main_split
-                            else "Partida! " + reservation.rooms,
-                            "img": "/web/image/pms.reservation/"
-                            + str(reservation.id)
-                            + "/partner_image_128",
-                            "price": round(reservation.folio_pending_amount, 2)
-                            if main_split
-                            else '',
-                            "status": reservation.color_state,
-                            "icon_payment": reservation.icon_payment,
-                            "nigths": nights,
-                            "days": nights + 1,
-                            "checkin_in_range": True,
-                            "checkout_in_range": True,
-                        },
-                    }
-                )
-            for day in free_dates:
-                rooms_reservation_values.append(
-                    {
-                        "date": day,
-                        "reservation_info": False,
-                    }
-                )
-            rooms_reservation_values = sorted(
-                rooms_reservation_values, key=lambda item: item["date"]
-            )
+        for room in rooms:
+            rooms_reservation_values = ocupation_by_room[room.id]
             for item in rooms_reservation_values:
-                item["date"] = item["date"].strftime(get_lang(request.env).date_format)
+                item["date"] = item["date"].strftime(date_format)
             values["reservations"].append(
                 {
                     "room": {
                         "id": room.id,
                         "room_type_id": room.room_type_id.id,
                         "name": room.display_name,
-                        "status": "Limpia",  # TODO
+                        "status": housekeeping_states[room.housekeeping_state],
                     },
                     "ocupation": rooms_reservation_values,
                 }
             )
-        pp.pprint(values)
+        values["next_cursor"] = next_cursor
+        if delta:
+            values["delta"] = True
+            values["delta_dates"] = [item.strftime(date_format) for item in dates]
         return values
 
+    def _get_rooms_page(self, company, pms_property_id, cursor=False, limit=False):
+        """Return the rooms of the property ordered by sequence, starting
+        after cursor and up to limit rooms, and the cursor of the next page.
+        The cursor is the "sequence,id" of the last room sent, False when
+        there are no more rooms.
+        """
+        domain = [("pms_property_id", "=", pms_property_id)]
+        if cursor:
+            sequence, room_id = [int(item) for item in cursor.split(",")]
+            domain += [
+                "|",
+                ("sequence", ">", sequence),
+                "&",
+                ("sequence", "=", sequence),
+                ("id", ">", room_id),
+            ]
+        rooms = (
+            request.env["pms.room"]
+            .with_company(company)
+            .search(domain, order="sequence, id", limit=limit and limit + 1)
+        )
+        next_cursor = False
+        if limit and len(rooms) > limit:
+            rooms = rooms[:limit]
+            next_cursor = "%s,%s" % (rooms[-1].sequence, rooms[-1].id)
+        return rooms, next_cursor
+
+    def _get_rooms_ocupation(self, pms_property, rooms, dates):
+        """Build the ocupation of the rooms in a single pass over the
+        reservation lines of the dates. Each run of consecutive nights of a
+        reservation in the same room is an item, so splitted reservations get
+        an item for every room they go through. Free dates get an empty item.
+        @return: Return dict with the ocupation of each room sorted by date
+         {
+            room_id: [
+                {"date": date, "reservation_info": {...}},
+                {"date": date, "reservation_info": False},
+                ...
+            ],
+         }
+        """
+        dates_set = set(dates)
+        reservation_lines = (
+            request.env["pms.reservation.line"]
+            .with_company(pms_property.company_id)
+            .search(
+                [
+                    ("date", ">=", min(dates)),
+                    ("date", "<=", max(dates)),
+                    ("state", "!=", "cancel"),
+                    ("pms_property_id", "=", pms_property.id),
+                    ("room_id", "in", rooms.ids),
+                ]
+            )
+        )
+        runs = reservation_lines._get_room_runs(dates_set)
+
+        reservations = reservation_lines.reservation_id
+        ocupation_by_room = {room_id: [] for room_id in rooms.ids}
+        free_dates_by_room = {room_id: set(dates_set) for room_id in rooms.ids}
+        for room_id, reservation_id, first_date, last_date in runs:
+            reservation = reservations.browse(reservation_id)
+            nights = (last_date - first_date).days + 1
+            free_dates_by_room[room_id].difference_update(
+                first_date + timedelta(days=x) for x in range(nights)
+            )
+            reservation_info = {
+                "id": reservation.id,
+                "partner_name": reservation.partner_name,
+                "img": "/web/image/pms.reservation/"
+                + str(reservation.id)
+                + "/partner_image_128",
+                "price": round(reservation.folio_pending_amount, 2),
+                "status": reservation.color_state,
+                "icon_payment": reservation.icon_payment,
+                "nigths": nights,
+                "days": nights + 1,
+                "checkin_in_range": first_date != reservation.checkin,
+                "checkout_in_range": last_date + timedelta(days=1)
+                == reservation.checkout,
+            }
+            run_values = {
+                "date": first_date,
+                "reservation_info": reservation_info,
+            }
+            if reservation.splitted:
+                main_split = first_date == reservation.checkin
+                run_values["splitted"] = True
+                run_values["main_split"] = main_split
+                reservation_info.update(
+                    {
+                        "partner_name": "Partida! " + reservation.partner_name
+                        if main_split
+                        else "Partida! " + reservation.rooms,
+                        "price": reservation_info["price"] if main_split else "",
+                        "checkin_in_range": True,
+                        "checkout_in_range": True,
+                    }
+                )
+            ocupation_by_room[room_id].append(run_values)
+        for room_id, free_dates in free_dates_by_room.items():
+            ocupation_by_room[room_id].extend(
+                {"date": day, "reservation_info": False} for day in free_dates
+            )
+            ocupation_by_room[room_id].sort(key=lambda item: item["date"])
+        return ocupation_by_room
+
     def _get_calendar_config(self, pms_property_id):
-        calendar_config = request.env["pms.user.calendar.property"].sudo().search([
-            ("pms_property_id", "=", pms_property_id),
-            ("user_id", "=", request.env.user.id)
-        ])
-        if (
-            calendar_config
-            and (datetime.datetime.now() - calendar_config.write_date).total_seconds() / 3600 > RESET_CALENDAR_HOURS
-        ):
-            calendar_config.sudo().unlink()
-            calendar_config = False
-        if not calendar_config:
-            calendar_config = request.env["pms.user.calendar.property"].sudo().create({
-                "pms_property_id": pms_property_id,
-                "user_id": request.env.user.id,
-            })
-        return calendar_config
+        return CalendarState(pms_property_id)
 
     def _get_dates(self, calendar_config, post):
         date = datetime.date.today()
@@ -681,6 +782,27 @@ class PmsCalendar(http.Controller):
         date_list = [date_start + timedelta(days=x) for x in range(dpr)]
         return date_start, date_list
 
+    def _get_delta_dates(self, date_list, post):
+        """Return the dates of date_list that were not in the window the
+        client is moving from, or False if the whole window must be sent.
+        The navigation params (next_day, previous_month...) carry the start
+        date of the window held by the client.
+        """
+        if not post.get("delta"):
+            return False
+        current_date_start = False
+        for param in ("next_day", "previous_day", "next_month", "previous_month"):
+            if post.get(param):
+                current_date_start = datetime.datetime.strptime(
+                    post.get(param), get_lang(request.env).date_format
+                ).date()
+        if not current_date_start:
+            return False
+        current_dates = {
+            current_date_start + timedelta(days=x) for x in range(len(date_list))
+        }
+        return [date for date in date_list if date not in current_dates]
+
     def _get_property(self, post):
         pms_property_id = request.env.user.get_active_property_ids()[0]
         if post and post.get("selected_property"):
@@ -757,64 +879,40 @@ class PmsCalendar(http.Controller):
         website=True,
     )
     def _get_modal_values(self, **post):
-        print("json ---> ", post)
+        log_payload("calendar_massive_changes", post)
         post = post.get("send_values")
-        start_date = datetime.datetime.strptime(
-            post.get("start_date"), "%d/%m/%Y"
-        ).date()
-        end_date = datetime.datetime.strptime(
-            post.get("end_date"), "%d/%m/%Y"
-        ).date()
-        availability_fields = {
-            "cupo": "quota",
-            "estmin": "min_stay",
-            "max_dispo": "max_avail",
-            "closed": "closed",
-            "closed_arrival": "closed_arrival",
-            "max_stay": "max_stay",
-            "max_stay_sa": "max_stay_arrival"
-        }
-        if post.get("price"):
-            wizard = request.env["pms.massive.changes.wizard"].create({
-                "pms_property_ids": [(6 , 0, [int(post.get("pms_property_id"))])],
-                "massive_changes_on": "pricelist",
-                "start_date": start_date,
-                "end_date": end_date,
-            })
+        # Validate the dates before queuing the job
+        datetime.datetime.strptime(post.get("start_date"), "%d/%m/%Y")
+        datetime.datetime.strptime(post.get("end_date"), "%d/%m/%Y")
+        job = request.env["pms.massive.change.job"].create(
+            {
+                "pms_property_id": int(post.get("pms_property_id")),
+                "payload": json.dumps(post),
+            }
+        )
+        return {"result": True, "job_id": job.id}
 
-            wizard.pricelist_ids = [(6, 0, [int(plan) for plan in post.get("pricelist_id")])]
-            wizard.price = float(post.get("price"))
-
-            wizard.room_type_ids = [(6, 0, [int(plan) for plan in post.get("room_type")])]
-            wizard.apply_on_monday = post.get("apply_on_monday")
-            wizard.apply_on_tuesday = post.get("apply_on_tuesday")
-            wizard.apply_on_wednesday = post.get("apply_on_wednesday")
-            wizard.apply_on_thursday = post.get("apply_on_thursday")
-            wizard.apply_on_friday = post.get("apply_on_friday")
-            wizard.apply_on_saturday = post.get("apply_on_saturday")
-            wizard.apply_on_sunday = post.get("apply_on_sunday")
-            wizard.apply_massive_changes()
-        if any(post.get(field) for field in availability_fields.keys()):
-            wizard = request.env["pms.massive.changes.wizard"].create({
-                "pms_property_ids": [(6 , 0, [int(post.get("pms_property_id"))])],
-                "massive_changes_on": "availability_plan",
-                "start_date": start_date,
-                "end_date": end_date,
-            })
-            wizard.room_type_ids = [(6, 0, [int(plan) for plan in post.get("room_type")])]
-            wizard.apply_on_monday = post.get("apply_on_monday")
-            wizard.apply_on_tuesday = post.get("apply_on_tuesday")
-            wizard.apply_on_wednesday = post.get("apply_on_wednesday")
-            wizard.apply_on_thursday = post.get("apply_on_thursday")
-            wizard.apply_on_friday = post.get("apply_on_friday")
-            wizard.apply_on_saturday = post.get("apply_on_saturday")
-            wizard.apply_on_sunday = post.get("apply_on_sunday")
-
-            wizard.availability_plan_ids = [(6, 0, [int(plan) for plan in post.get("availability_plan_ids")])]
-            for post_field, wizard_field in availability_fields.items():
-                if post.get(post_field):
-                    wizard[wizard_field] = int(post.get(post_field))
-                    wizard["apply_" + wizard_field] = True
-            wizard.apply_massive_changes()
-
-        return True
+    @http.route(
+        "/calendar/modal/job",
+        type="json",
+        auth="user",
+        csrf=False,
+        methods=["POST"],
+        website=True,
+    )
+    def calendar_modal_job(self, **post):
+        job = request.env["pms.massive.change.job"].search(
+            [
+                ("id", "=", int(post.get("job_id") or 0)),
+                ("user_id", "=", request.env.user.id),
+            ]
+        )
+        if not job:
+            return {"result": False, "message": _("Trabajo no encontrado")}
+        return {
+            "result": True,
+            "id": job.id,
+            "state": job.state,
+            "progress": job.progress,
+            "message": job.message or "",
+        }
@@ -1,7 +1,9 @@
+from . import pms_pwa_options_mixin
 from . import pms_folio
 from . import pms_reservation
 from . import pms_custom_menu
 from . import pms_service
+from . import pms_service_line
 from . import pms_room_type
 from . import pms_checkin_partner
 from . import pms_ubication
@@ -10,3 +12,20 @@ from . import res_partner
 from . import res_users
 from . import pms_user_calendar_property
 from . import account_bank_statement
+from . import pms_calendar_occupancy
+from . import pms_reservation_line
+from . import pms_room
+from . import product_pricelist
+from . import product_pricelist_item
+from . import pms_availability_plan_rule
+from . import pms_massive_change_job
+from . import pms_dashboard_kpi
+from . import pms_room_status_counter
+from . import account_payment
+from . import pms_cash_balance
+from . import account_bank_statement_line
+from . import pms_sale_channel
+from . import res_partner_category
+from . import res_country
+from . import account_journal
+from . import ir_http
@@ -1,5 +1,14 @@
 from odoo import api, fields, models
 
+BALANCE_FIELDS = {
+    "journal_id",
+    "date",
+    "state",
+    "line_ids",
+    "balance_start",
+    "balance_end_real",
+}
+
 
 class AccountBankStatement(models.Model):
     _inherit = "account.bank.statement"
@@ -16,17 +25,63 @@ class AccountBankStatement(models.Model):
 
     @api.depends("journal_id", "pms_property_id", "date")
     def _compute_cash_turn(self):
+        """The turn is the position of the statement, by creation, among the
+        cash statements of its property and date. Every turn of the batch is
+        ranked in a single query.
+        """
+        statements = self.filtered(
+            lambda r: isinstance(r.id, int)
+            and r.journal_id.type == "cash"
+            and r.pms_property_id
+        )
+        turns = {}
+        if statements:
+            self.flush(["journal_id", "pms_property_id", "date"])
+            self.env.cr.execute(
+                """
+                SELECT id, turn FROM (
+                    SELECT  statement.id,
+                            ROW_NUMBER() OVER (
+                                PARTITION BY statement.pms_property_id, statement.date
+                                ORDER BY statement.create_date, statement.id
+                            ) AS turn
+                    FROM    account_bank_statement statement
+                            JOIN account_journal journal
+                                ON journal.id = statement.journal_id
+                    WHERE   journal.type = 'cash'
+                        AND (statement.pms_property_id, statement.date) IN %s
+                ) AS turns
+                WHERE id IN %s
+                """,
+                (
+                    tuple({(r.pms_property_id.id, r.date) for r in statements}),
+                    tuple(statements.ids),
+                ),
+            )
+            turns = dict(self.env.cr.fetchall())
         for record in self:
-            if (
-                record.journal_id.type == "cash"
-                and record.pms_property_id
-            ):
-                day_statements = self.search([
-                    ("journal_id.type", "=", "cash"),
-                    ("pms_property_id", "=", record.pms_property_id.id),
-                    ("date", "=", record.date),
-                ], order="create_date asc")
-                record.cash_turn = list(day_statements).index(record) + 1
+            record.cash_turn = turns.get(record.id, 0)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(AccountBankStatement, self).create(vals_list)
+        self.env["pms.cash.balance"]._refresh_balances(records.journal_id.ids)
+        return records
+
+    def write(self, vals):
+        if not BALANCE_FIELDS.intersection(vals):
+            return super(AccountBankStatement, self).write(vals)
+        journal_ids = set(self.journal_id.ids)
+        res = super(AccountBankStatement, self).write(vals)
+        journal_ids |= set(self.journal_id.ids)
+        self.env["pms.cash.balance"]._refresh_balances(journal_ids)
+        return res
+
+    def unlink(self):
+        journal_ids = self.journal_id.ids
+        res = super(AccountBankStatement, self).unlink()
+        self.env["pms.cash.balance"]._refresh_balances(journal_ids)
+        return res
 
     def name_get(self):
         result = []
@@ -0,0 +1,31 @@
+# Copyright 2021 Comunitea Servicios Tecnológicos
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+
+class AccountBankStatementLine(models.Model):
+    _inherit = "account.bank.statement.line"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(AccountBankStatementLine, self).create(vals_list)
+        self.env["pms.cash.balance"]._refresh_balances(
+            records.statement_id.journal_id.ids
+        )
+        return records
+
+    def write(self, vals):
+        if not {"amount", "statement_id"}.intersection(vals):
+            return super(AccountBankStatementLine, self).write(vals)
+        journal_ids = set(self.statement_id.journal_id.ids)
+        res = super(AccountBankStatementLine, self).write(vals)
+        journal_ids |= set(self.statement_id.journal_id.ids)
+        self.env["pms.cash.balance"]._refresh_balances(journal_ids)
+        return res
+
+    def unlink(self):
+        journal_ids = self.statement_id.journal_id.ids
+        res = super(AccountBankStatementLine, self).unlink()
+        self.env["pms.cash.balance"]._refresh_balances(journal_ids)
+        return res
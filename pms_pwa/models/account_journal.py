@@ -0,0 +1,20 @@
+# Copyright 2021 Comunitea Servicios Tecnológicos
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import models
+
+
+class AccountJournal(models.Model):
+    _name = "account.journal"
+    _inherit = ["account.journal", "pms.pwa.options.mixin"]
+
+    _options_fields = {
+        "name",
+        "type",
+        "active",
+        "sequence",
+        "code",
+        "company_id",
+        "pms_property_ids",
+        "allowed_pms_payments",
+    }
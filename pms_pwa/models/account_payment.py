@@ -0,0 +1,79 @@
+# Copyright 2021 Comunitea Servicios Tecnológicos
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+# Stable order of the listing, the pages don't repeat or skip payments
+PAYMENTS_LISTING_ORDER = "date desc, id desc"
+
+
+class AccountPayment(models.Model):
+    _inherit = "account.payment"
+
+    @api.model
+    def _get_payments_listing(self, journal_ids, date, offset=0, limit=None):
+        """Read the payments of the journals in the date, newest first. The
+        page (offset, limit) applies to each journal on its own, without
+        paging all of them are read at once.
+        @return: Return dict with the payments of each journal
+         {
+          journal_id: [
+            {
+              "id": id,
+              "partner_id": partner_id,
+              "partner_name": partner_name,
+              "simple_name": simple_name,
+              "name": name,
+              "amount": amount,
+            },
+            ...
+          ],
+          ...
+         }
+        """
+        read_fields = [
+            "journal_id",
+            "partner_id",
+            "ref",
+            "create_date",
+            "create_uid",
+            "amount",
+            "payment_type",
+        ]
+        if offset or limit:
+            payments = []
+            for journal_id in journal_ids:
+                payments += self.search_read(
+                    [("journal_id", "=", journal_id), ("date", "=", date)],
+                    read_fields,
+                    offset=offset,
+                    limit=limit,
+                    order=PAYMENTS_LISTING_ORDER,
+                )
+        else:
+            payments = self.search_read(
+                [("journal_id", "in", journal_ids), ("date", "=", date)],
+                read_fields,
+                order=PAYMENTS_LISTING_ORDER,
+            )
+        payment_vals = {journal_id: [] for journal_id in journal_ids}
+        for payment in payments:
+            payment_vals.setdefault(payment["journal_id"][0], []).append(
+                {
+                    "id": payment["id"],
+                    "partner_id": payment["partner_id"] and payment["partner_id"][0],
+                    "partner_name": payment["partner_id"] and payment["partner_id"][1],
+                    "simple_name": payment["ref"] or "No indicado",
+                    "name": payment["ref"]
+                    or "No indicado"
+                    + " el "
+                    + payment["create_date"].strftime("%d %b - %H:%M")
+                    + " ("
+                    + payment["create_uid"][1]
+                    + ")",
+                    "amount": payment["amount"]
+                    if payment["payment_type"] == "inbound"
+                    else -payment["amount"],
+                }
+            )
+        return payment_vals
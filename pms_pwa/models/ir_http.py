@@ -0,0 +1,17 @@
+# Copyright 2021 Comunitea Servicios Tecnológicos
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import models
+from odoo.http import request
+
+from ..calendar_cache import calendar_cache
+
+
+class IrHttp(models.AbstractModel):
+    _inherit = "ir.http"
+
+    @classmethod
+    def _dispatch(cls):
+        # Before any query of the request cursor, see calendar_cache.read_stamps
+        calendar_cache.read_stamps(request.registry, request.cr)
+        return super(IrHttp, cls)._dispatch()
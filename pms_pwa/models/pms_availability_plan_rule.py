@@ -0,0 +1,23 @@
+# Copyright 2021 Comunitea Servicios Tecnológicos
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+from ..calendar_cache import calendar_cache
+
+
+class PmsAvailabilityPlanRule(models.Model):
+    _inherit = "pms.availability.plan.rule"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        calendar_cache.invalidate(self.env, ("rules",))
+        return super(PmsAvailabilityPlanRule, self).create(vals_list)
+
+    def write(self, vals):
+        calendar_cache.invalidate(self.env, ("rules",))
+        return super(PmsAvailabilityPlanRule, self).write(vals)
+
+    def unlink(self):
+        calendar_cache.invalidate(self.env, ("rules",))
+        return super(PmsAvailabilityPlanRule, self).unlink()
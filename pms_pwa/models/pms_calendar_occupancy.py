@@ -0,0 +1,184 @@
+# Copyright 2021 Comunitea Servicios Tecnológicos
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, fields, models
+
+from ..calendar_cache import calendar_cache
+
+
+class PmsCalendarOccupancy(models.Model):
+    _name = "pms.calendar.occupancy"
+    _description = "Calendar daily occupancy"
+    _log_access = False
+    _order = "date, room_type_id"
+
+    pms_property_id = fields.Many2one(
+        string="PMS Property",
+        help="tecnical field to group occupancy by property",
+        comodel_name="pms.property",
+        required=True,
+        index=True,
+        ondelete="cascade",
+    )
+    date = fields.Date(
+        string="Date",
+        required=True,
+        index=True,
+    )
+    room_type_id = fields.Many2one(
+        string="Room Type",
+        comodel_name="pms.room.type",
+        required=True,
+        ondelete="cascade",
+    )
+    reservation_type = fields.Char(
+        string="Reservation Type",
+    )
+    nights = fields.Integer(
+        string="Occupied nights",
+        help="Number of reservation lines occupying availability",
+    )
+
+    _sql_constraints = [
+        (
+            "occupancy_unique",
+            "unique(pms_property_id, date, room_type_id, reservation_type)",
+            "The occupancy must be unique by property, date, room type and type",
+        ),
+    ]
+
+    def init(self):
+        calendar_cache.create_sequences(self.env.cr)
+        # The unique constraint index also serves the (property, date) range reads
+        self.env.cr.execute("SELECT 1 FROM pms_calendar_occupancy LIMIT 1")
+        if not self.env.cr.fetchone():
+            self._rebuild_occupancy()
+
+    def _flush_occupancy_sources(self):
+        self.env["pms.reservation.line"].flush(
+            [
+                "date",
+                "room_id",
+                "reservation_id",
+                "pms_property_id",
+                "occupies_availability",
+            ]
+        )
+        self.env["pms.reservation"].flush(["reservation_type", "state"])
+        self.env["pms.room"].flush(["room_type_id"])
+
+    def _insert_occupancy(self, where, params):
+        self.env.cr.execute(
+            """
+            INSERT INTO pms_calendar_occupancy
+                (pms_property_id, date, room_type_id, reservation_type, nights)
+            SELECT  night.pms_property_id, night.date, pms_room.room_type_id,
+                    reservation.reservation_type, count(night.id)
+            FROM    pms_reservation_line night
+                    LEFT JOIN pms_reservation reservation
+                        ON reservation.id = night.reservation_id
+                    LEFT JOIN pms_room
+                        ON pms_room.id = night.room_id
+            WHERE   (night.occupies_availability = TRUE)
+                AND (night.room_id is not NULL)
+                AND (pms_room.room_type_id is not NULL)
+                {}
+            GROUP BY night.pms_property_id, night.date,
+                pms_room.room_type_id, reservation.reservation_type
+            ON CONFLICT (pms_property_id, date, room_type_id, reservation_type)
+            DO UPDATE SET nights = EXCLUDED.nights
+            """.format(
+                where
+            ),
+            params,
+        )
+
+    @api.model
+    def _rebuild_occupancy(self, pms_property_ids=False):
+        """Recompute the whole occupancy table (or only the given properties)"""
+        self._flush_occupancy_sources()
+        if pms_property_ids:
+            params = (tuple(pms_property_ids),)
+            self.env.cr.execute(
+                "DELETE FROM pms_calendar_occupancy WHERE pms_property_id IN %s",
+                params,
+            )
+            self._insert_occupancy("AND (night.pms_property_id IN %s)", params)
+        else:
+            self.env.cr.execute("DELETE FROM pms_calendar_occupancy")
+            self._insert_occupancy("", ())
+        self.invalidate_cache()
+        calendar_cache.invalidate(self.env, ("general", "rules"))
+
+    @api.model
+    def _refresh_occupancy(self, keys):
+        """Recompute the occupancy cells of the given (property, date) pairs
+
+        :param keys: iterable of (pms_property_id, date) tuples
+        """
+        dates_by_property = {}
+        for pms_property_id, date in keys:
+            if pms_property_id and date:
+                dates_by_property.setdefault(pms_property_id, set()).add(date)
+        if not dates_by_property:
+            return
+        self._flush_occupancy_sources()
+        # A cell created at the same time by another transaction is updated
+        # instead of failing on the unique constraint, the concurrent update
+        # error is retried by the request
+        for pms_property_id, dates in dates_by_property.items():
+            params = (pms_property_id, tuple(dates))
+            self.env.cr.execute(
+                """
+                DELETE FROM pms_calendar_occupancy
+                WHERE pms_property_id = %s AND date IN %s
+                """,
+                params,
+            )
+            self._insert_occupancy(
+                "AND (night.pms_property_id = %s) AND (night.date IN %s)", params
+            )
+        self.invalidate_cache()
+        calendar_cache.invalidate(self.env, ("general", "rules"))
+
+    @api.model
+    def _get_occupancy(self, pms_property_id, date_from, date_to, room_type_ids):
+        """
+        @return: Return list of tuples with the occupancy in the range
+         [
+          (date, room_type_id, reservation_type, nights),
+          ...
+         ]
+        """
+        if not room_type_ids:
+            return []
+        self.env.cr.execute(
+            """
+            SELECT  date, room_type_id, reservation_type, nights
+            FROM    pms_calendar_occupancy
+            WHERE   (pms_property_id = %s)
+                AND (date >= %s)
+                AND (date <= %s)
+                AND (room_type_id IN %s)
+            """,
+            (pms_property_id, date_from, date_to, tuple(room_type_ids)),
+        )
+        return self.env.cr.fetchall()
+
+    @api.model
+    def _get_nights_by_type(self, pms_property_id, date):
+        """
+        @return: Return dict with the occupied rooms of each reservation type
+         {reservation_type: nights, ...}
+        """
+        self.env.cr.execute(
+            """
+            SELECT  reservation_type, SUM(nights)
+            FROM    pms_calendar_occupancy
+            WHERE   (pms_property_id = %s)
+                AND (date = %s)
+            GROUP BY reservation_type
+            """,
+            (pms_property_id, date),
+        )
+        return dict(self.env.cr.fetchall())
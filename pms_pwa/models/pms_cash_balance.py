@@ -0,0 +1,101 @@
+# Copyright 2021 Comunitea Servicios Tecnológicos
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, fields, models
+
+
+class PmsCashBalance(models.Model):
+    _name = "pms.cash.balance"
+    _description = "Journal running cash balance"
+
+    journal_id = fields.Many2one(
+        string="Journal",
+        comodel_name="account.journal",
+        required=True,
+        ondelete="cascade",
+    )
+    open_statement_id = fields.Many2one(
+        string="Open Statement",
+        help="tecnical field with the last open statement of the journal",
+        comodel_name="account.bank.statement",
+    )
+    open_statement_date = fields.Date(string="Open Statement Date")
+    open_balance = fields.Float(
+        string="Open Balance",
+        help="Computed ending balance of the open statement",
+    )
+    last_statement_id = fields.Many2one(
+        string="Last Statement",
+        help="tecnical field with the last statement of the journal",
+        comodel_name="account.bank.statement",
+    )
+    last_balance = fields.Float(
+        string="Last Balance",
+        help="Ending balance of the last statement, the real one when posted",
+    )
+
+    _sql_constraints = [
+        (
+            "journal_unique",
+            "unique(journal_id)",
+            "The cash balance must be unique by journal",
+        ),
+    ]
+
+    @api.model
+    def _refresh_balances(self, journal_ids):
+        """Recompute the running balance of the journals from their statements"""
+        Statement = self.env["account.bank.statement"].sudo()
+        balances = self.sudo().search([("journal_id", "in", list(journal_ids))])
+        balance_by_journal = {balance.journal_id.id: balance for balance in balances}
+        for journal_id in journal_ids:
+            open_statement = Statement.search(
+                [("journal_id", "=", journal_id), ("state", "=", "open")], limit=1
+            )
+            last_statement = Statement.search(
+                [("journal_id", "=", journal_id)], limit=1
+            )
+            vals = {
+                "open_statement_id": open_statement.id,
+                "open_statement_date": open_statement.date,
+                "open_balance": open_statement.balance_end,
+                "last_statement_id": last_statement.id,
+                "last_balance": last_statement.balance_end
+                if last_statement.state == "open"
+                else last_statement.balance_end_real,
+            }
+            if journal_id in balance_by_journal:
+                balance_by_journal[journal_id].write(vals)
+            else:
+                vals["journal_id"] = journal_id
+                self.sudo().create(vals)
+
+    @api.model
+    def _get_journal_balance(self, journal_id):
+        balance = self.sudo().search([("journal_id", "=", journal_id)], limit=1)
+        if not balance and journal_id:
+            self._refresh_balances([journal_id])
+            balance = self.sudo().search([("journal_id", "=", journal_id)], limit=1)
+        return balance
+
+    @api.model
+    def _get_balance(self, journal_id):
+        """
+        @return: Return dict with the journal balance and the action allowed
+         on the cash register ("close" if there is a statement open today)
+         {"balance": balance, "status": "open"|"close", "statement_id": id}
+        """
+        balance = self._get_journal_balance(journal_id)
+        if balance.open_statement_id and (
+            balance.open_statement_date == fields.Date.context_today(self)
+        ):
+            return {
+                "balance": balance.open_balance,
+                "status": "close",
+                "statement_id": balance.open_statement_id.id,
+            }
+        return {
+            "balance": balance.last_balance,
+            "status": "open",
+            "statement_id": balance.last_statement_id.id,
+        }
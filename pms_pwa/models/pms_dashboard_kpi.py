@@ -0,0 +1,316 @@
+# Copyright 2021 Comunitea Servicios Tecnológicos
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import datetime
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import api, fields, models
+
+# Days before today recomputed by the nightly refresh, older days are final
+KPI_REFRESH_DAYS = 7
+
+# Previous years that can be compared with a range at once
+KPI_MAX_BASELINES = 3
+
+# Days of a compared range, each baseline reads the same number of days
+KPI_MAX_DAYS = 366
+
+KPI_FIELDS = ["rooms_sold", "out_of_service", "revenue", "arrivals", "departures"]
+
+
+class PmsDashboardKpi(models.Model):
+    _name = "pms.dashboard.kpi"
+    _description = "Dashboard daily KPIs"
+    _log_access = False
+    _order = "date"
+
+    pms_property_id = fields.Many2one(
+        string="PMS Property",
+        help="tecnical field to group KPIs by property",
+        comodel_name="pms.property",
+        required=True,
+        index=True,
+        ondelete="cascade",
+    )
+    date = fields.Date(
+        string="Date",
+        required=True,
+        index=True,
+    )
+    rooms_sold = fields.Integer(
+        string="Rooms sold",
+        help="Nights of not cancelled reservations, out of service excluded",
+    )
+    out_of_service = fields.Integer(
+        string="Out of service",
+        help="Nights of out of service reservations",
+    )
+    revenue = fields.Float(
+        string="Revenue",
+        help="Rooms and services amount of the reservations leaving the date, "
+        "refreshed on changes of the reservations, nights and services",
+    )
+    arrivals = fields.Integer(string="Arrivals")
+    departures = fields.Integer(string="Departures")
+
+    _sql_constraints = [
+        (
+            "kpi_unique",
+            "unique(pms_property_id, date)",
+            "The KPIs must be unique by property and date",
+        ),
+    ]
+
+    def init(self):
+        self.env.cr.execute("SELECT 1 FROM pms_dashboard_kpi LIMIT 1")
+        if not self.env.cr.fetchone():
+            self._rebuild_kpis()
+
+    def _flush_kpi_sources(self):
+        self.env["pms.reservation.line"].flush(
+            ["date", "reservation_id", "pms_property_id"]
+        )
+        self.env["pms.reservation"].flush(
+            [
+                "checkin",
+                "checkout",
+                "state",
+                "reservation_type",
+                "pms_property_id",
+                "price_room_services_set",
+            ]
+        )
+
+    def _insert_kpis(self, pms_property_ids=False, dates=False, date_from=False):
+        """Insert the KPIs aggregated from the reservations, restricted to
+        the given properties and to the given dates or the dates from date_from
+        """
+        params = {
+            "pms_property_ids": tuple(pms_property_ids or ()),
+            "dates": tuple(dates or ()),
+            "date_from": date_from,
+        }
+
+        def _where(date_column):
+            where = ""
+            if pms_property_ids:
+                where += " AND reservation.pms_property_id IN %(pms_property_ids)s"
+            if dates:
+                where += " AND {} IN %(dates)s".format(date_column)
+            if date_from:
+                where += " AND {} >= %(date_from)s".format(date_column)
+            return where
+
+        self.env.cr.execute(
+            """
+            WITH nights AS (
+                SELECT  reservation.pms_property_id, night.date,
+                        COUNT(*) FILTER (
+                            WHERE COALESCE(reservation.reservation_type, '') != 'out'
+                        ) AS rooms_sold,
+                        COUNT(*) FILTER (
+                            WHERE reservation.reservation_type = 'out'
+                        ) AS out_of_service
+                FROM    pms_reservation_line night
+                        JOIN pms_reservation reservation
+                            ON reservation.id = night.reservation_id
+                WHERE   reservation.state != 'cancel' {nights_where}
+                GROUP BY reservation.pms_property_id, night.date
+            ), arrivals AS (
+                SELECT  reservation.pms_property_id, reservation.checkin AS date,
+                        COUNT(*) AS arrivals
+                FROM    pms_reservation reservation
+                WHERE   reservation.state != 'cancel'
+                    AND COALESCE(reservation.reservation_type, '') != 'out'
+                    {arrivals_where}
+                GROUP BY reservation.pms_property_id, reservation.checkin
+            ), departures AS (
+                SELECT  reservation.pms_property_id, reservation.checkout AS date,
+                        COUNT(*) FILTER (
+                            WHERE COALESCE(reservation.reservation_type, '') != 'out'
+                        ) AS departures,
+                        SUM(reservation.price_room_services_set) FILTER (
+                            WHERE COALESCE(reservation.reservation_type, '')
+                                NOT IN ('out', 'staff')
+                        ) AS revenue
+                FROM    pms_reservation reservation
+                WHERE   reservation.state != 'cancel' {departures_where}
+                GROUP BY reservation.pms_property_id, reservation.checkout
+            )
+            INSERT INTO pms_dashboard_kpi
+                (pms_property_id, date, rooms_sold, out_of_service,
+                revenue, arrivals, departures)
+            SELECT  pms_property_id, date,
+                    COALESCE(rooms_sold, 0), COALESCE(out_of_service, 0),
+                    COALESCE(revenue, 0), COALESCE(arrivals, 0),
+                    COALESCE(departures, 0)
+            FROM    nights
+                    FULL OUTER JOIN arrivals USING (pms_property_id, date)
+                    FULL OUTER JOIN departures USING (pms_property_id, date)
+            WHERE   pms_property_id IS NOT NULL AND date IS NOT NULL
+            ON CONFLICT (pms_property_id, date) DO UPDATE SET
+                rooms_sold = EXCLUDED.rooms_sold,
+                out_of_service = EXCLUDED.out_of_service,
+                revenue = EXCLUDED.revenue,
+                arrivals = EXCLUDED.arrivals,
+                departures = EXCLUDED.departures
+            """.format(
+                nights_where=_where("night.date"),
+                arrivals_where=_where("reservation.checkin"),
+                departures_where=_where("reservation.checkout"),
+            ),
+            params,
+        )
+
+    @api.model
+    def _rebuild_kpis(self, pms_property_ids=False, date_from=False):
+        """Recompute the KPIs table (or only the given properties and dates)"""
+        self._flush_kpi_sources()
+        where = "WHERE TRUE"
+        params = {}
+        if pms_property_ids:
+            where += " AND pms_property_id IN %(pms_property_ids)s"
+            params["pms_property_ids"] = tuple(pms_property_ids)
+        if date_from:
+            where += " AND date >= %(date_from)s"
+            params["date_from"] = date_from
+        self.env.cr.execute("DELETE FROM pms_dashboard_kpi " + where, params)
+        self._insert_kpis(pms_property_ids=pms_property_ids, date_from=date_from)
+        self.invalidate_cache()
+
+    @api.model
+    def _refresh_kpis(self, keys):
+        """Recompute the KPIs of the given (property, date) pairs
+
+        :param keys: iterable of (pms_property_id, date) tuples
+        """
+        dates_by_property = {}
+        for pms_property_id, date in keys:
+            if pms_property_id and date:
+                dates_by_property.setdefault(pms_property_id, set()).add(date)
+        if not dates_by_property:
+            return
+        self._flush_kpi_sources()
+        # A row created at the same time by another transaction is updated
+        # instead of failing on the unique constraint, the concurrent update
+        # error is retried by the request
+        for pms_property_id, dates in dates_by_property.items():
+            self.env.cr.execute(
+                """
+                DELETE FROM pms_dashboard_kpi
+                WHERE pms_property_id = %s AND date IN %s
+                """,
+                (pms_property_id, tuple(dates)),
+            )
+            self._insert_kpis(pms_property_ids=[pms_property_id], dates=dates)
+        self.invalidate_cache()
+
+    @api.model
+    def _cron_refresh_kpis(self):
+        """Nightly refresh of the recent and future KPIs, it repairs the days
+        changed without the ORM hooks (raw SQL, imports). The older days are
+        kept as they are.
+        """
+        self._rebuild_kpis(
+            date_from=fields.Date.today() - datetime.timedelta(days=KPI_REFRESH_DAYS)
+        )
+
+    @api.model
+    def _get_kpis(self, pms_property_id, date_from, date_to):
+        """
+        @return: Return dict with the KPIs of each date in the range,
+         dates without reservations are returned with zero values
+         {
+          date: {
+            "rooms_sold": rooms_sold,
+            "out_of_service": out_of_service,
+            "revenue": revenue,
+            "arrivals": arrivals,
+            "departures": departures,
+          },
+          ...
+         }
+        """
+        kpis = {
+            date_from + datetime.timedelta(days=day): dict.fromkeys(KPI_FIELDS, 0)
+            for day in range((date_to - date_from).days + 1)
+        }
+        self.env.cr.execute(
+            """
+            SELECT  date, rooms_sold, out_of_service, revenue, arrivals, departures
+            FROM    pms_dashboard_kpi
+            WHERE   (pms_property_id = %s)
+                AND (date >= %s)
+                AND (date <= %s)
+            """,
+            (pms_property_id, date_from, date_to),
+        )
+        for row in self.env.cr.fetchall():
+            kpis[row[0]] = dict(zip(KPI_FIELDS, row[1:]))
+        return kpis
+
+    @api.model
+    def _get_baseline_date(self, date, years, align_weekday=False):
+        """Same date some years ago, with align_weekday moved to the nearest
+        day with the same weekday (at most 3 days away)
+        """
+        baseline_date = date - relativedelta(years=years)
+        if align_weekday:
+            shift = (date.weekday() - baseline_date.weekday() + 3) % 7 - 3
+            baseline_date += datetime.timedelta(days=shift)
+        return baseline_date
+
+    @api.model
+    def _get_comparison(
+        self, pms_property_id, date_from, date_to, baselines=1, align_weekday=False
+    ):
+        """Read the KPIs of the dates range and of the same range in each of
+        the previous baselines years with a single query
+        @return: Return list with the KPIs of each period, the current one
+         first, every period with the same number of days
+         [
+          {
+            "date_from": date_from,
+            "date_to": date_to,
+            "kpis": [{"rooms_sold": rooms_sold, ...}, ...],
+          },
+          ...
+         ]
+        """
+        days = (date_to - date_from).days + 1
+        if days < 1:
+            return []
+        periods = [date_from] + [
+            self._get_baseline_date(date_from, years, align_weekday)
+            for years in range(1, baselines + 1)
+        ]
+        dates = {
+            period_from + datetime.timedelta(days=day)
+            for period_from in periods
+            for day in range(days)
+        }
+        self.env.cr.execute(
+            """
+            SELECT  date, rooms_sold, out_of_service, revenue, arrivals, departures
+            FROM    pms_dashboard_kpi
+            WHERE   (pms_property_id = %s)
+                AND (date IN %s)
+            """,
+            (pms_property_id, tuple(dates)),
+        )
+        kpis = {
+            row[0]: dict(zip(KPI_FIELDS, row[1:])) for row in self.env.cr.fetchall()
+        }
+        empty_kpis = dict.fromkeys(KPI_FIELDS, 0)
+        return [
+            {
+                "date_from": period_from,
+                "date_to": period_from + datetime.timedelta(days=days - 1),
+                "kpis": [
+                    kpis.get(period_from + datetime.timedelta(days=day), empty_kpis)
+                    for day in range(days)
+                ],
+            }
+            for period_from in periods
+        ]
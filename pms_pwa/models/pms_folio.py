@@ -173,7 +173,4 @@ class PmsFolio(models.Model):
 
     def get_reservation_json(self):
         self.ensure_one()
-        res_json = []
-        for res in self.reservation_ids:
-            res_json.append(res.get_json())
-        return res_json
+        return self.reservation_ids.get_json()
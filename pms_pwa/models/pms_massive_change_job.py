@@ -0,0 +1,210 @@
+# Copyright 2021 Comunitea Servicios Tecnológicos
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import datetime
+import json
+import logging
+
+from odoo import _, api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+# Days of the date range applied on each step of a job
+JOB_STEP_DAYS = 31
+
+# Minutes without progress before a running job is taken as lost and requeued
+JOB_TIMEOUT_MINUTES = 30
+
+AVAILABILITY_FIELDS = {
+    "cupo": "quota",
+    "estmin": "min_stay",
+    "max_dispo": "max_avail",
+    "closed": "closed",
+    "closed_arrival": "closed_arrival",
+    "max_stay": "max_stay",
+    "max_stay_sa": "max_stay_arrival",
+}
+
+WEEKDAY_FIELDS = [
+    "apply_on_monday",
+    "apply_on_tuesday",
+    "apply_on_wednesday",
+    "apply_on_thursday",
+    "apply_on_friday",
+    "apply_on_saturday",
+    "apply_on_sunday",
+]
+
+
+class PmsMassiveChangeJob(models.Model):
+    _name = "pms.massive.change.job"
+    _description = "Massive changes background job"
+    _order = "id"
+
+    user_id = fields.Many2one(
+        string="User",
+        help="User that requested the changes, notified of the progress",
+        comodel_name="res.users",
+        default=lambda self: self.env.user,
+    )
+    pms_property_id = fields.Many2one(
+        string="PMS Property",
+        comodel_name="pms.property",
+    )
+    payload = fields.Text(
+        string="Payload",
+        help="tecnical field with the values sent from the calendar modal",
+    )
+    state = fields.Selection(
+        string="State",
+        selection=[
+            ("pending", "Pending"),
+            ("running", "Running"),
+            ("done", "Done"),
+            ("failed", "Failed"),
+        ],
+        default="pending",
+        index=True,
+    )
+    progress = fields.Integer(
+        string="Progress",
+        help="Percentage of the changes already applied",
+    )
+    done_steps = fields.Integer(
+        string="Done steps",
+        help="tecnical field with the steps already applied and committed, "
+        "a requeued job goes on from the next one",
+    )
+    message = fields.Text(string="Message")
+
+    def _get_steps(self):
+        """
+        @return: Return list with the steps of the job
+         [("pricelist", start_date, end_date), ...]
+        """
+        self.ensure_one()
+        values = json.loads(self.payload)
+        start_date = datetime.datetime.strptime(
+            values.get("start_date"), "%d/%m/%Y"
+        ).date()
+        end_date = datetime.datetime.strptime(values.get("end_date"), "%d/%m/%Y").date()
+        changes_on = []
+        if values.get("price"):
+            changes_on.append("pricelist")
+        if any(values.get(field) for field in AVAILABILITY_FIELDS.keys()):
+            changes_on.append("availability_plan")
+        steps = []
+        for massive_changes_on in changes_on:
+            step_start = start_date
+            while step_start <= end_date:
+                step_end = min(
+                    step_start + datetime.timedelta(days=JOB_STEP_DAYS - 1), end_date
+                )
+                steps.append((massive_changes_on, step_start, step_end))
+                step_start = step_end + datetime.timedelta(days=1)
+        return steps
+
+    def _apply_step(self, massive_changes_on, start_date, end_date):
+        self.ensure_one()
+        values = json.loads(self.payload)
+        wizard = self.env["pms.massive.changes.wizard"].create(
+            {
+                "pms_property_ids": [(6, 0, [int(values.get("pms_property_id"))])],
+                "massive_changes_on": massive_changes_on,
+                "start_date": start_date,
+                "end_date": end_date,
+            }
+        )
+        wizard.room_type_ids = [(6, 0, [int(plan) for plan in values.get("room_type")])]
+        for weekday_field in WEEKDAY_FIELDS:
+            wizard[weekday_field] = values.get(weekday_field)
+        if massive_changes_on == "pricelist":
+            wizard.pricelist_ids = [
+                (6, 0, [int(plan) for plan in values.get("pricelist_id")])
+            ]
+            wizard.price = float(values.get("price"))
+        else:
+            wizard.availability_plan_ids = [
+                (6, 0, [int(plan) for plan in values.get("availability_plan_ids")])
+            ]
+            for post_field, wizard_field in AVAILABILITY_FIELDS.items():
+                if values.get(post_field):
+                    wizard[wizard_field] = int(values.get(post_field))
+                    wizard["apply_" + wizard_field] = True
+        wizard.apply_massive_changes()
+
+    def _notify_progress(self):
+        for job in self:
+            self.env["bus.bus"].sendone(
+                "notify_pms_" + str(job.user_id.id),
+                json.dumps(
+                    {
+                        "massive_change_job": job.id,
+                        "state": job.state,
+                        "progress": job.progress,
+                        "message": job.message
+                        or _("Cambios masivos: %s%%") % job.progress,
+                        "pms_property": job.pms_property_id.id,
+                    }
+                ),
+            )
+
+    def _run(self):
+        self.ensure_one()
+        self.write({"state": "running"})
+        self._notify_progress()
+        self.env.cr.commit()  # pylint: disable=invalid-commit
+        steps = []
+        try:
+            steps = self._get_steps()
+            for index, step in enumerate(steps, 1):
+                if index <= self.done_steps:
+                    continue
+                self.with_user(self.user_id)._apply_step(*step)
+                self.write(
+                    {"done_steps": index, "progress": int(index * 100 / len(steps))}
+                )
+                self._notify_progress()
+                self.env.cr.commit()  # pylint: disable=invalid-commit
+            self.write({"state": "done", "progress": 100})
+        except Exception as e:
+            self.env.cr.rollback()
+            self.invalidate_cache()
+            _logger.exception("Massive change job %s failed", self.id)
+            self.write(
+                {
+                    "state": "failed",
+                    "message": _("Aplicados %s de %s pasos: %s")
+                    % (self.done_steps, len(steps), e),
+                }
+            )
+        self._notify_progress()
+        self.env.cr.commit()  # pylint: disable=invalid-commit
+
+    @api.model
+    def _requeue_lost_jobs(self):
+        """Running jobs without progress for JOB_TIMEOUT_MINUTES were left by
+        a stopped worker, they go on from their last done step
+        """
+        lost_jobs = self.search(
+            [
+                ("state", "=", "running"),
+                (
+                    "write_date",
+                    "<",
+                    fields.Datetime.now()
+                    - datetime.timedelta(minutes=JOB_TIMEOUT_MINUTES),
+                ),
+            ]
+        )
+        if lost_jobs:
+            _logger.warning("Requeuing lost massive change jobs %s", lost_jobs.ids)
+            lost_jobs.write({"state": "pending"})
+
+    @api.model
+    def run_pending_jobs(self):
+        self._requeue_lost_jobs()
+        job = self.search([("state", "=", "pending")], limit=1)
+        while job:
+            job._run()
+            job = self.search([("state", "=", "pending")], limit=1)
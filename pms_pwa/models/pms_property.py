@@ -1,10 +1,14 @@
 # Copyright 2020 Comunitea SL / Alejandro Núñez Liz
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+import copy
+import datetime
+
 from odoo import _, api, fields, models
 from odoo.tools import DEFAULT_SERVER_DATE_FORMAT
 from odoo.tools.misc import get_lang
-import datetime
+
+from ..calendar_cache import calendar_cache
 
 
 class PmsProperty(models.Model):
@@ -116,6 +120,178 @@ class PmsProperty(models.Model):
                 ]
             ).mapped("reservation_id.id"))
 
+    def _get_dashboard_reservation_counters(self, date):
+        """Count the arrivals and departures of the dashboard in one query
+        @return: Return dict with the reservations count
+         {
+          "to_arrive": today arrivals,
+          "to_check_in": arrivals until today pending of check in,
+          "to_arrive_tomorrow": tomorrow arrivals,
+          "to_leave": today departures,
+          "to_check_out": today departures pending of check out,
+          "to_leave_tomorrow": tomorrow departures,
+         }
+        """
+        self.ensure_one()
+        self.env["pms.reservation"].flush(
+            ["checkin", "checkout", "state", "reservation_type", "pms_property_id"]
+        )
+        tomorrow = date + datetime.timedelta(days=1)
+        self.env.cr.execute(
+            """
+            SELECT
+                COUNT(*) FILTER (WHERE checkin = %(date)s AND state != 'cancel'),
+                COUNT(*) FILTER (
+                    WHERE checkin <= %(date)s
+                    AND state IN ('draft', 'confirm', 'arrival_delayed')
+                ),
+                COUNT(*) FILTER (WHERE checkin = %(tomorrow)s AND state != 'cancel'),
+                COUNT(*) FILTER (WHERE checkout = %(date)s AND state != 'cancel'),
+                COUNT(*) FILTER (
+                    WHERE checkout = %(date)s AND state NOT IN ('cancel', 'done')
+                ),
+                COUNT(*) FILTER (WHERE checkout = %(tomorrow)s AND state != 'cancel')
+            FROM pms_reservation
+            WHERE pms_property_id = %(pms_property_id)s
+            AND reservation_type IS DISTINCT FROM 'out'
+            AND (
+                checkin <= %(tomorrow)s
+                OR checkout IN (%(date)s, %(tomorrow)s)
+            )
+            """,
+            {"date": date, "tomorrow": tomorrow, "pms_property_id": self.id},
+        )
+        return dict(
+            zip(
+                [
+                    "to_arrive",
+                    "to_check_in",
+                    "to_arrive_tomorrow",
+                    "to_leave",
+                    "to_check_out",
+                    "to_leave_tomorrow",
+                ],
+                self.env.cr.fetchone(),
+            )
+        )
+
+    def _get_dashboard_kpi_counters(self, date_from, date_to):
+        """Count the reservations of the dashboard KPIs in one query
+        @return: Return dict with the reservations count in the dates range
+         {
+          "arrivals": reservations with checkin in range,
+          "departures": reservations with checkout in range,
+          "out_of_service": out of service with checkin or checkout in range,
+          "total": reservations with checkin or checkout in range,
+         }
+        """
+        self.ensure_one()
+        self.env["pms.reservation"].flush(
+            ["checkin", "checkout", "state", "reservation_type", "pms_property_id"]
+        )
+        self.env.cr.execute(
+            """
+            SELECT
+                COUNT(*) FILTER (
+                    WHERE checkin BETWEEN %(date_from)s AND %(date_to)s
+                    AND reservation_type IS DISTINCT FROM 'out'
+                ),
+                COUNT(*) FILTER (
+                    WHERE checkout BETWEEN %(date_from)s AND %(date_to)s
+                    AND reservation_type IS DISTINCT FROM 'out'
+                ),
+                COUNT(*) FILTER (WHERE reservation_type = 'out'),
+                COUNT(*)
+            FROM pms_reservation
+            WHERE pms_property_id = %(pms_property_id)s
+            AND state != 'cancel'
+            AND (
+                checkin BETWEEN %(date_from)s AND %(date_to)s
+                OR checkout BETWEEN %(date_from)s AND %(date_to)s
+            )
+            """,
+            {"date_from": date_from, "date_to": date_to, "pms_property_id": self.id},
+        )
+        return dict(
+            zip(
+                ["arrivals", "departures", "out_of_service", "total"],
+                self.env.cr.fetchone(),
+            )
+        )
+
+    def _get_channel_mix(self, date_from, date_to, channel_ids=False):
+        """Group the reservations arriving in the dates range by sale channel
+        @return: Return dict with the reservations and income of each channel
+         {
+          channel_id: {"reservations": count, "income": amount},
+          ...
+         }
+        """
+        self.ensure_one()
+        domain = [
+            ("checkin", ">=", date_from),
+            ("checkin", "<=", date_to),
+            ("state", "!=", "cancel"),
+            ("reservation_type", "!=", "out"),
+            ("pms_property_id", "=", self.id),
+        ]
+        if channel_ids:
+            domain.append(("channel_type_id", "in", channel_ids))
+        channels_data = self.env["pms.reservation"].read_group(
+            domain,
+            ["channel_type_id", "price_room_services_set:sum"],
+            ["channel_type_id"],
+        )
+        channel_mix = {}
+        for data in channels_data:
+            channel_id = data["channel_type_id"] and data["channel_type_id"][0]
+            channel_mix[channel_id] = {
+                "reservations": data["channel_type_id_count"],
+                "income": data["price_room_services_set"] or 0.0,
+            }
+        return channel_mix
+
+    def _get_journals_by_type(self):
+        """
+        @return: Return dict with the cash and bank journals of the property
+         {"cash": {"id": name, ...}, "bank": {"id": name, ...}}
+         A journal type without journals is returned as {"0": ""}
+        """
+        self.ensure_one()
+        journals = self.env["account.journal"].search_read(
+            [
+                ("type", "in", ("cash", "bank")),
+                ("pms_property_ids", "in", self.id),
+            ],
+            ["name", "type"],
+        )
+        data_journals = {"cash": {}, "bank": {}}
+        for journal in journals:
+            data_journals[journal["type"]][str(journal["id"])] = journal["name"]
+        for journal_type in data_journals:
+            if not data_journals[journal_type]:
+                data_journals[journal_type]["0"] = ""
+        return data_journals
+
+    @api.model
+    def _get_cached_options(self, key, compute):
+        """Option list of key, shared between requests and workers until a
+        write on its source models. The translated names depend on the lang
+        and the records on the access rules of the user and its companies,
+        which sudo environments skip.
+        """
+        env_key = (
+            self.env.lang,
+            self.env.uid,
+            tuple(self.env.companies.ids),
+            self.env.su,
+        )
+        options = calendar_cache.get_or_compute(
+            self.env, "options", key + env_key, compute
+        )
+        # The cached list must not be changed by the caller
+        return copy.deepcopy(options)
+
     def _get_allowed_payments_journals(self):
         """
         @return: Return dict with journals
@@ -126,54 +302,65 @@ class PmsProperty(models.Model):
           {"id": id, "name": name},
          ]
         """
-        payment_methods = self._get_payment_methods()
-        allowed_journals = []
-        for journal in payment_methods:
-            allowed_journals.append({"id": journal.id, "name": journal.name})
-        return allowed_journals
+
+        def _compute():
+            payment_methods = self._get_payment_methods()
+            allowed_journals = []
+            for journal in payment_methods:
+                allowed_journals.append({"id": journal.id, "name": journal.name})
+            return allowed_journals
+
+        return self._get_cached_options(("payments_journals", self.id), _compute)
 
     def _get_allowed_channel_type_ids(self):
-        domain = [("is_on_line", "=", False)]
-        channel_types = self.env["pms.sale.channel"].search(domain)
-        allowed_channel_types = []
-        for channel in channel_types:
-            allowed_channel_types.append({"id": channel.id, "name": channel.name})
-        return allowed_channel_types
+        def _compute():
+            domain = [("is_on_line", "=", False)]
+            channel_types = self.env["pms.sale.channel"].search(domain)
+            allowed_channel_types = []
+            for channel in channel_types:
+                allowed_channel_types.append({"id": channel.id, "name": channel.name})
+            return allowed_channel_types
+
+        return self._get_cached_options(("channel_types",), _compute)
 
     def _get_allowed_agency_ids(self, channel_type_id=False):
-        domain = [("is_on_line", "=", False)]
-        if channel_type_id:
-            domain.append(("id", "=", channel_type_id))
-        channel_types_ids = (
-            self.env["pms.sale.channel"].search(domain).ids
-        )
-        agencies = self.env["res.partner"].search(
-            [
-                ("is_agency", "=", True),
-                ("sale_channel_id", "in", channel_types_ids),
-            ]
-        )
-        allowed_agencies = [{"id": False, "name": ""}]
-        for agency in agencies:
-            allowed_agencies.append({"id": agency.id, "name": agency.name})
-        return allowed_agencies
+        def _compute():
+            domain = [("is_on_line", "=", False)]
+            if channel_type_id:
+                domain.append(("id", "=", channel_type_id))
+            channel_types_ids = self.env["pms.sale.channel"].search(domain).ids
+            agencies = self.env["res.partner"].search(
+                [
+                    ("is_agency", "=", True),
+                    ("sale_channel_id", "in", channel_types_ids),
+                ]
+            )
+            allowed_agencies = [{"id": False, "name": ""}]
+            for agency in agencies:
+                allowed_agencies.append({"id": agency.id, "name": agency.name})
+            return allowed_agencies
+
+        return self._get_cached_options(("agencies", channel_type_id), _compute)
 
     @api.model
     def _get_allowed_countries(self):
-        allowed_countries = [
-            {
-                "id": False,
-                "name": "",
-            }
-        ]
-        for country in self.env["res.country"].search([]):
-            allowed_countries.append(
+        def _compute():
+            allowed_countries = [
                 {
-                    "id": country.id,
-                    "name": country.name,
+                    "id": False,
+                    "name": "",
                 }
-            )
-        return allowed_countries
+            ]
+            for country in self.env["res.country"].search([]):
+                allowed_countries.append(
+                    {
+                        "id": country.id,
+                        "name": country.name,
+                    }
+                )
+            return allowed_countries
+
+        return self._get_cached_options(("countries",), _compute)
 
     @api.model
     def _get_langs(self):
@@ -0,0 +1,44 @@
+# Copyright 2021 Comunitea Servicios Tecnológicos
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+from ..calendar_cache import calendar_cache
+
+
+class PmsPwaOptionsMixin(models.AbstractModel):
+    _name = "pms.pwa.options.mixin"
+    _description = "Source of the PWA option lists"
+
+    # Fields of the model read by the option lists, a write on any other
+    # field keeps the cached lists
+    _options_fields = set()
+
+    def _is_options_record(self):
+        """Whether any of the records is shown in the option lists"""
+        return bool(self)
+
+    def _invalidate_options(self):
+        calendar_cache.invalidate(self.env, ("options",))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(PmsPwaOptionsMixin, self).create(vals_list)
+        if records._is_options_record():
+            records._invalidate_options()
+        return records
+
+    def write(self, vals):
+        if not self._options_fields.intersection(vals):
+            return super(PmsPwaOptionsMixin, self).write(vals)
+        # A record can enter or leave the lists with this write
+        shown = self._is_options_record()
+        res = super(PmsPwaOptionsMixin, self).write(vals)
+        if shown or self._is_options_record():
+            self._invalidate_options()
+        return res
+
+    def unlink(self):
+        if self._is_options_record():
+            self._invalidate_options()
+        return super(PmsPwaOptionsMixin, self).unlink()
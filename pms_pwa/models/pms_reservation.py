@@ -3,7 +3,6 @@
 import datetime
 import json
 import logging
-import pprint
 
 import avinit
 
@@ -12,12 +11,30 @@ from odoo.exceptions import ValidationError
 from odoo.tools.misc import get_lang
 
 from ..controllers import controller_room_types, controller_rooms
-
-pp = pprint.PrettyPrinter(indent=4)
+from ..pwa_debug import log_payload
 
 
 _logger = logging.getLogger(__name__)
 
+# Changes of these fields move the reservation nights in the occupancy table
+RESERVATION_OCCUPANCY_FIELDS = {
+    "state",
+    "reservation_type",
+    "preferred_room_id",
+    "room_type_id",
+    "overbooking",
+    "checkin",
+    "checkout",
+}
+
+# Sections of parse_reservation fetched on demand, name: method
+RESERVATION_SECTIONS = {
+    "folio": "_parse_reservation_folio",
+    "lines": "_parse_reservation_lines",
+    "options": "_parse_reservation_options",
+    "availability": "_parse_reservation_availability",
+}
+
 
 class PmsReservation(models.Model):
     _inherit = "pms.reservation"
@@ -108,6 +125,41 @@ class PmsReservation(models.Model):
                 self.env["res.users.notifications"].create(values)
         return record
 
+    def write(self, vals):
+        kpi_fields = {"state", "reservation_type", "checkin", "checkout"}
+        kpi_keys = set()
+        if kpi_fields.intersection(vals):
+            kpi_keys = self._get_kpi_keys()
+        # The stored computes of the lines (room, occupies_availability) are
+        # recomputed without going through the reservation line write hook
+        occupancy_keys = set()
+        refresh_occupancy = RESERVATION_OCCUPANCY_FIELDS.intersection(vals)
+        if refresh_occupancy:
+            occupancy_keys = self.reservation_line_ids._get_occupancy_keys()
+        res = super(PmsReservation, self).write(vals)
+        if refresh_occupancy:
+            self.env["pms.calendar.occupancy"]._refresh_occupancy(
+                occupancy_keys | self.reservation_line_ids._get_occupancy_keys()
+            )
+        if kpi_keys:
+            self.env["pms.dashboard.kpi"]._refresh_kpis(kpi_keys | self._get_kpi_keys())
+        return res
+
+    def unlink(self):
+        keys = self.reservation_line_ids._get_occupancy_keys()
+        kpi_keys = self._get_kpi_keys()
+        res = super(PmsReservation, self).unlink()
+        self.env["pms.calendar.occupancy"]._refresh_occupancy(keys)
+        self.env["pms.dashboard.kpi"]._refresh_kpis(kpi_keys)
+        return res
+
+    def _get_kpi_keys(self):
+        keys = self.reservation_line_ids._get_occupancy_keys()
+        for reservation in self:
+            keys.add((reservation.pms_property_id.id, reservation.checkin))
+            keys.add((reservation.pms_property_id.id, reservation.checkout))
+        return keys
+
     @api.depends("state")
     def _compute_state_value(self):
         for record in self:
@@ -190,7 +242,6 @@ class PmsReservation(models.Model):
             ):
                 avatar = avinit.get_avatar_data_url(record.partner_name)
                 record.partner_image_128 = avatar[26:]
-                _logger.info(record.partner_image_128)
             elif not record.partner_image_128:
                 record.partner_image_128 = False
 
@@ -580,17 +631,20 @@ class PmsReservation(models.Model):
 
     @api.model
     def _get_allowed_segmentations(self):
-        segmentations = self.env["res.partner.category"].search([])
-        allowed_segmentations = []
-        for tag in segmentations:
-            if tag.display_name not in [item["name"] for item in allowed_segmentations]:
-                allowed_segmentations.append(
-                    {
-                        "id": tag.id,
-                        "name": tag.display_name,
-                    }
-                )
-        return allowed_segmentations
+        def _compute():
+            # First tag of each name, in the categories order
+            segmentations = self.env["res.partner.category"].search([])
+            allowed_segmentations = []
+            names = set()
+            for tag_id, name in segmentations.name_get():
+                if name not in names:
+                    names.add(name)
+                    allowed_segmentations.append({"id": tag_id, "name": name})
+            return allowed_segmentations
+
+        return self.env["pms.property"]._get_cached_options(
+            ("segmentations",), _compute
+        )
 
     @api.depends("state", "reservation_type", "folio_pending_amount", "to_assign")
     def _compute_color_state(self):
@@ -634,8 +688,44 @@ class PmsReservation(models.Model):
             {"id": "staff", "name": "Staff"},
         ]
 
-    def parse_reservation(self):
+    def parse_reservation(self, sections=None):
+        """Serialize the reservation for the frontend
+        :param sections: names of the RESERVATION_SECTIONS added to the core
+         payload, None for all of them (the whole reservation)
+        @return: Return dict with the core values and the requested sections
+        """
         self.ensure_one()
+        reservation_values = self._parse_reservation_core()
+        reservation_values.update(self._parse_reservation_sections(sections))
+
+        log_payload("parse_reservation", reservation_values)
+        return reservation_values
+
+    def _parse_reservation_sections(self, sections=None):
+        """
+        @return: Return dict with the values of the requested sections only,
+         all of them if sections is None
+        """
+        self.ensure_one()
+        if sections is None:
+            sections = RESERVATION_SECTIONS.keys()
+        elif not isinstance(sections, (list, tuple)):
+            raise ValidationError(
+                _("Reservation sections must be a list of names: %s") % (sections,)
+            )
+        unknown_sections = set(sections) - set(RESERVATION_SECTIONS)
+        if unknown_sections:
+            raise ValidationError(
+                _("Unknown reservation sections: %s")
+                % ", ".join(sorted(unknown_sections))
+            )
+        values = {}
+        for section in sections:
+            values.update(getattr(self, RESERVATION_SECTIONS[section])())
+        return values
+
+    def _parse_reservation_core(self):
+        """Values of the reservation itself, cheap to compute"""
         primary_button, secondary_buttons = self.generate_reservation_style_buttons()
 
         if self.partner_id:
@@ -673,20 +763,7 @@ class PmsReservation(models.Model):
                 }
             )
 
-        readonly_fields = self._get_reservation_read_only_fields()
-
-        # avoid send o2m & m2m fields on new single reservation modal
-        reservation_line_ids = (
-            self._get_reservation_line_ids() if isinstance(self.id, int) else False
-        )
-        service_ids = self._get_service_ids() if isinstance(self.id, int) else False
-        checkin_partner_ids = (
-            self._get_checkin_partner_ids() if isinstance(self.id, int) else False
-        )
-
-        reservation_values = dict()
-
-        reservation_values = {
+        return {
             "id": self.id,
             "current_ubication_id": self.preferred_room_id.ubication_id.id,
             "current_room_type_id": self.preferred_room_id.room_type_id.id,
@@ -696,7 +773,6 @@ class PmsReservation(models.Model):
             "partner_id": partner_vals,
             "unread_msg": len(notifications),
             "messages": notifications,
-            "folio_reservations": self.folio_id.get_reservation_json(),
             "folio_reservations_count": len(self.folio_id.reservation_ids),
             "room_type_id": {
                 "id": self.room_type_id.id,
@@ -735,20 +811,14 @@ class PmsReservation(models.Model):
             "price_tax": round(self.price_tax, 2),
             "folio_pending_amount": round(self.folio_pending_amount, 2),
             "folio_internal_comment": self.folio_internal_comment,
-            "payment_methods": self.pms_property_id._get_allowed_payments_journals(),
-            "reservation_types": self._get_reservation_types(),
             "reservation_type": self.reservation_type,
             "checkins_ratio": self.checkins_ratio,
             "ratio_checkin_data": self.ratio_checkin_data,
             "adults": self.adults,
-            "checkin_partner_ids": checkin_partner_ids,
             "pms_property_id": {
                 "id": self.pms_property_id.id,
                 "name": self.pms_property_id.display_name,
             },
-            "service_ids": service_ids,
-            "reservation_line_ids": reservation_line_ids,
-            "allowed_board_service_room_ids": self._get_allowed_board_service_room_ids(),
             "board_service_room_id": {
                 "id": self.board_service_room_id.id
                 if self.board_service_room_id
@@ -758,13 +828,42 @@ class PmsReservation(models.Model):
                 else "",
             },
             "to_assign": self.to_assign,
-            "allowed_service_ids": self._get_allowed_service_ids(),
             "primary_button": primary_button,
             "secondary_buttons": secondary_buttons,
             "pricelist_id": {
                 "id": self.pricelist_id.id if self.pricelist_id else False,
                 "name": self.pricelist_id.name if self.pricelist_id else "",
             },
+            "segmentation_ids": self.segmentation_ids.ids,
+            "readonly_fields": self._get_reservation_read_only_fields(),
+            "required_fields": [],
+            # "allowed_country_ids": self.pms_property_id._get_allowed_countries(),
+            # "to_send_mail": self.to_send_mail,
+        }
+
+    def _parse_reservation_folio(self):
+        return {"folio_reservations": self.folio_id.get_reservation_json()}
+
+    def _parse_reservation_lines(self):
+        # avoid send o2m & m2m fields on new single reservation modal
+        if not isinstance(self.id, int):
+            return {
+                "reservation_line_ids": False,
+                "service_ids": False,
+                "checkin_partner_ids": False,
+            }
+        return {
+            "reservation_line_ids": self._get_reservation_line_ids(),
+            "service_ids": self._get_service_ids(),
+            "checkin_partner_ids": self._get_checkin_partner_ids(),
+        }
+
+    def _parse_reservation_options(self):
+        return {
+            "payment_methods": self.pms_property_id._get_allowed_payments_journals(),
+            "reservation_types": self._get_reservation_types(),
+            "allowed_board_service_room_ids": self._get_allowed_board_service_room_ids(),
+            "allowed_service_ids": self._get_allowed_service_ids(),
             "allowed_pricelists": self._get_allowed_pricelists(
                 [self.pms_property_id.id], self.channel_type_id.id
             ),
@@ -775,7 +874,10 @@ class PmsReservation(models.Model):
                 if self.channel_type_id
                 else False
             ),
-            "segmentation_ids": self.segmentation_ids.ids,
+        }
+
+    def _parse_reservation_availability(self):
+        return {
             "room_numbers": controller_rooms.Rooms._get_available_rooms(
                 self=self,
                 payload={
@@ -797,16 +899,8 @@ class PmsReservation(models.Model):
                     "reservation_id": self.id,
                 },
             ),
-            "readonly_fields": readonly_fields,
-            "required_fields": [],
-            # "allowed_country_ids": self.pms_property_id._get_allowed_countries(),
-            # "to_send_mail": self.to_send_mail,
         }
 
-        _logger.info("Values from controller to Frontend:")
-        pp.pprint(reservation_values)
-        return reservation_values
-
     def generate_reservation_style_buttons(self):
         self.ensure_one()
         buttons = json.loads(self.pwa_action_buttons)
@@ -875,29 +969,70 @@ class PmsReservation(models.Model):
             counter += 1
         return (primary_button, secondary_buttons)
 
+    def _get_free_rooms(self):
+        """Free rooms of each reservation, evaluated once for all the
+        reservations sharing property, pricelist and dates. The rooms of the
+        reservations in the group are taken as free and then the rooms used by
+        the other reservations of the group are removed.
+        @return: Return dict with the free rooms of each reservation
+         {reservation_id: pms.room recordset, ...}
+        """
+        groups = {}
+        for reservation in self:
+            key = (
+                reservation.pms_property_id,
+                reservation.pricelist_id.id,
+                reservation.checkin,
+                reservation.checkout,
+            )
+            groups.setdefault(key, self.browse())
+            groups[key] |= reservation
+        free_rooms = {}
+        for key, reservations in groups.items():
+            pms_property, pricelist_id, checkin, checkout = key
+            group_free_rooms = pms_property.with_context(
+                checkin=checkin,
+                checkout=checkout,
+                current_lines=reservations.reservation_line_ids.ids,
+                pricelist_id=pricelist_id,
+                class_id=False,
+                real_avail=True,
+            ).free_room_ids
+            group_rooms = reservations.reservation_line_ids.room_id
+            for reservation in reservations:
+                own_rooms = reservation.reservation_line_ids.room_id
+                free_rooms[reservation.id] = group_free_rooms - (
+                    group_rooms - own_rooms
+                )
+        return free_rooms
+
     def get_json(self):
-        self.ensure_one()
-        return {
-            "id": self.id,
-            "name": self.name,
-            "preferred_room_id": {
-                "id": self.preferred_room_id.id if self.preferred_room_id else False,
-                "name": self.rooms if self.rooms else "",
-            },
-            "room_numbers": controller_rooms.Rooms._get_available_rooms(
-                self=self,
-                payload={
-                    "pms_property_id": self.pms_property_id.id,
-                    "pricelist_id": self.pricelist_id.id,
-                    "checkin": self.checkin,
-                    "checkout": self.checkout,
-                    "reservation_id": self.id,
+        """
+        @return: Return list with the values of each reservation, the free
+         rooms of the reservations sharing dates are computed at once
+        """
+        free_rooms = self._get_free_rooms()
+        lang_date_format = get_lang(self.env).date_format
+        return [
+            {
+                "id": reservation.id,
+                "name": reservation.name,
+                "preferred_room_id": {
+                    "id": reservation.preferred_room_id.id
+                    if reservation.preferred_room_id
+                    else False,
+                    "name": reservation.rooms if reservation.rooms else "",
                 },
-            ),
-            "checkin": self.checkin.strftime(get_lang(self.env).date_format),
-            "checkout": self.checkout.strftime(get_lang(self.env).date_format),
-            "adults": self.adults,
-        }
+                "room_numbers": [
+                    {"id": room.id, "name": room.display_name}
+                    for room in free_rooms[reservation.id]
+                ],
+                "checkin": reservation.checkin.strftime(lang_date_format),
+                "checkout": reservation.checkout.strftime(lang_date_format),
+                "adults": reservation.adults,
+            }
+            for reservation in self
+        ]
 
     def _get_reservation_read_only_fields(self):
         self.ensure_one()
@@ -0,0 +1,81 @@
+# Copyright 2021 Comunitea Servicios Tecnológicos
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from datetime import timedelta
+
+from odoo import api, models
+
+OCCUPANCY_FIELDS = {
+    "date",
+    "room_id",
+    "reservation_id",
+    "pms_property_id",
+    "occupies_availability",
+}
+
+# Changes of these fields also change the KPIs of the reservation dates
+KPI_FIELDS = OCCUPANCY_FIELDS | {"price", "discount", "cancel_discount"}
+
+
+class PmsReservationLine(models.Model):
+    _inherit = "pms.reservation.line"
+
+    def _get_occupancy_keys(self):
+        return {(line.pms_property_id.id, line.date) for line in self}
+
+    def _get_kpi_keys(self):
+        return self._get_occupancy_keys() | self.reservation_id._get_kpi_keys()
+
+    def _get_room_runs(self, dates):
+        """Consecutive nights of each reservation in each room, the nights of
+        overlapping reservations in the same room are kept apart.
+        @return: Return list of [room_id, reservation_id, first_date, last_date]
+        """
+        runs = []
+        current_run = False
+        for room_id, reservation_id, night_date in sorted(
+            (line.room_id.id, line.reservation_id.id, line.date)
+            for line in self
+            if line.date in dates
+        ):
+            if (
+                current_run
+                and current_run[0] == room_id
+                and current_run[1] == reservation_id
+                and current_run[3] + timedelta(days=1) == night_date
+            ):
+                current_run[3] = night_date
+                continue
+            current_run = [room_id, reservation_id, night_date, night_date]
+            runs.append(current_run)
+        return runs
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(PmsReservationLine, self).create(vals_list)
+        self.env["pms.calendar.occupancy"]._refresh_occupancy(
+            records._get_occupancy_keys()
+        )
+        self.env["pms.dashboard.kpi"]._refresh_kpis(records._get_kpi_keys())
+        return records
+
+    def write(self, vals):
+        if not KPI_FIELDS.intersection(vals):
+            return super(PmsReservationLine, self).write(vals)
+        keys = self._get_occupancy_keys()
+        kpi_keys = self._get_kpi_keys()
+        res = super(PmsReservationLine, self).write(vals)
+        if OCCUPANCY_FIELDS.intersection(vals):
+            keys |= self._get_occupancy_keys()
+            self.env["pms.calendar.occupancy"]._refresh_occupancy(keys)
+        kpi_keys |= self._get_kpi_keys()
+        self.env["pms.dashboard.kpi"]._refresh_kpis(kpi_keys)
+        return res
+
+    def unlink(self):
+        keys = self._get_occupancy_keys()
+        kpi_keys = self._get_kpi_keys()
+        res = super(PmsReservationLine, self).unlink()
+        self.env["pms.calendar.occupancy"]._refresh_occupancy(keys)
+        self.env["pms.dashboard.kpi"]._refresh_kpis(kpi_keys)
+        return res
@@ -0,0 +1,71 @@
+# Copyright 2021 Comunitea Servicios Tecnológicos
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, fields, models
+
+from ..calendar_cache import calendar_cache
+
+HOUSEKEEPING_STATES = [
+    ("ready", "Limpia"),
+    ("dirty", "Sucia"),
+    ("cleaning", "Limpiándose"),
+]
+
+
+class PmsRoom(models.Model):
+    _inherit = "pms.room"
+
+    housekeeping_state = fields.Selection(
+        string="Housekeeping State",
+        selection=HOUSEKEEPING_STATES,
+        default="ready",
+        required=True,
+        index=True,
+    )
+
+    def _get_counter_deltas(self, sign, deltas=None):
+        """Add sign to the rooms count of the state of each counted room
+        @return: Return dict {(pms_property_id, housekeeping_state): delta}
+        """
+        deltas = {} if deltas is None else deltas
+        for room in self:
+            if room.active and room.pms_property_id and room.housekeeping_state:
+                key = (room.pms_property_id.id, room.housekeeping_state)
+                deltas[key] = deltas.get(key, 0) + sign
+        return deltas
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        calendar_cache.invalidate(self.env, ("general",))
+        records = super(PmsRoom, self).create(vals_list)
+        self.env["pms.room.status.counter"]._apply_deltas(
+            records._get_counter_deltas(1)
+        )
+        return records
+
+    def write(self, vals):
+        if {"active", "pms_property_id", "room_type_id"}.intersection(vals):
+            calendar_cache.invalidate(self.env, ("general",))
+        counter_fields = {"active", "pms_property_id", "housekeeping_state"}
+        refresh_counters = counter_fields.intersection(vals)
+        deltas = self._get_counter_deltas(-1) if refresh_counters else {}
+        res = super(PmsRoom, self).write(vals)
+        if refresh_counters:
+            self.env["pms.room.status.counter"]._apply_deltas(
+                self._get_counter_deltas(1, deltas)
+            )
+        if "room_type_id" in vals:
+            lines = self.env["pms.reservation.line"].search(
+                [("room_id", "in", self.ids)]
+            )
+            self.env["pms.calendar.occupancy"]._refresh_occupancy(
+                lines._get_occupancy_keys()
+            )
+        return res
+
+    def unlink(self):
+        calendar_cache.invalidate(self.env, ("general",))
+        deltas = self._get_counter_deltas(-1)
+        res = super(PmsRoom, self).unlink()
+        self.env["pms.room.status.counter"]._apply_deltas(deltas)
+        return res
@@ -0,0 +1,112 @@
+# Copyright 2021 Comunitea Servicios Tecnológicos
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, fields, models
+
+from .pms_room import HOUSEKEEPING_STATES
+
+
+class PmsRoomStatusCounter(models.Model):
+    _name = "pms.room.status.counter"
+    _description = "Rooms count by housekeeping state"
+    _log_access = False
+
+    pms_property_id = fields.Many2one(
+        string="PMS Property",
+        help="tecnical field to group the rooms count by property",
+        comodel_name="pms.property",
+        required=True,
+        ondelete="cascade",
+    )
+    housekeeping_state = fields.Selection(
+        string="Housekeeping State",
+        selection=HOUSEKEEPING_STATES,
+        required=True,
+    )
+    rooms = fields.Integer(string="Rooms")
+
+    _sql_constraints = [
+        (
+            "counter_unique",
+            "unique(pms_property_id, housekeeping_state)",
+            "The rooms count must be unique by property and housekeeping state",
+        ),
+    ]
+
+    def init(self):
+        self.env.cr.execute("SELECT 1 FROM pms_room_status_counter LIMIT 1")
+        if not self.env.cr.fetchone():
+            self._refresh_counters()
+
+    @api.model
+    def _refresh_counters(self, pms_property_ids=False):
+        """Recompute the rooms count of the given properties (or all of them),
+        used to build and repair the table, the room hooks apply deltas
+        """
+        self.env["pms.room"].flush(["pms_property_id", "housekeeping_state", "active"])
+        where = ""
+        params = ()
+        if pms_property_ids:
+            where = "AND pms_property_id IN %s"
+            params = (tuple(pms_property_ids),)
+        self.env.cr.execute(
+            "DELETE FROM pms_room_status_counter WHERE TRUE " + where, params
+        )
+        self.env.cr.execute(
+            """
+            INSERT INTO pms_room_status_counter
+                (pms_property_id, housekeeping_state, rooms)
+            SELECT  pms_property_id, housekeeping_state, count(*)
+            FROM    pms_room
+            WHERE   active = TRUE
+                AND pms_property_id IS NOT NULL
+                AND housekeeping_state IS NOT NULL
+                {}
+            GROUP BY pms_property_id, housekeeping_state
+            """.format(
+                where
+            ),
+            params,
+        )
+        self.invalidate_cache()
+
+    @api.model
+    def _apply_deltas(self, deltas):
+        """Add the deltas to the rooms count, only the changed rows are
+        updated so concurrent changes of other states don't conflict
+
+        :param deltas: dict {(pms_property_id, housekeeping_state): delta}
+        """
+        # Sorted to lock the rows always in the same order
+        for (pms_property_id, housekeeping_state), delta in sorted(deltas.items()):
+            if not delta:
+                continue
+            self.env.cr.execute(
+                """
+                INSERT INTO pms_room_status_counter
+                    (pms_property_id, housekeeping_state, rooms)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (pms_property_id, housekeeping_state)
+                DO UPDATE SET rooms = pms_room_status_counter.rooms + EXCLUDED.rooms
+                """,
+                (pms_property_id, housekeeping_state, delta),
+            )
+        self.invalidate_cache()
+
+    @api.model
+    def _get_counters(self, pms_property_id):
+        """
+        @return: Return dict with the rooms count of each housekeeping state
+         {"ready": rooms, "dirty": rooms, "cleaning": rooms}
+        """
+        counters = dict.fromkeys([state for state, _name in HOUSEKEEPING_STATES], 0)
+        self.env.cr.execute(
+            """
+            SELECT  housekeeping_state, rooms
+            FROM    pms_room_status_counter
+            WHERE   pms_property_id = %s
+            """,
+            (pms_property_id,),
+        )
+        counters.update(self.env.cr.fetchall())
+        return counters
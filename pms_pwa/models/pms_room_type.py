@@ -15,6 +15,24 @@ class PmsPWARoomType(models.Model):
             self.room_ids.filtered(lambda r: r.pms_property_id.id == pms_property_id)
         )
 
+    def _get_total_rooms_by_room_type(self, pms_property_id):
+        """
+        @return: Return dict with the rooms count of each room type
+         {room_type_id: total_rooms, ...}
+        """
+        rooms_data = self.env["pms.room"].read_group(
+            [
+                ("pms_property_id", "=", pms_property_id),
+                ("room_type_id", "in", self.ids),
+            ],
+            ["room_type_id"],
+            ["room_type_id"],
+        )
+        total_rooms = dict.fromkeys(self.ids, 0)
+        for data in rooms_data:
+            total_rooms[data["room_type_id"][0]] = data["room_type_id_count"]
+        return total_rooms
+
     def _get_availability_rooms(self, pms_property_id):
         avail = 0
         if self._context.get("checkin") and self._context.get("checkout"):
@@ -0,0 +1,11 @@
+# Copyright 2021 Comunitea Servicios Tecnológicos
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import models
+
+
+class PmsSaleChannel(models.Model):
+    _name = "pms.sale.channel"
+    _inherit = ["pms.sale.channel", "pms.pwa.options.mixin"]
+
+    _options_fields = {"name", "is_on_line", "active"}
@@ -9,6 +9,24 @@ from odoo.tools.misc import get_lang
 class PmsService(models.Model):
     _inherit = "pms.service"
 
+    def write(self, vals):
+        if "reservation_id" not in vals:
+            return super(PmsService, self).write(vals)
+        kpi_keys = self.reservation_id._get_kpi_keys()
+        res = super(PmsService, self).write(vals)
+        self.env["pms.dashboard.kpi"]._refresh_kpis(
+            kpi_keys | self.reservation_id._get_kpi_keys()
+        )
+        return res
+
+    def unlink(self):
+        # The service lines are removed by the database cascade, without
+        # their unlink hook
+        kpi_keys = self.reservation_id._get_kpi_keys()
+        res = super(PmsService, self).unlink()
+        self.env["pms.dashboard.kpi"]._refresh_kpis(kpi_keys)
+        return res
+
     def _get_service_line_ids(self):
         """
         @return: Return dict with service_line_ids
@@ -27,6 +45,4 @@ class PmsService(models.Model):
                 "date": line.date.strftime(get_lang(self.env).date_format),
                 "price_unit": line.price_unit,
             }
-        print("LINES SERVICES")
-        print(service_line_ids)
         return service_line_ids
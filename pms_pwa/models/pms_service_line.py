@@ -0,0 +1,40 @@
+# Copyright 2021 Comunitea Servicios Tecnológicos
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+# Changes of these fields change the amount of the service reservation
+REVENUE_FIELDS = {
+    "day_qty",
+    "price_unit",
+    "discount",
+    "cancel_discount",
+    "service_id",
+}
+
+
+class PmsServiceLine(models.Model):
+    _inherit = "pms.service.line"
+
+    def _get_kpi_keys(self):
+        return self.service_id.reservation_id._get_kpi_keys()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(PmsServiceLine, self).create(vals_list)
+        self.env["pms.dashboard.kpi"]._refresh_kpis(records._get_kpi_keys())
+        return records
+
+    def write(self, vals):
+        if not REVENUE_FIELDS.intersection(vals):
+            return super(PmsServiceLine, self).write(vals)
+        kpi_keys = self._get_kpi_keys()
+        res = super(PmsServiceLine, self).write(vals)
+        self.env["pms.dashboard.kpi"]._refresh_kpis(kpi_keys | self._get_kpi_keys())
+        return res
+
+    def unlink(self):
+        kpi_keys = self._get_kpi_keys()
+        res = super(PmsServiceLine, self).unlink()
+        self.env["pms.dashboard.kpi"]._refresh_kpis(kpi_keys)
+        return res
@@ -0,0 +1,122 @@
+# Copyright 2021 Comunitea Servicios Tecnológicos
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import datetime
+
+from odoo import models
+
+from ..calendar_cache import calendar_cache
+
+
+class ProductPricelist(models.Model):
+    _inherit = "product.pricelist"
+
+    def write(self, vals):
+        if "availability_plan_id" in vals:
+            calendar_cache.invalidate(self.env, ("rules",))
+        return super(ProductPricelist, self).write(vals)
+
+    def _get_daily_prices(self, products, dates, pms_property_id):
+        """Read the product items of the products in the dates range and pick
+        the one _compute_price_rule would apply to each date, following the pms
+        order of _compute_price_rule_get_items: shorter consumption ranges
+        first, then the items restricted to the property, then the newest.
+        Only the fixed prices are returned, the products with items without
+        consumption range are left to _compute_price_rule.
+        @return: Return dict with the price of each date and product
+         {date: {product_id: price, ...}, ...}
+        """
+        self.ensure_one()
+        today = datetime.date.today()
+        date_from, date_to = min(dates), max(dates)
+        items = self.env["product.pricelist.item"].search_read(
+            [
+                ("pricelist_id", "=", self.id),
+                ("applied_on", "=", "0_product_variant"),
+                ("product_id", "in", products.ids),
+                ("min_quantity", "<=", 1),
+                "|",
+                ("date_start_consumption", "=", False),
+                ("date_start_consumption", "<=", date_to),
+                "|",
+                ("date_end_consumption", "=", False),
+                ("date_end_consumption", ">=", date_from),
+                "|",
+                ("date_start", "=", False),
+                ("date_start", "<=", today),
+                "|",
+                ("date_end", "=", False),
+                ("date_end", ">=", today),
+                "|",
+                ("pms_property_ids", "=", False),
+                ("pms_property_ids", "in", pms_property_id),
+            ],
+            [
+                "product_id",
+                "date_start_consumption",
+                "date_end_consumption",
+                "compute_price",
+                "fixed_price",
+                "pms_property_ids",
+            ],
+        )
+        open_products = {
+            item["product_id"][0]
+            for item in items
+            if not item["date_start_consumption"] or not item["date_end_consumption"]
+        }
+        dates = set(dates)
+        best_items = {}
+        for item in items:
+            product_id = item["product_id"][0]
+            if product_id in open_products:
+                continue
+            priority = (
+                (item["date_end_consumption"] - item["date_start_consumption"]).days,
+                not item["pms_property_ids"],
+                -item["id"],
+            )
+            day = max(item["date_start_consumption"], date_from)
+            while day <= min(item["date_end_consumption"], date_to):
+                key = (day, product_id)
+                if day in dates and (
+                    key not in best_items or priority < best_items[key][0]
+                ):
+                    best_items[key] = (priority, item)
+                day += datetime.timedelta(days=1)
+        daily_prices = {}
+        for (day, product_id), (_priority, item) in best_items.items():
+            if item["compute_price"] == "fixed":
+                daily_prices.setdefault(day, {})[product_id] = item["fixed_price"]
+        return daily_prices
+
+    def _compute_price_rule_matrix(self, products, dates, pms_property_id):
+        """Evaluate the pricelist for all the products and dates at once.
+        Daily pricelists are resolved with a single read of their product
+        items, only the cells without a fixed product item go through
+        _compute_price_rule.
+        @return: Return dict with the price of each date and product
+         {date: {product_id: price, ...}, ...}
+        """
+        self.ensure_one()
+        prices = {}
+        if not dates or not products:
+            return prices
+        if self.pricelist_type == "daily":
+            prices = self._get_daily_prices(products, dates, pms_property_id)
+        for date in dates:
+            date_prices = prices.setdefault(date, {})
+            missing_products = products.filtered(lambda p: p.id not in date_prices)
+            if not missing_products:
+                continue
+            rule_prices = self.with_context(
+                quantity=1,
+                consumption_date=date,
+                property=pms_property_id,
+            )._compute_price_rule(
+                [(product, 1, False) for product in missing_products],
+                datetime.datetime.today(),
+            )
+            for product_id, rule_price in rule_prices.items():
+                date_prices[product_id] = rule_price[0]
+        return prices
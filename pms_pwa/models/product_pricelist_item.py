@@ -0,0 +1,23 @@
+# Copyright 2021 Comunitea Servicios Tecnológicos
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+from ..calendar_cache import calendar_cache
+
+
+class ProductPricelistItem(models.Model):
+    _inherit = "product.pricelist.item"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        calendar_cache.invalidate(self.env, ("price",))
+        return super(ProductPricelistItem, self).create(vals_list)
+
+    def write(self, vals):
+        calendar_cache.invalidate(self.env, ("price",))
+        return super(ProductPricelistItem, self).write(vals)
+
+    def unlink(self):
+        calendar_cache.invalidate(self.env, ("price",))
+        return super(ProductPricelistItem, self).unlink()
@@ -0,0 +1,11 @@
+# Copyright 2021 Comunitea Servicios Tecnológicos
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import models
+
+
+class ResCountry(models.Model):
+    _name = "res.country"
+    _inherit = ["res.country", "pms.pwa.options.mixin"]
+
+    _options_fields = {"name", "active"}
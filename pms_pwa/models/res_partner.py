@@ -7,7 +7,14 @@ from odoo.tools.misc import get_lang
 
 
 class ResPartner(models.Model):
-    _inherit = "res.partner"
+    _name = "res.partner"
+    _inherit = ["res.partner", "pms.pwa.options.mixin"]
+
+    # Fields of the agencies shown in the option lists
+    _options_fields = {"name", "is_agency", "sale_channel_id", "active"}
+
+    def _is_options_record(self):
+        return any(self.mapped("is_agency"))
 
     def parse_res_partner(self):
         self.ensure_one()
@@ -3,6 +3,8 @@
 
 from odoo import _, api, fields, models
 
+from ..pwa_debug import log_payload
+
 
 class ResPartner(models.Model):
     _inherit = "res.users"
@@ -63,7 +65,7 @@ class ResPartner(models.Model):
                     "model": notification.model_id.model,
                 }
             notifications.append(data)
-        print("notifications: {}".format(notifications))
+        log_payload("pwa_notifications", notifications)
         return notifications
 
 
@@ -0,0 +1,42 @@
+# Copyright 2021 Comunitea Servicios Tecnológicos
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import logging
+import random
+import reprlib
+
+# Dedicated logger, enabled with --log-handler=odoo.addons.pms_pwa.payload:DEBUG
+_logger = logging.getLogger("odoo.addons.pms_pwa.payload")
+
+# Max characters of a logged payload
+PAYLOAD_MAX_SIZE = 2000
+
+# Fraction of the requests logged by endpoint, the others are always logged
+SAMPLE_RATES = {
+    "calendar_list": 0.1,
+    "parse_reservation": 0.1,
+    "property_calendar": 0.1,
+}
+
+# The payload is formatted up to these limits, big grids are never expanded
+_payload_repr = reprlib.Repr()
+_payload_repr.maxlevel = 4
+_payload_repr.maxdict = 20
+_payload_repr.maxlist = 20
+_payload_repr.maxstring = 200
+_payload_repr.maxother = 200
+
+
+def log_payload(endpoint, payload, message="payload"):
+    """Log the payload of endpoint at debug level, sampled and capped.
+    Nothing is formatted when the payload logger is disabled.
+    """
+    if not _logger.isEnabledFor(logging.DEBUG):
+        return
+    sample_rate = SAMPLE_RATES.get(endpoint, 1.0)
+    if sample_rate < 1.0 and random.random() >= sample_rate:
+        return
+    text = _payload_repr.repr(payload)
+    if len(text) > PAYLOAD_MAX_SIZE:
+        text = text[:PAYLOAD_MAX_SIZE] + "..."
+    _logger.debug("endpoint=%s %s=%s", endpoint, message, text)
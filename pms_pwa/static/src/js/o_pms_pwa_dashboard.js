@@ -118,13 +118,109 @@ odoo.define("pms_pwa.dashboard", function (require) {
             return this._super.apply(this, arguments);
         },
         start: function () {
-            this.pms_pwa_initiate_doughnuts();
-            // TO FIX
-            // Error rendering this chat on start.
-            // Doing it the old way at the bottom of the file.
-            //this.pms_pwa_initiate_lines();
+            this.pms_pwa_load_widgets();
             return this._super.apply(this, arguments);
         },
+        /* Lazy widgets */
+        pms_pwa_load_widgets: function () {
+            var self = this;
+            // Requested in parallel, each widget is filled as soon as it arrives
+            _.each(["arrivals_departures", "rooms"], function (widget) {
+                ajax.jsonRpc("/dashboard/" + widget, "call", {}).then(function (data) {
+                    self.pms_pwa_fill_widget(data);
+                });
+            });
+            this.pms_pwa_load_cash_bank();
+            ajax.jsonRpc("/dashboard/evolutions", "call", {}).then(function (data) {
+                _.each(data.evolutions, function (evolution) {
+                    var line = $("#" + evolution.selector + " canvas.o_pms_pwa_line");
+                    line.attr({
+                        "data-labels": evolution.labels,
+                        "data-data_1": evolution.data_1,
+                        "data-data_2": evolution.data_2,
+                    });
+                });
+                self.pms_pwa_initiate_lines();
+            });
+            ajax.jsonRpc("/dashboard/kpis", "call", {}).then(function (data) {
+                var doughnuts = $(".o_pms_pwa_doughnut");
+                var ratios = $(".o_pms_pwa_kpi_ratio");
+                _.each(data.kpis, function (kpi, index) {
+                    doughnuts.eq(index).attr({
+                        "data-labels": kpi.labels,
+                        "data-data": kpi.data,
+                    });
+                    ratios.eq(index).text(kpi.ratio);
+                });
+                self.pms_pwa_initiate_doughnuts();
+            });
+        },
+        pms_pwa_load_cash_bank: function () {
+            var self = this;
+            ajax.jsonRpc("/dashboard/cash_bank", "call", {}).then(function (data) {
+                self.pms_pwa_fill_widget(data);
+                var status = data.cash.status;
+                $("a.o_pms_pwa_modal_cash_register_close")
+                    .attr("data-title", status)
+                    .text(status === "open" ? "Abrir Caja" : "Cerrar Caja")
+                    .removeClass("d-none");
+                $("#o_pms_pwa_dashboard_cash_journals").html(
+                    self.pms_pwa_render_payments(data.cash.payments)
+                );
+                $("#o_pms_pwa_dashboard_bank_journals").html(
+                    self.pms_pwa_render_payments(data.bank_journals.payments)
+                );
+            });
+        },
+        pms_pwa_render_payments: function (payments) {
+            var html = "";
+            _.each(payments, function (payment) {
+                html +=
+                    '<div class="row"><div class="col-9"><a href="" type="button" class="o_pms_pwa_btn_border px-3 o_pms_pwa_edit_payment_modal" data-id="' +
+                    payment.id +
+                    '" data-name="' +
+                    _.escape(payment.simple_name) +
+                    '" data-amount="' +
+                    payment.amount +
+                    '" data-toggle="modal" data-target="#o_pms_pwa_edit_payment_modal"><i class="fa fa-edit"></i></a><span>' +
+                    _.escape(payment.name) +
+                    '</span></div><div class="col-3 text-right o_pms_pwa_db_dates"' +
+                    (payment.amount < 0 ? ' style="color:red;"' : "") +
+                    "><span>" +
+                    payment.amount +
+                    "</span>€</div></div>";
+            });
+            return html;
+        },
+        pms_pwa_get_widget_value: function (data, path) {
+            var value = data;
+            _.each(path.split("."), function (key) {
+                value = value === undefined ? undefined : value[key];
+            });
+            return value;
+        },
+        pms_pwa_fill_widget: function (data) {
+            var self = this;
+            $("[data-pms-widget-value]").each(function () {
+                var value = self.pms_pwa_get_widget_value(
+                    data,
+                    this.dataset.pmsWidgetValue
+                );
+                if (value !== undefined) {
+                    $(this).text(value);
+                }
+            });
+            $("[data-pms-widget-progress]").each(function () {
+                var value = self.pms_pwa_get_widget_value(
+                    data,
+                    this.dataset.pmsWidgetProgress
+                );
+                if (value !== undefined) {
+                    var width = (value / 20) * 100;
+                    $(this).css("width", width + "%").attr("aria-valuenow", width);
+                }
+            });
+        },
         /* OnClick events */
         _onClickAceptAllTask: function (ev) {
             var self = this;
@@ -218,7 +314,7 @@ odoo.define("pms_pwa.dashboard", function (require) {
             }).then(function (data) {
                 let obj = JSON.parse(data);
                 self.displayDataAlert(data);
-                $("section#cash_values").load("/dashboard section#cash_values>*");
+                self.pms_pwa_load_cash_bank();
             });
         },
         _onClickBankPayment: function (ev) {
@@ -240,7 +336,7 @@ odoo.define("pms_pwa.dashboard", function (require) {
             }).then(function (data) {
                 let obj = JSON.parse(data);
                 self.displayDataAlert(data);
-                $("section#cash_values").load("/dashboard section#cash_values>*");
+                self.pms_pwa_load_cash_bank();
             });
         },
         _onClickCashInternal: function (ev) {
@@ -265,7 +361,7 @@ odoo.define("pms_pwa.dashboard", function (require) {
             }).then(function (data) {
                 let obj = JSON.parse(data);
                 self.displayDataAlert(data);
-                $("section#cash_values").load("/dashboard section#cash_values>*");
+                self.pms_pwa_load_cash_bank();
             });
         },
         _onClickModalCashPayment: function (e) {
@@ -333,7 +429,7 @@ odoo.define("pms_pwa.dashboard", function (require) {
                 journal_id: payment_method,
             }).then(function (data) {
                 self.displayDataAlert(data);
-                $("section#cash_values").load("/dashboard section#cash_values>*");
+                self.pms_pwa_load_cash_bank();
             });
         },
         _onClickBankFilter: function (e) {
@@ -347,40 +443,9 @@ odoo.define("pms_pwa.dashboard", function (require) {
                 journal_date: journal_date,
                 journal_id: journal_selected,
             }).then(function (data) {
-                let new_html = "";
-                let payments = data["bank_journals"]["payments"];
-                for (let val in payments) {
-                    if(payments[val]["amount"] < 0){
-                        new_html =
-                            new_html +
-                            '<div class="row"><div class="col-9"><a href="" type="button" class="o_pms_pwa_btn_border px-3 o_pms_pwa_edit_payment_modal" data-id="' +
-                            payments[val]["id"] +
-                            '" data-name="' +
-                            payments[val]["simple_name"] +
-                            '" data-amount="' +
-                            payments[val]["amount"] +
-                            '" data-toggle="modal" data-target="#o_pms_pwa_edit_payment_modal"><i class="fa fa-edit"></i></a><span>' +
-                            payments[val]["name"] +
-                            '</span></div><div class="col-3 text-right o_pms_pwa_db_dates" style="color:red;"><span>' +
-                            payments[val]["amount"] +
-                            "</span>€</div></div>";
-                    }else{
-                        new_html =
-                            new_html +
-                            '<div class="row"><div class="col-9"><a href="" type="button" class="o_pms_pwa_btn_border px-3 o_pms_pwa_edit_payment_modal" data-id="' +
-                            payments[val]["id"] +
-                            '" data-name="' +
-                            payments[val]["simple_name"] +
-                            '" data-amount="' +
-                            payments[val]["amount"] +
-                            '" data-toggle="modal" data-target="#o_pms_pwa_edit_payment_modal"><i class="fa fa-edit"></i></a><span>' +
-                            payments[val]["name"] +
-                            '</span></div><div class="col-3 text-right o_pms_pwa_db_dates"><span>' +
-                            payments[val]["amount"] +
-                            "</span>€</div></div>";
-                    }
-                }
-                $("#o_pms_pwa_dashboard_bank_journals").html(new_html);
+                $("#o_pms_pwa_dashboard_bank_journals").html(
+                    self.pms_pwa_render_payments(data["bank_journals"]["payments"])
+                );
             });
         },
         _onClickCashFilter: function (e) {
@@ -394,74 +459,12 @@ odoo.define("pms_pwa.dashboard", function (require) {
                 journal_date: journal_date,
                 journal_id: journal_selected,
             }).then(function (data) {
-                let new_html = "";
-                let payments = data["cash"]["payments"];
-                for (let val in payments) {
-                    if(payments[val]["amount"] < 0){
-                        new_html =
-                            new_html +
-                            '<div class="row"><div class="col-9"><a href="" type="button" class="o_pms_pwa_btn_border px-3 o_pms_pwa_edit_payment_modal" data-id="' +
-                            payments[val]["id"] +
-                            '" data-name="' +
-                            payments[val]["simple_name"] +
-                            '" data-amount="' +
-                            payments[val]["amount"] +
-                            '" data-toggle="modal" data-target="#o_pms_pwa_edit_payment_modal"><i class="fa fa-edit"></i></a><span>' +
-                            payments[val]["name"] +
-                            '</span></div><div class="col-3 text-right o_pms_pwa_db_dates" style="color:red;"><span>' +
-                            payments[val]["amount"] +
-                            "</span>€</div></div>";
-                    }else{
-                        new_html =
-                            new_html +
-                            '<div class="row"><div class="col-9"><a href="" type="button" class="o_pms_pwa_btn_border px-3 o_pms_pwa_edit_payment_modal" data-id="' +
-                            payments[val]["id"] +
-                            '" data-name="' +
-                            payments[val]["simple_name"] +
-                            '" data-amount="' +
-                            payments[val]["amount"] +
-                            '" data-toggle="modal" data-target="#o_pms_pwa_edit_payment_modal"><i class="fa fa-edit"></i></a><span>' +
-                            payments[val]["name"] +
-                            '</span></div><div class="col-3 text-right o_pms_pwa_db_dates"><span>' +
-                            payments[val]["amount"] +
-                            "</span>€</div></div>";
-                    }
-                }
-                $("#o_pms_pwa_dashboard_cash_journals").html(new_html);
+                $("#o_pms_pwa_dashboard_cash_journals").html(
+                    self.pms_pwa_render_payments(data["cash"]["payments"])
+                );
             });
         },
     });
 
-    $.each(document.getElementsByClassName("o_pms_pwa_line"), function (key, line) {
-        new Chart(line, {
-            type: "line",
-            data: {
-                labels: line.dataset.labels.split(","),
-                datasets: [
-                    {
-                        label: line.dataset.label_1,
-                        data: line.dataset.data_1.split(","),
-                        backgroundColor: line.dataset.background_color_1.split(","),
-                        borderColor: line.dataset.border_color_1.split(","),
-                        borderWidth: 1,
-                    },
-                    {
-                        label: line.dataset.label_2,
-                        data: line.dataset.data_2.split(","),
-                        backgroundColor: line.dataset.background_color_2.split(","),
-                        borderColor: line.dataset.border_color_2.split(","),
-                        borderWidth: 1,
-                    },
-                ],
-            },
-            options: {
-                legend: {
-                    position: "bottom",
-                    align: "end",
-                },
-            },
-        });
-    });
-
     return publicWidget.registry.PMSPWADashboardWidget;
 });
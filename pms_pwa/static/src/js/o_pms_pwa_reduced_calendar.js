@@ -968,11 +968,35 @@ odoo.define("pms_pwa.reducedCalendarRoomdoo", function (require) {
                 send_values,
             }).then(function (updated_data) {
                 $("#changesDaysValues").modal("toggle");
-                let property = $("input[name='selected_property']").val();
-                let parameters = "?selected_property="+property;
-                window.location = "/calendar/reduced" + parameters;
+                $("#status").toggle();
+                $("#preloader").toggle();
+                pms_pwa_wait_massive_change_job(updated_data.job_id);
             });
         },
     });
+    // Poll the massive changes job until it ends, the calendar is reloaded
+    // once the changes are applied
+    function pms_pwa_wait_massive_change_job(job_id) {
+        ajax.jsonRpc("/calendar/modal/job", "call", {
+            job_id: job_id,
+        }).then(function (job) {
+            if (job.result && job.state === "done") {
+                let property = $("input[name='selected_property']").val();
+                let parameters = "?selected_property=" + property;
+                window.location = "/calendar/reduced" + parameters;
+            } else if (job.result && job.state !== "failed") {
+                setTimeout(function () {
+                    pms_pwa_wait_massive_change_job(job_id);
+                }, 2000);
+            } else {
+                $("#status").toggle();
+                $("#preloader").toggle();
+                var alert = core.qweb.render("pms_pwa.reservation_alerts", {
+                    alert: {type: "warning", message: job.message},
+                });
+                $(".o_pms_pwa_roomdoo_alerts").append(alert);
+            }
+        });
+    }
     return publicWidget.registry.ReducedCalendarCollapseWidget;
 });
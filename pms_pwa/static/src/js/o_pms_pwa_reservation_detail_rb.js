@@ -270,6 +270,8 @@ odoo.define("pms_pwa.reservation_detail", function (require) {
         // Console.log("--->", new_event);
         // console.log("VAlue --->", values);
         if (new_event.currentTarget.name !== "range_check_date_detail_reservation") {
+            // The page is reloaded, only the core payload is needed
+            values.sections = [];
             ajax.jsonRpc(
                 "/reservation/" + reservation_id + "/onchange_data",
                 "call",
@@ -582,6 +584,7 @@ odoo.define("pms_pwa.reservation_detail", function (require) {
             "call",
             {
                 service_ids,
+                sections: [],
             }
         ).then(function (new_data) {
             console.log("new_data => ", new_data);
@@ -618,6 +621,7 @@ odoo.define("pms_pwa.reservation_detail", function (require) {
                 "call",
                 {
                     service_ids,
+                    sections: [],
                 }
             ).then(function (new_data) {
                 const a = $("form.o_pms_pwa_reservation_form .price_total");
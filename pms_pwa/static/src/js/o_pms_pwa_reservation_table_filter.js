@@ -27,6 +27,23 @@ odoo.define("pms_pwa.reservation_table", function (require) {
         allowed_amenity_ids: "amenity_ids",
     };
     const fields_to_avoid = ["primary_button", "secondary_buttons"];
+    // Changes that move the reservation dates or rooms, only they need the
+    // available rooms (and the folio rooms) back
+    const availability_fields = [
+        "checkin",
+        "checkout",
+        "room_type_id",
+        "preferred_room_id",
+        "pricelist_id",
+        "adults",
+    ];
+    function reservation_onchange_sections(values) {
+        var sections = ["options"];
+        if (_.some(_.keys(values), (field) => availability_fields.includes(field))) {
+            sections.push("availability", "folio");
+        }
+        return sections;
+    }
     $("button.close > span.o_pms_pwa_tag_close").on("click", function (event) {
         event.preventDefault();
         var input = event.currentTarget.parentNode.getAttribute("data-tag");
@@ -629,6 +646,7 @@ odoo.define("pms_pwa.reservation_table", function (require) {
 
                                 // Call to set the new values
 
+                                values.sections = reservation_onchange_sections(values);
                                 ajax.jsonRpc(
                                     "/reservation/" + reservation_id + "/onchange_data",
                                     "call",
@@ -715,7 +733,10 @@ odoo.define("pms_pwa.reservation_table", function (require) {
                                                 } catch (error) {
                                                     console.log(error);
                                                 }
-                                                if (select.length != 0) {
+                                                if (
+                                                    select.length != 0 &&
+                                                    value in reservation_data
+                                                ) {
                                                     select.empty();
                                                     if (
                                                         !reservation_data[
@@ -809,6 +830,7 @@ odoo.define("pms_pwa.reservation_table", function (require) {
                                             }
                                             //refresh multimodal data
                                             if (
+                                                reservation_data.folio_reservations &&
                                                 reservation_data.folio_reservations
                                                     .length > 1
                                             ) {
@@ -861,6 +883,7 @@ odoo.define("pms_pwa.reservation_table", function (require) {
                                         new_event.currentTarget.value;
                                 }
                                 // Call to set the new values
+                                values.sections = reservation_onchange_sections(values);
                                 ajax.jsonRpc(
                                     "/reservation/" + reservation_id + "/onchange_data",
                                     "call",
@@ -897,7 +920,10 @@ odoo.define("pms_pwa.reservation_table", function (require) {
                                                 } catch (error) {
                                                     console.log(error);
                                                 }
-                                                if (select.length != 0) {
+                                                if (
+                                                    select.length != 0 &&
+                                                    value in reservation_data
+                                                ) {
                                                     select.empty();
                                                     if (
                                                         !reservation_data[
@@ -992,6 +1018,7 @@ odoo.define("pms_pwa.reservation_table", function (require) {
                                             }
                                             //refresh multimodal data
                                             if (
+                                                reservation_data.folio_reservations &&
                                                 reservation_data.folio_reservations
                                                     .length > 1
                                             ) {
@@ -1228,6 +1255,8 @@ odoo.define("pms_pwa.reservation_table", function (require) {
                                             new_event.currentTarget.name
                                         ] = new_event.currentTarget.value;
                                     }
+                                    // Only the folio rooms are refreshed
+                                    values.sections = ["folio"];
                                     ajax.jsonRpc(
                                         "/reservation/" +
                                             modal_reservation_id +
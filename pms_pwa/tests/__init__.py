@@ -1,2 +1,6 @@
 from . import test_pwa_reservation
 from . import test_pwa_folio
+from . import test_pwa_calendar_occupancy
+from . import test_pwa_dashboard
+from . import test_pwa_reduced_calendar
+from . import test_pwa_pricelist
@@ -5,3 +5,37 @@ class TestHotel(common.SavepointCase):
     @classmethod
     def setUpClass(cls):
         super(TestHotel, cls).setUpClass()
+
+    def create_common_scenario(self):
+        # create a property
+        self.property = self.env["pms.property"].create(
+            {
+                "name": "MY PMS TEST",
+                "company_id": self.env.ref("base.main_company").id,
+                "default_pricelist_id": self.env.ref("product.list0").id,
+            }
+        )
+
+        # create room type class
+        self.room_type_class = self.env["pms.room.type.class"].create(
+            {"name": "Room", "code_class": "TSTCODERT"}
+        )
+
+        # create room type
+        self.room_type_double = self.env["pms.room.type"].create(
+            {
+                "pms_property_ids": [self.property.id],
+                "name": "Double Test",
+                "default_code": "DBL_Test",
+                "class_id": self.room_type_class.id,
+            }
+        )
+        # create room
+        self.room1 = self.env["pms.room"].create(
+            {
+                "pms_property_id": self.property.id,
+                "name": "Double 101",
+                "room_type_id": self.room_type_double.id,
+                "capacity": 2,
+            }
+        )
@@ -0,0 +1,116 @@
+import datetime
+
+from freezegun import freeze_time
+
+from odoo import fields
+
+from .common import TestHotel
+
+
+class TestPwaCalendarOccupancy(TestHotel):
+    def _get_occupancy(self):
+        return self.env["pms.calendar.occupancy"]._get_occupancy(
+            self.property.id,
+            fields.date.today(),
+            fields.date.today() + datetime.timedelta(days=5),
+            self.room_type_double.ids,
+        )
+
+    @freeze_time("1980-11-01")
+    def test_occupancy_on_reservation_create(self):
+        # TEST CASE
+        # reservation nights should be counted in the occupancy table
+        # ARRANGE
+        self.create_common_scenario()
+        reservation_vals = {
+            "checkin": fields.date.today(),
+            "checkout": fields.date.today() + datetime.timedelta(days=2),
+            "room_type_id": self.room_type_double.id,
+            "partner_id": self.env.ref("base.res_partner_12").id,
+            "pms_property_id": self.property.id,
+        }
+        # ACT
+        self.env["pms.reservation"].create(reservation_vals)
+        # ASSERT
+        self.assertEqual(
+            sorted(self._get_occupancy()),
+            [
+                (fields.date.today(), self.room_type_double.id, "normal", 1),
+                (
+                    fields.date.today() + datetime.timedelta(days=1),
+                    self.room_type_double.id,
+                    "normal",
+                    1,
+                ),
+            ],
+        )
+
+    @freeze_time("1980-11-01")
+    def test_occupancy_on_reservation_cancel(self):
+        # TEST CASE
+        # cancelled reservation nights should be removed from occupancy table
+        # ARRANGE
+        self.create_common_scenario()
+        reservation_vals = {
+            "checkin": fields.date.today(),
+            "checkout": fields.date.today() + datetime.timedelta(days=2),
+            "room_type_id": self.room_type_double.id,
+            "partner_id": self.env.ref("base.res_partner_12").id,
+            "pms_property_id": self.property.id,
+        }
+        reservation = self.env["pms.reservation"].create(reservation_vals)
+        # ACT
+        reservation.action_cancel()
+        # ASSERT
+        self.assertFalse(self._get_occupancy())
+
+    @freeze_time("1980-11-01")
+    def test_occupancy_on_reservation_room_type_move(self):
+        # TEST CASE
+        # moving a reservation to a room of another room type should move
+        # its nights in the occupancy table
+        # ARRANGE
+        self.create_common_scenario()
+        self.room_type_single = self.env["pms.room.type"].create(
+            {
+                "pms_property_ids": [self.property.id],
+                "name": "Single Test",
+                "default_code": "SNG_Test",
+                "class_id": self.room_type_class.id,
+            }
+        )
+        self.room2 = self.env["pms.room"].create(
+            {
+                "pms_property_id": self.property.id,
+                "name": "Single 201",
+                "room_type_id": self.room_type_single.id,
+                "capacity": 1,
+            }
+        )
+        reservation = self.env["pms.reservation"].create(
+            {
+                "checkin": fields.date.today(),
+                "checkout": fields.date.today() + datetime.timedelta(days=1),
+                "room_type_id": self.room_type_double.id,
+                "preferred_room_id": self.room1.id,
+                "partner_id": self.env.ref("base.res_partner_12").id,
+                "pms_property_id": self.property.id,
+            }
+        )
+        # ACT
+        reservation.write(
+            {
+                "room_type_id": self.room_type_single.id,
+                "preferred_room_id": self.room2.id,
+            }
+        )
+        # ASSERT
+        self.assertEqual(
+            self.env["pms.calendar.occupancy"]._get_occupancy(
+                self.property.id,
+                fields.date.today(),
+                fields.date.today(),
+                (self.room_type_double | self.room_type_single).ids,
+            ),
+            [(fields.date.today(), self.room_type_single.id, "normal", 1)],
+        )
@@ -0,0 +1,214 @@
+import datetime
+
+from freezegun import freeze_time
+
+from odoo import fields
+
+from .common import TestHotel
+
+
+class TestPwaDashboard(TestHotel):
+    def _create_reservation(self, checkin, checkout):
+        return self.env["pms.reservation"].create(
+            {
+                "checkin": checkin,
+                "checkout": checkout,
+                "room_type_id": self.room_type_double.id,
+                "partner_id": self.env.ref("base.res_partner_12").id,
+                "pms_property_id": self.property.id,
+            }
+        )
+
+    @freeze_time("1980-11-01")
+    def test_dashboard_reservation_counters(self):
+        # TEST CASE
+        # arrivals and departures of today and tomorrow should be counted
+        # ARRANGE
+        self.create_common_scenario()
+        today = fields.date.today()
+        tomorrow = today + datetime.timedelta(days=1)
+        self._create_reservation(today, tomorrow)
+        self._create_reservation(tomorrow, tomorrow + datetime.timedelta(days=1))
+        cancelled = self._create_reservation(
+            tomorrow + datetime.timedelta(days=1),
+            tomorrow + datetime.timedelta(days=2),
+        )
+        cancelled.action_cancel()
+        # ACT
+        counters = self.property._get_dashboard_reservation_counters(today)
+        # ASSERT
+        self.assertEqual(
+            counters,
+            {
+                "to_arrive": 1,
+                "to_check_in": 1,
+                "to_arrive_tomorrow": 1,
+                "to_leave": 0,
+                "to_check_out": 0,
+                "to_leave_tomorrow": 1,
+            },
+        )
+
+    @freeze_time("1980-11-01")
+    def test_dashboard_kpi_counters(self):
+        # TEST CASE
+        # KPI counters should only count reservations of the dates range
+        # ARRANGE
+        self.create_common_scenario()
+        today = fields.date.today()
+        self._create_reservation(today, today + datetime.timedelta(days=2))
+        self._create_reservation(
+            today + datetime.timedelta(days=20), today + datetime.timedelta(days=22)
+        )
+        # ACT
+        counters = self.property._get_dashboard_kpi_counters(
+            today, today + datetime.timedelta(days=15)
+        )
+        # ASSERT
+        self.assertEqual(
+            counters,
+            {"arrivals": 1, "departures": 1, "out_of_service": 0, "total": 1},
+        )
+
+    @freeze_time("1980-11-01")
+    def test_dashboard_kpis_on_reservation_create(self):
+        # TEST CASE
+        # reservation nights, arrival and departure should be in the KPIs
+        # ARRANGE
+        self.create_common_scenario()
+        today = fields.date.today()
+        # ACT
+        self._create_reservation(today, today + datetime.timedelta(days=2))
+        kpis = self.env["pms.dashboard.kpi"]._get_kpis(
+            self.property.id, today, today + datetime.timedelta(days=2)
+        )
+        # ASSERT
+        self.assertEqual(
+            [
+                (kpi["rooms_sold"], kpi["arrivals"], kpi["departures"])
+                for kpi in kpis.values()
+            ],
+            [(1, 1, 0), (1, 0, 0), (0, 0, 1)],
+        )
+
+    @freeze_time("1980-11-01")
+    def test_dashboard_kpis_on_reservation_cancel(self):
+        # TEST CASE
+        # cancelled reservations should be removed from the KPIs
+        # ARRANGE
+        self.create_common_scenario()
+        today = fields.date.today()
+        reservation = self._create_reservation(
+            today, today + datetime.timedelta(days=2)
+        )
+        # ACT
+        reservation.action_cancel()
+        kpis = self.env["pms.dashboard.kpi"]._get_kpis(
+            self.property.id, today, today + datetime.timedelta(days=2)
+        )
+        # ASSERT
+        self.assertFalse(any(kpi["rooms_sold"] for kpi in kpis.values()))
+
+    @freeze_time("1980-11-01")
+    def test_channel_mix(self):
+        # TEST CASE
+        # channel mix should group the reservations arriving in the range
+        # ARRANGE
+        self.create_common_scenario()
+        today = fields.date.today()
+        reservation = self._create_reservation(
+            today, today + datetime.timedelta(days=2)
+        )
+        self._create_reservation(
+            today + datetime.timedelta(days=20), today + datetime.timedelta(days=22)
+        )
+        # ACT
+        channel_mix = self.property._get_channel_mix(
+            today, today + datetime.timedelta(days=15)
+        )
+        # ASSERT
+        self.assertEqual(
+            channel_mix,
+            {
+                reservation.channel_type_id.id: {
+                    "reservations": 1,
+                    "income": reservation.price_room_services_set,
+                }
+            },
+        )
+
+    @freeze_time("1980-11-01")
+    def test_room_status_counters(self):
+        # TEST CASE
+        # rooms count by housekeeping state should follow room changes
+        # ARRANGE
+        self.create_common_scenario()
+        counters = self.env["pms.room.status.counter"]
+        # ACT
+        self.room1.housekeeping_state = "dirty"
+        # ASSERT
+        self.assertEqual(
+            counters._get_counters(self.property.id),
+            {"ready": 0, "dirty": 1, "cleaning": 0},
+        )
+
+    @freeze_time("1980-11-01")
+    def test_comparison_weekday_alignment(self):
+        # TEST CASE
+        # baseline periods should start on the same weekday with alignment
+        # ARRANGE
+        self.create_common_scenario()
+        today = fields.date.today()
+        # ACT
+        periods = self.env["pms.dashboard.kpi"]._get_comparison(
+            self.property.id,
+            today,
+            today + datetime.timedelta(days=6),
+            baselines=2,
+            align_weekday=True,
+        )
+        # ASSERT
+        self.assertEqual(len(periods), 3)
+        for period in periods:
+            self.assertEqual(period["date_from"].weekday(), today.weekday())
+            self.assertEqual(len(period["kpis"]), 7)
+        self.assertEqual(periods[1]["date_from"], datetime.date(1979, 11, 3))
+
+    @freeze_time("1980-11-01")
+    def test_cash_balance_on_statement_lines(self):
+        # TEST CASE
+        # the journal balance should follow the create, write and unlink of
+        # its statement lines
+        # ARRANGE
+        journal = self.env["account.journal"].create(
+            {
+                "name": "Cash TEST",
+                "type": "cash",
+                "code": "CTST",
+                "company_id": self.env.ref("base.main_company").id,
+            }
+        )
+        statement = self.env["account.bank.statement"].create(
+            {"name": "Statement TEST", "journal_id": journal.id}
+        )
+        CashBalance = self.env["pms.cash.balance"]
+        # ACT
+        line = self.env["account.bank.statement.line"].create(
+            {
+                "statement_id": statement.id,
+                "payment_ref": "Payment TEST",
+                "amount": 100.0,
+            }
+        )
+        balance_on_create = CashBalance._get_balance(journal.id)
+        line.write({"amount": 150.0})
+        balance_on_write = CashBalance._get_balance(journal.id)["balance"]
+        line.unlink()
+        balance_on_unlink = CashBalance._get_balance(journal.id)["balance"]
+        # ASSERT
+        self.assertEqual(
+            balance_on_create,
+            {"balance": 100.0, "status": "close", "statement_id": statement.id},
+        )
+        self.assertEqual(balance_on_write, 150.0)
+        self.assertEqual(balance_on_unlink, 0.0)
@@ -0,0 +1,58 @@
+import datetime
+
+from freezegun import freeze_time
+
+from odoo import fields
+
+from .common import TestHotel
+
+
+class TestPwaPricelist(TestHotel):
+    def _create_item(self, date_from, date_to, price, pms_property=False):
+        return self.env["product.pricelist.item"].create(
+            {
+                "pricelist_id": self.pricelist.id,
+                "applied_on": "0_product_variant",
+                "product_id": self.room_type_double.product_id.id,
+                "compute_price": "fixed",
+                "fixed_price": price,
+                "date_start_consumption": date_from,
+                "date_end_consumption": date_to,
+                "pms_property_ids": [(6, 0, pms_property.ids if pms_property else [])],
+            }
+        )
+
+    @freeze_time("1980-11-01")
+    def test_price_matrix_of_overlapping_items(self):
+        # TEST CASE
+        # the price matrix should apply the same item as _compute_price_rule
+        # when several items overlap in the same dates
+        # ARRANGE
+        self.create_common_scenario()
+        self.pricelist = self.env["product.pricelist"].create(
+            {"name": "Pricelist for TEST"}
+        )
+        today = fields.date.today()
+        dates = [today + datetime.timedelta(days=x) for x in range(4)]
+        self._create_item(dates[0], dates[0], 50.0)
+        self._create_item(dates[0], dates[0], 60.0, self.property)
+        self._create_item(dates[0], dates[1], 70.0, self.property)
+        self._create_item(dates[1], dates[1], 80.0)
+        self._create_item(dates[0], dates[2], 90.0)
+        self._create_item(dates[2], dates[2], 95.0)
+        product = self.room_type_double.product_id
+        # ACT
+        prices = self.pricelist._compute_price_rule_matrix(
+            product, dates, self.property.id
+        )
+        # ASSERT
+        for date in dates:
+            rule_prices = self.pricelist.with_context(
+                quantity=1,
+                consumption_date=date,
+                property=self.property.id,
+            )._compute_price_rule(
+                [(product, 1, False)],
+                datetime.datetime.today(),
+            )
+            self.assertEqual(prices[date][product.id], rule_prices[product.id][0], date)
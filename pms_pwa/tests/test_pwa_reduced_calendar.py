@@ -0,0 +1,64 @@
+import datetime
+
+from freezegun import freeze_time
+
+from odoo import fields
+
+from .common import TestHotel
+
+
+class TestPwaReducedCalendar(TestHotel):
+    def _create_reservation(self, checkin, checkout, **vals):
+        return self.env["pms.reservation"].create(
+            dict(
+                {
+                    "checkin": checkin,
+                    "checkout": checkout,
+                    "room_type_id": self.room_type_double.id,
+                    "preferred_room_id": self.room1.id,
+                    "partner_id": self.env.ref("base.res_partner_12").id,
+                    "pms_property_id": self.property.id,
+                },
+                **vals
+            )
+        )
+
+    @freeze_time("1980-11-01")
+    def test_room_runs_of_overlapping_reservations(self):
+        # TEST CASE
+        # the nights of two reservations overlapping in the same room should
+        # be grouped in one run by reservation
+        # ARRANGE
+        self.create_common_scenario()
+        today = fields.date.today()
+        dates = {today + datetime.timedelta(days=x) for x in range(5)}
+        reservation1 = self._create_reservation(
+            today, today + datetime.timedelta(days=3)
+        )
+        reservation2 = self._create_reservation(
+            today + datetime.timedelta(days=1),
+            today + datetime.timedelta(days=3),
+            overbooking=True,
+        )
+        # ACT
+        runs = (
+            reservation1.reservation_line_ids | reservation2.reservation_line_ids
+        )._get_room_runs(dates)
+        # ASSERT
+        self.assertEqual(
+            runs,
+            [
+                [
+                    self.room1.id,
+                    reservation1.id,
+                    today,
+                    today + datetime.timedelta(days=2),
+                ],
+                [
+                    self.room1.id,
+                    reservation2.id,
+                    today + datetime.timedelta(days=1),
+                    today + datetime.timedelta(days=2),
+                ],
+            ],
+        )
@@ -521,3 +521,92 @@ class TestPwaReservation(TestHotel):
         # ACT & ASSERT
         with self.assertRaises(ValidationError):
             reservation.pwa_action_checkin(guest_list, reservation.id)
+
+    @freeze_time("1980-11-01")
+    def test_parse_reservation_core_only(self):
+        # TEST CASE
+        # the reservation payload without sections shouldn't compute them
+        # ARRANGE
+        self.create_common_scenario()
+        reservation = self.env["pms.reservation"].create(
+            {
+                "checkin": fields.date.today(),
+                "checkout": fields.date.today() + datetime.timedelta(days=1),
+                "room_type_id": self.room_type_double.id,
+                "partner_id": self.env.ref("base.res_partner_12").id,
+                "pms_property_id": self.property.id,
+            }
+        )
+        # ACT
+        values = reservation.parse_reservation(sections=[])
+        # ASSERT
+        self.assertEqual(values["id"], reservation.id)
+        self.assertNotIn("room_numbers", values)
+        self.assertNotIn("allowed_pricelists", values)
+
+    @freeze_time("1980-11-01")
+    def test_parse_reservation_unknown_section(self):
+        # TEST CASE
+        # an unknown section of the reservation payload should fail
+        # ARRANGE
+        self.create_common_scenario()
+        reservation = self.env["pms.reservation"].create(
+            {
+                "checkin": fields.date.today(),
+                "checkout": fields.date.today() + datetime.timedelta(days=1),
+                "room_type_id": self.room_type_double.id,
+                "partner_id": self.env.ref("base.res_partner_12").id,
+                "pms_property_id": self.property.id,
+            }
+        )
+        # ACT & ASSERT
+        with self.assertRaises(ValidationError):
+            reservation.parse_reservation(sections=["unknown"])
+
+    @freeze_time("1980-11-01")
+    def test_parse_reservation_string_sections(self):
+        # TEST CASE
+        # a section name not sent as a list should fail
+        # ARRANGE
+        self.create_common_scenario()
+        reservation = self.env["pms.reservation"].create(
+            {
+                "checkin": fields.date.today(),
+                "checkout": fields.date.today() + datetime.timedelta(days=1),
+                "room_type_id": self.room_type_double.id,
+                "partner_id": self.env.ref("base.res_partner_12").id,
+                "pms_property_id": self.property.id,
+            }
+        )
+        # ACT & ASSERT
+        with self.assertRaisesRegex(ValidationError, "list of names"):
+            reservation.parse_reservation(sections="folio")
+
+    @freeze_time("1980-11-01")
+    def test_folio_reservations_free_rooms(self):
+        # TEST CASE
+        # each folio reservation should offer its own room and the free ones,
+        # not the rooms of the other reservations sharing the dates
+        # ARRANGE
+        self.create_common_scenario()
+        reservation_vals = {
+            "checkin": fields.date.today(),
+            "checkout": fields.date.today() + datetime.timedelta(days=1),
+            "room_type_id": self.room_type_double.id,
+            "partner_id": self.env.ref("base.res_partner_12").id,
+            "pms_property_id": self.property.id,
+            "preferred_room_id": self.room1.id,
+        }
+        reservation1 = self.env["pms.reservation"].create(reservation_vals)
+        reservation_vals.update(
+            {"folio_id": reservation1.folio_id.id, "preferred_room_id": self.room2.id}
+        )
+        reservation2 = self.env["pms.reservation"].create(reservation_vals)
+        # ACT
+        values = {
+            item["id"]: {room["id"] for room in item["room_numbers"]}
+            for item in reservation1.folio_id.get_reservation_json()
+        }
+        # ASSERT
+        self.assertEqual(values[reservation1.id], {self.room1.id, self.room3.id})
+        self.assertEqual(values[reservation2.id], {self.room2.id, self.room3.id})